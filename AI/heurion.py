@@ -76,8 +76,10 @@ class AIPlayer(Player):
     # Return: The highest scoring move (according to the neural network)
     #
     def getBestMove(self, currentState):
-        # return the best move found (highest value resulting state)
-        return sorted([(self.evaluateState(self.processMove(currentState, move)), move) for move in listAllLegalMoves(currentState)], reverse=True)[0][1]
+        # return the best move found (highest value resulting state, and of
+        # equally good ones the first listed: Moves themselves only compare
+        # by where they are in memory)
+        return sorted([(self.evaluateState(self.processMove(currentState, move)), move) for move in listAllLegalMoves(currentState)], key=lambda pair: pair[0], reverse=True)[0][1]
             
     
     ##
@@ -104,6 +106,11 @@ class AIPlayer(Player):
         # get a reference to the enemy's queen
         enemyQueen = enemyInv.getQueen()
         self.dests = [playerInv.getAnthill().coords] + [tunnel.coords for tunnel in playerInv.getTunnels()]
+        # distances from every cell to the nearest drop-off point, food and
+        # enemy ant (cached until those change) so each ant's is a lookup
+        destField = nearestManhattanField(self.dests)
+        foodField = nearestManhattanField(self.foods)
+        enemyField = nearestManhattanField([enemyAnt.coords for enemyAnt in enemyInv.ants])
         
         # game over (lost) if player does not have a queen
         #               or if enemy player has 11 or more food
@@ -132,23 +139,23 @@ class AIPlayer(Player):
                 if ant.coords in self.dests + self.foods:
                     valueOfState -= 0.2   
                 # avoid enemies
-                valueOfState += 0.00005 * min(self.vectorDistance(ant.coords, enemyAnt.coords) for enemyAnt in enemyInv.ants)
+                valueOfState += 0.00005 * enemyField[ant.coords[0]][ant.coords[1]]
             elif ant.type == WORKER:    
                 countWorkers += 1      
                 # if the ant has food,
                 # store the distance from the ant to the closest drop-off point  
                 if ant.carrying:
                     valueOfState += 0.0030
-                    valueOfState -= 0.00005 * min(self.vectorDistance(ant.coords, destCoord) for destCoord in self.dests)
+                    valueOfState -= 0.00005 * destField[ant.coords[0]][ant.coords[1]]
                 # if the ant does not have food,
                 else:
-                    valueOfState -= 0.00005 * min(self.vectorDistance(ant.coords, destCoord) for destCoord in self.foods)
+                    valueOfState -= 0.00005 * foodField[ant.coords[0]][ant.coords[1]]
             else:
                 # Reward the AI for having ants other than the queen
                 valueOfState += 0.005
                 # Punish the AI less and less as its ants approach the enemy's queen
                 # valueOfState -= 0.0005 * self.vectorDistance(ant.coords, enemyQueen.coords) 
-                valueOfState -= 0.00005 * min(self.vectorDistance(ant.coords, enemyAnt.coords) for enemyAnt in enemyInv.ants)      
+                valueOfState -= 0.00005 * enemyField[ant.coords[0]][ant.coords[1]]
      
         if countWorkers <= 3:
             # Reward the AI for having workers
@@ -19,6 +19,27 @@ from AIPlayerUtils import *
 
 # representation of inf
 INFINITY = 9999
+
+# the depth searched when there is no deadline (getMove)
+defaultDepth = 3
+
+# the deepest iterative deepening searches when there is a deadline
+# (getMoveTimed)
+maxSearchDepth = 10
+
+# how much longer a search one deeper is guessed to take, until two depths
+# have been timed
+depthGrowth = 30.0
+
+# the part of the time to move that is kept back, searching stopping that
+# long before the deadline.  This leaves time for the move to get back to the
+# game (from another process it is pickled and sent down a pipe) and covers
+# the work between the search's checks of the time, both of which grow with
+# the size of the state.
+deadlineFraction = 0.1
+
+# the least time (in seconds) kept back however little there is to move
+minDeadlineMargin = 0.02
                 
 # establishing weights for the weighted linear equation
 queenSafetyWeight = 0.3
@@ -27,6 +48,13 @@ queenSafetyWeight = 0.3
 maxNumAnts = 98.0 # 100 square minus 2 queens
 maxDist = 18.0
 
+##
+#SearchTimeout
+#Description: Raised to abandon a search when the deadline passes
+##
+class SearchTimeout(Exception):
+    pass
+
 # a representation of a 'node' in the search tree
 treeNode = {
     # the Move that would be taken in the given state from the parent node
@@ -58,7 +86,13 @@ class AIPlayer(Player):
     ##
     def __init__(self, inputPlayerId):
         # a depth limit for the search algorithm
-        self.maxDepth = 3
+        self.maxDepth = defaultDepth
+        # the time searching must stop (None for no limit)
+        self.deadline = None
+        # the best move at the root of the search so far (published as it is
+        # found), and the one to search first
+        self.rootBest = None
+        self.rootFirst = None
         # Agent_WillRobinson - Robinson, a man on a mission
         super(AIPlayer,self).__init__(inputPlayerId, "Agent_Will_Robinson") 
 
@@ -137,6 +171,7 @@ class AIPlayer(Player):
     #
     ##
     def alpha_beta_search(self, node):
+        self.rootBest = None
         bestNode = self.max_value(node, -INFINITY, INFINITY, 0)
         while bestNode["parent_node"]["parent_node"] is not None:
             bestNode = bestNode["parent_node"]
@@ -186,13 +221,16 @@ class AIPlayer(Player):
         # base case, maxDepth reached, return the value of the currentState
         if currentDepth == self.maxDepth:
             return node
+        # give up if out of time
+        if self.deadline != None and time.time() > self.deadline:
+            raise SearchTimeout()
         state = node["potential_state"]
         v = -INFINITY
 
         # holds a list of nodes reachable from the currentState
         nodeList = []
         # loop through all legal moves for the currentState
-        for move in listAllLegalMoves(state):
+        for move in cachedLegalMoves(state, prune=True):
             # don't bother doing any move evaluations for the queen
             # unless we need to build a worker (she is in the way!)
             if move.moveType == MOVE_ANT:
@@ -217,6 +255,12 @@ class AIPlayer(Player):
 
         #sort nodes from greatest to least
         sortedNodeList = sorted(nodeList, key=lambda k: k['state_value'], reverse=True)
+
+        #at the root, search the move asked to be first (the best of the last
+        #search) before the others, so it isn't thrown away below and is the
+        #first best move published
+        if currentDepth == 0 and self.rootFirst != None:
+            sortedNodeList.sort(key=lambda k: str(k["move"]) != str(self.rootFirst))
         
         # throw away the last half of the list to minimize the number of nodes
         sortedNodeList = sortedNodeList[:(len(sortedNodeList)+1)/2]
@@ -232,6 +276,11 @@ class AIPlayer(Player):
                 if v < maxValNode["state_value"]:
                         bestValNode = maxValNode
                         v = maxValNode["state_value"]
+                        #at the root, make the new best move known right away
+                        #in case the search runs out of time
+                        if currentDepth == 0:
+                            self.rootBest = tempNode["move"]
+                            self.publishMove(self.rootBest)
                 if v >= beta:
                     return maxValNode
                 alpha = max(alpha, v)
@@ -268,13 +317,16 @@ class AIPlayer(Player):
         # base case, maxDepth reached, return the value of the currentState
         if currentDepth == self.maxDepth:
             return node
+        # give up if out of time
+        if self.deadline != None and time.time() > self.deadline:
+            raise SearchTimeout()
         state = node["potential_state"]
         v = INFINITY
 
         # holds a list of nodes reachable from the currentState
         nodeList = []
         # loop through all legal moves for the currentState
-        for move in listAllLegalMoves(state):
+        for move in cachedLegalMoves(state, prune=True):
             # don't bother doing any move evaluations for the queen
             # unless we need to build a worker (she is in the way!)
             if move.moveType == MOVE_ANT:
@@ -584,6 +636,61 @@ class AIPlayer(Player):
 
         # return the best move, found by recursively searching potential moves
         #return self.exploreTree(currentState, currentState.whoseTurn, 0)
+
+
+    ##
+    #getMoveTimed
+    #Description: Like getMove, but searches deeper and deeper (iterative
+    #deepening) for as long as the deadline allows.  Each depth searches the
+    #best move of the one before first, and publishes every better move it
+    #finds as it finds it, so if time runs out in the middle of a depth the
+    #game plays the best move found so far.  (Until the deeper search has
+    #something better, that is the best move of the depth before.)
+    #
+    #Parameters:
+    #   currentState - The current state of the game (GameState)
+    #   deadline - The time (from time.time()) by which the move must be made
+    #
+    #Return: Move(moveType [int], coordList [list of 2-tuples of ints], buildType [int]
+    #
+    def getMoveTimed(self, currentState, deadline):
+        # save our id
+        self.playerId = currentState.whoseTurn
+        #create the initial node to analyze
+        initNode = self.createNode(None, currentState, None)
+        # ending the turn is always allowed, so it will do until something
+        # better is found
+        bestMove = Move(END, None, None)
+        self.publishMove(bestMove)
+        margin = max((deadline - time.time()) * deadlineFraction, minDeadlineMargin)
+        self.deadline = deadline - margin
+        lastTime = None
+        try:
+            for depth in range(1, maxSearchDepth + 1):
+                self.maxDepth = depth
+                self.rootFirst = bestMove
+                startTime = time.time()
+                try:
+                    bestMove = self.alpha_beta_search(initNode)
+                except SearchTimeout:
+                    # the best move of the unfinished depth (already published)
+                    if self.rootBest != None:
+                        bestMove = self.rootBest
+                    break
+                self.publishMove(bestMove)
+                # don't start a depth that won't finish in time
+                searchTime = time.time() - startTime
+                growth = depthGrowth
+                if lastTime:
+                    growth = searchTime / lastTime
+                if time.time() + searchTime * growth > self.deadline:
+                    break
+                lastTime = searchTime
+        finally:
+            self.maxDepth = defaultDepth
+            self.deadline = None
+            self.rootFirst = None
+        return bestMove
     
     
     ##
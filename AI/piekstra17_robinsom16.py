@@ -223,7 +223,7 @@ class AIPlayer(Player):
         # holds the value of the best move
         bestMoveVal = 0.0
         # loop through all legal moves for the currentState
-        for move in listAllLegalMoves(currentState):
+        for move in iterLegalMoves(currentState):
             # get the state that would result if the move is made
             potentialState = self.processMove(currentState, move)
             
@@ -270,7 +270,7 @@ class AIPlayer(Player):
         # holds the value of the best move
         bestMoveVal = 0.0
         # loop through all legal moves for the currentState
-        for move in listAllLegalMoves(currentState):
+        for move in iterLegalMoves(currentState):
             # get the state that would result if the move is made
             potentialState = self.processMove(currentState, move)
             
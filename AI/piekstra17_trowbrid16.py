@@ -208,7 +208,7 @@ class AIPlayer(Player):
         # holds the value of the best move
         bestMoveVal = 0.0
         # loop through all legal moves for the currentState
-        for move in listAllLegalMoves(currentState):
+        for move in iterLegalMoves(currentState):
             # get the value of the state that would result if the move is made
             resultingStateVal = self.evaluateState(self.processMove(currentState, move))
             if resultingStateVal == 1.0:
@@ -144,6 +144,11 @@ class AIPlayer(Player):
             compressedState["l"] = True
         else:
             
+            # distances from every cell to the nearest drop-off point and food
+            # (cached until those change) so each ant's is a lookup
+            destField = nearestManhattanField([tunnel.coords for tunnel in playerInv.getTunnels()]+[playerInv.getAnthill().coords])
+            foodField = nearestManhattanField(self.foods)
+
             antCount = 0
             # check each of the player's ants
             for ant in playerInv.ants:
@@ -157,9 +162,9 @@ class AIPlayer(Player):
                                        
                     #store the distance from the ant to food
                     if ant.carrying:
-                        compressedState[str(antCount)+"c"] = min(self.vectorDistance(ant.coords, destCoord) for destCoord in ([tunnel.coords for tunnel in playerInv.getTunnels()]+[playerInv.getAnthill().coords]))      
+                        compressedState[str(antCount)+"c"] = destField[ant.coords[0]][ant.coords[1]]
                     else:
-                        compressedState[str(antCount)] = min(self.vectorDistance(ant.coords, foodCoords) for foodCoords in self.foods) 
+                        compressedState[str(antCount)] = foodField[ant.coords[0]][ant.coords[1]]
             
         # return the evaluation score of the state
         return compressedState
@@ -1,8 +1,12 @@
 import random
+import heapq
+from collections import OrderedDict
 from Constants import *
 from Ant import UNIT_STATS
 from Construction import CONSTR_STATS
 from Move import *
+from StateView import StateView
+import Zobrist
 
 #
 # AIPlayerUtils.py
@@ -16,6 +20,53 @@ from Move import *
 # GameState.fastclone method.
 #
 
+##
+# Precomputed board tables
+#
+# Every cell's neighbors and the territory it is in never change, so they are
+# worked out once here instead of on every call.  Cells can be looked up by
+# coordinate ([x][y]) or by flat index (x * BOARD_LENGTH + y).  Territory is
+# given from the point of view of the player at the top of the board (which
+# is how every player sees the state it is asked to move in).
+#
+#   CELL_COORDS     - [index] the x,y coordinate of each cell
+#   ADJACENT        - {coord: tuple of adjacent coords} for every legal coord
+#   ADJACENT_COORDS - [x][y] tuple of adjacent coords
+#   ADJACENT_CELLS  - [index] tuple of the indices of adjacent cells
+#   HOME_TERRITORY  - [x][y] True for the player's own rows (0-3)
+#   ENEMY_TERRITORY - [x][y] True for the opponent's rows (6-9)
+#   QUEEN_TERRITORY - [x][y] True where a queen may go (anywhere but the two
+#                     middle rows)
+#   HOME_CELLS, ENEMY_CELLS, QUEEN_CELLS - the same masks by flat index
+#
+# (The tables are built with generator expressions so that no loop variables
+# leak into the modules that import * from here.)
+#
+CELL_COORDS = tuple((index // BOARD_LENGTH, index % BOARD_LENGTH)
+                    for index in xrange(0, BOARD_LENGTH * BOARD_LENGTH))
+
+ADJACENT = dict((coord, tuple((coord[0] + dx, coord[1] + dy)
+                              for (dx, dy) in ((-1, 0), (1, 0), (0, -1), (0, 1))
+                              if 0 <= coord[0] + dx < BOARD_LENGTH and
+                                 0 <= coord[1] + dy < BOARD_LENGTH))
+                for coord in CELL_COORDS)
+ADJACENT_COORDS = tuple(tuple(ADJACENT[(x, y)] for y in xrange(0, BOARD_LENGTH))
+                        for x in xrange(0, BOARD_LENGTH))
+ADJACENT_CELLS = tuple(tuple(adj[0] * BOARD_LENGTH + adj[1] for adj in ADJACENT[coord])
+                       for coord in CELL_COORDS)
+
+HOME_TERRITORY = tuple(tuple(y < BOARD_LENGTH / 2 - 1 for y in xrange(0, BOARD_LENGTH))
+                       for x in xrange(0, BOARD_LENGTH))
+ENEMY_TERRITORY = tuple(tuple(y > BOARD_LENGTH / 2 for y in xrange(0, BOARD_LENGTH))
+                        for x in xrange(0, BOARD_LENGTH))
+QUEEN_TERRITORY = tuple(tuple(y != BOARD_LENGTH / 2 - 1 and y != BOARD_LENGTH / 2
+                              for y in xrange(0, BOARD_LENGTH))
+                        for x in xrange(0, BOARD_LENGTH))
+HOME_CELLS = tuple(HOME_TERRITORY[x][y] for (x, y) in CELL_COORDS)
+ENEMY_CELLS = tuple(ENEMY_TERRITORY[x][y] for (x, y) in CELL_COORDS)
+QUEEN_CELLS = tuple(QUEEN_TERRITORY[x][y] for (x, y) in CELL_COORDS)
+
+
 ##
 # legalCoord
 #
@@ -26,6 +77,12 @@ from Move import *
 #
 # Return: true (legal) or false (illegal)
 def legalCoord(coord):
+    #every legal coordinate tuple is in the adjacency table
+    try:
+        if coord in ADJACENT:
+            return True
+    except TypeError:
+        pass   #e.g. a list (checked the long way below)
 
     #make sure we have a tuple or list with two elements in it
     try:
@@ -114,15 +171,8 @@ def getConstrList(currentState,
 #
 # Return:  the construct at the coordinate or None if there is none
 def getConstrAt(state, coords):
-    #get a list of all constructs
-    allConstrs = getConstrList(state)
-
-    #search for one at the given coord
-    for constr in allConstrs:
-        if (constr.coords == coords):
-            return constr
-
-    return None  #not found
+    #the state keeps a coordinate index of its constructs
+    return state.getConstrAt(coords)
 
 ##
 # getAntAt
@@ -135,15 +185,8 @@ def getConstrAt(state, coords):
 #
 # Return:  the ant at the coordinate or None if there is none
 def getAntAt(state, coords):
-    #get a list of all constructs
-    allAnts = getAntList(state)
-
-    #search for one at the given coord
-    for ant in allAnts:
-        if (ant.coords == coords):
-            return ant
-
-    return None  #not found
+    #the state keeps a coordinate index of its ants
+    return state.getAntAt(coords)
     
 
 ##
@@ -155,6 +198,12 @@ def getAntAt(state, coords):
 # Return: a list of all legal coords that are adjacent to the given space
 #
 def listAdjacent(coord):
+    #look legal coordinate tuples up in the table
+    try:
+        return list(ADJACENT[coord])
+    except (KeyError, TypeError):
+        pass   #lists and illegal coordinates are handled the long way
+
     #catch invalid inputs
     if (not legalCoord(coord)):
         return [];
@@ -260,11 +309,515 @@ def listAllMovementPaths(currentState, coords, movement):
     return validMoves
 
 
+##
+# listCheapestMovementPaths
+#
+# a generator that yields one cheapest legal path to each cell a single ant
+# can reach from a given position (rather than every path, as
+# listAllMovementPaths does).  Cells are explored in order of the movement
+# they cost to reach (which are small integers), so no recursion is needed
+# and each destination is yielded once.  As with listAllMovementPaths the
+# zero-step move comes last and the ant doesn't actually have to be there.
+#
+# Parameters:
+#    currentState - current game state
+#    coords       - where the ant is
+#    movement     - movement points ant has remaining
+#    queen        - if True, paths are kept inside the queen's territory
+#                   (see isPathOkForQueen) as they are generated
+#
+# Yields: lists of coords (tuples), each an acceptable set of coords for a
+# Move object
+def listCheapestMovementPaths(currentState, coords, movement, queen=False):
+    if (movement <= 0): return
+    start = (coords[0], coords[1])
+    if queen and not QUEEN_TERRITORY[start[0]][start[1]]: return
+
+    #movement spent on the cheapest path found so far to each cell, and the
+    #cell before it on that path
+    spent = { start : 0 }
+    previous = { start : None }
+    #cells waiting to be explored, by the movement spent reaching them
+    waiting = [[] for cost in xrange(0, movement + 1)]
+    waiting[0].append(start)
+
+    for cost in xrange(0, movement + 1):
+        for cell in waiting[cost]:
+            #skip cells a cheaper path has been found to since
+            if (spent[cell] != cost): continue
+
+            if (cell != start):
+                path = [cell]
+                while (previous[path[-1]] != start):
+                    path.append(previous[path[-1]])
+                path.append(coords)
+                path.reverse()
+                yield path
+
+            for newCell in ADJACENT[cell]:
+                #(every step costs at least 1)
+                if (spent.get(newCell, movement + 1) <= cost + 1): continue
+                if queen and not QUEEN_TERRITORY[newCell[0]][newCell[1]]:
+                    continue
+                constrAtDest = getConstrAt(currentState, newCell)
+                newCost = cost + 1   #default
+                if constrAtDest != None:
+                    newCost = cost + CONSTR_STATS[constrAtDest.type][MOVE_COST]
+                if (newCost > movement): continue
+                if (spent.get(newCell, movement + 1) <= newCost): continue
+                if (getAntAt(currentState, newCell) != None): continue
+                spent[newCell] = newCost
+                previous[newCell] = cell
+                waiting[newCost].append(newCell)
+
+    #the zero-step move (used to activate attack on adjacent foe)
+    yield [coords]
+
+
+##
+# Move pruning
+#
+# Many of the movement moves listAllMovementPaths finds make no difference
+# to the game: the zero-step move only matters if the ant has an enemy in
+# range to attack (otherwise it just marks the ant as moved, which can only
+# stop it capturing a building), a path that visits a cell twice ends where
+# a shorter path does, and only the end of a path matters so of the paths to
+# a cell one that costs least is all that's needed.  The move listing
+# functions leave these out if asked to prune (see listPrunedMovementPaths),
+# and can count how many they leave out for each reason in a stats dict:
+#
+#   stats - {"zeroStep": int, "circular": int, "dominated": int}, the number
+#           of paths left out for each reason (the counts are added to, so
+#           one dict can be used for many listings)
+#
+
+##
+# enemyInRange
+#
+# Return: True if an enemy ant is in range of an ant where it stands
+def enemyInRange(currentState, ant):
+    attackRange = UNIT_STATS[ant.type][RANGE] ** 2
+    for enemy in currentState.inventories[1 - ant.player].ants:
+        diffX = ant.coords[0] - enemy.coords[0]
+        diffY = ant.coords[1] - enemy.coords[1]
+        if (attackRange >= diffX * diffX + diffY * diffY):
+            return True
+    return False
+
+##
+# countPruned
+#
+# adds to the count of paths left out for a reason (see Move pruning)
+def countPruned(stats, reason, number):
+    if (stats != None) and (number > 0):
+        stats[reason] = stats.get(reason, 0) + number
+
+##
+# listPrunedMovementPaths
+#
+# lists the paths for an ant that make a difference to the game (see Move
+# pruning): one cheapest path to each cell it can reach, and the zero-step
+# move only if it has an enemy in range.  Without uniqueDest the paths are
+# walked in the order listAllMovementPaths lists them, keeping the cost of
+# each as it goes (so nothing is looked up twice), and the kept paths are
+# the first cheapest to each cell, in that order.  With uniqueDest they are
+# those of listCheapestMovementPaths.
+#
+# Parameters:
+#    currentState - current game state
+#    ant          - the ant (which must not have moved)
+#    uniqueDest   - True to use listCheapestMovementPaths (see
+#                   listAllMovementMoves)
+#    stats        - a dict to count the paths left out in (see Move
+#                   pruning), or None
+#
+# Return: a list of paths (lists of coords), each an acceptable set of
+# coords for a Move object
+def listPrunedMovementPaths(currentState, ant, uniqueDest=False, stats=None):
+    coords = ant.coords
+    movement = UNIT_STATS[ant.type][MOVEMENT]
+    queen = (ant.type == QUEEN)
+    canAttack = enemyInRange(currentState, ant)
+    if uniqueDest:
+        paths = list(listCheapestMovementPaths(currentState, coords, movement, queen))
+        if canAttack:
+            return paths
+        kept = [path for path in paths if len(path) != 1]
+        countPruned(stats, "zeroStep", len(paths) - len(kept))
+        return kept
+
+    if (movement <= 0): return []
+    start = (coords[0], coords[1])
+    if queen and not QUEEN_TERRITORY[start[0]][start[1]]: return []
+
+    #the first cheapest path walked to each cell: cell -> (cost, number, path)
+    cheapestTo = {}
+    #the number of paths walked (but the zero-step move) and of those circular
+    walked = [0, 0]
+
+    def record(path, cost, circular):
+        walked[0] += 1
+        if circular:
+            walked[1] += 1
+        elif (cost < cheapestTo.get(path[-1], (cost + 1,))[0]):
+            cheapestTo[path[-1]] = (cost, walked[0], path)
+
+    #(as listAllMovementPaths: the one-step paths from a cell, then each one's
+    #extensions, which include itself again if it has movement left)
+    def walk(path, cell, movement, cost, circular):
+        steps = []
+        for newCell in ADJACENT[cell]:
+            if queen and not QUEEN_TERRITORY[newCell[0]][newCell[1]]: continue
+            if (getAntAt(currentState, newCell) != None): continue
+            constrAtDest = getConstrAt(currentState, newCell)
+            stepCost = 1   #default
+            if constrAtDest != None:
+                stepCost = CONSTR_STATS[constrAtDest.type][MOVE_COST]
+            if (stepCost <= movement):
+                steps.append((newCell, stepCost, circular or newCell in path))
+        for (newCell, stepCost, newCircular) in steps:
+            record(path + [newCell], cost + stepCost, newCircular)
+        for (newCell, stepCost, newCircular) in steps:
+            if (movement - stepCost > 0):
+                newPath = path + [newCell]
+                walk(newPath, newCell, movement - stepCost, cost + stepCost, newCircular)
+                record(newPath, cost + stepCost, newCircular)
+
+    walk([coords], start, movement, 0, False)
+    kept = [path for (cost, number, path) in sorted(cheapestTo.values(), key=lambda best: best[1])]
+    countPruned(stats, "circular", walked[1])
+    countPruned(stats, "dominated", walked[0] - walked[1] - len(kept))
+    if canAttack:
+        kept.append([coords])
+    else:
+        countPruned(stats, "zeroStep", 1)
+    return kept
+
+
+##
+# Distance fields
+#
+# The cost of moving onto a cell depends only on the construction there (see
+# CONSTR_STATS) and grass and food don't move once setup is over, so the
+# distances between cells hardly ever change during a game.  distanceField
+# works out the distances from every cell to a target once (with Dijkstra's
+# algorithm) and keeps them in terrainFields, keyed by the layout of the
+# cells that don't cost 1 to move onto, so later calls for the same target
+# are just a dict lookup.
+#
+#   terrainFields - {terrain key: (costs, fields, trees)} where
+#                   costs[cell index] is the cost of moving onto each cell,
+#                   fields[cell index] is the distance field to that cell and
+#                   trees[cell index] is its route tree (see routeTree).
+#                   Fields and trees are None until needed.
+#   TERRAIN_CACHE_SIZE - the most layouts kept (older ones are all dropped
+#                        when there are more)
+#   lastTerrain   - [key, entry] of the layout last looked up.  States keep
+#                   their key (and copies share it), so most lookups are the
+#                   same key object as the last and needn't hash it.
+#
+terrainFields = {}
+TERRAIN_CACHE_SIZE = 32
+lastTerrain = [None, None]
+
+##
+# clearTerrainFields
+#
+# drops every cached distance field and route tree
+#
+def clearTerrainFields():
+    terrainFields.clear()
+    lastTerrain[0] = None
+    lastTerrain[1] = None
+
+##
+# terrainKey
+#
+# Return: the coords and movement cost of every construction in a state that
+# doesn't cost 1 to move onto (used to tell terrain layouts apart).  The
+# state keeps it until its constructions change (see
+# GameState.getTerrainKey), so this is usually just a lookup.
+#
+def terrainKey(currentState):
+    return currentState.getTerrainKey()
+
+##
+# terrainCosts
+#
+# Return: [cell index] the cost of moving onto each cell of a terrain layout
+#
+def terrainCosts(key):
+    costs = [1] * len(CELL_COORDS)
+    for (coords, cost) in key:
+        costs[coords[0] * BOARD_LENGTH + coords[1]] = cost
+    return costs
+
+##
+# computeDistanceField
+#
+# runs Dijkstra's algorithm back from a set of targets to find the cheapest
+# cost of moving from every cell to the nearest of them.  Moving onto a cell
+# (including a target) costs that cell's movement cost.
+#
+# Parameters:
+#   costs   - [cell index] cost of moving onto each cell
+#   targets - a list of the target cell indices
+#   blocked - [cell index] True for cells that can't be moved through
+#             (optional).  A path may still start on a blocked cell.
+#
+# Return: [x][y] the cost from each cell to the nearest target (-1 if there's
+# no way)
+def computeDistanceField(costs, targets, blocked=None):
+    dist = [-1] * len(CELL_COORDS)
+    heap = []
+    for target in targets:
+        dist[target] = 0
+        heap.append((0, target))
+    while (len(heap) > 0):
+        (steps, cell) = heapq.heappop(heap)
+        if (steps != dist[cell]): continue   #a cheaper way was found since
+        #(only the targets are 0 steps away)
+        if (blocked != None) and (steps != 0) and blocked[cell]: continue
+
+        #every neighbor can reach the target by moving onto this cell
+        newSteps = steps + costs[cell]
+        for adj in ADJACENT_CELLS[cell]:
+            if (dist[adj] == -1) or (newSteps < dist[adj]):
+                dist[adj] = newSteps
+                heapq.heappush(heap, (newSteps, adj))
+
+    return tuple(tuple(dist[x * BOARD_LENGTH : (x + 1) * BOARD_LENGTH])
+                 for x in xrange(0, BOARD_LENGTH))
+
+##
+# distanceField
+#
+# finds the cheapest cost (in movement, see stepsToReach) of moving from
+# every cell to a given target.  The result is cached per terrain layout
+# unless ants are avoided.
+#
+#Parameters:
+#   currentState   - The state of the game (GameState)
+#   target         - the cell to reach (an x,y coord)
+#   avoidAnts      - if True, paths may not pass through cells with an ant
+#                    on them (other than the first and the target)
+#
+# Return: [x][y] the cost from each cell to the target (-1 if it can't be
+# reached)
+def distanceField(currentState, target, avoidAnts=False):
+    key = terrainKey(currentState)
+    targetCell = target[0] * BOARD_LENGTH + target[1]
+
+    if avoidAnts:
+        blocked = [False] * len(CELL_COORDS)
+        for inv in currentState.inventories:
+            for ant in inv.ants:
+                blocked[ant.coords[0] * BOARD_LENGTH + ant.coords[1]] = True
+        return computeDistanceField(terrainCosts(key), [targetCell], blocked)
+
+    (costs, fields, trees) = terrainEntry(key)
+    if fields[targetCell] == None:
+        fields[targetCell] = computeDistanceField(costs, [targetCell])
+    return fields[targetCell]
+
+##
+# terrainEntry
+#
+# Return: the (costs, fields, trees) kept in terrainFields for a terrain
+# layout (made, with no fields or trees yet, if there isn't one)
+#
+def terrainEntry(key):
+    if key is lastTerrain[0]:
+        return lastTerrain[1]
+    entry = terrainFields.get(key)
+    if entry == None:
+        if (len(terrainFields) >= TERRAIN_CACHE_SIZE):
+            clearTerrainFields()
+        entry = (terrainCosts(key), [None] * len(CELL_COORDS), [None] * len(CELL_COORDS))
+        terrainFields[key] = entry
+    lastTerrain[0] = key
+    lastTerrain[1] = entry
+    return entry
+
+##
+# routeTree
+#
+# finds, for every cell, the neighbors that an ant can step onto next when
+# taking a shortest route (in movement, ignoring ants) to a target: those
+# whose distance to the target plus the cost of stepping onto them is the
+# cell's own distance.  Following them from any cell always leads to the
+# target along a shortest route.  Like the distance field, the result is
+# cached per terrain layout.
+#
+#Parameters:
+#   currentState   - The state of the game (GameState)
+#   target         - the cell to reach (an x,y coord)
+#
+# Return: [cell index] a tuple of the cell indices of the next steps (empty
+# for the target and for cells that can't reach it)
+def routeTree(currentState, target):
+    key = terrainKey(currentState)
+    targetCell = target[0] * BOARD_LENGTH + target[1]
+    (costs, fields, trees) = terrainEntry(key)
+    if trees[targetCell] == None:
+        field = distanceField(currentState, target)
+        dist = [field[coord[0]][coord[1]] for coord in CELL_COORDS]
+        trees[targetCell] = tuple(tuple(adj for adj in ADJACENT_CELLS[cell]
+                                        if (dist[adj] != -1) and
+                                           (dist[adj] + costs[adj] == dist[cell]))
+                                  for cell in xrange(0, len(CELL_COORDS)))
+    return trees[targetCell]
+
+##
+# pathToward
+#
+# finds the legal path (for an ant with the given movement) that gets as
+# close as possible to a target while staying on a shortest route to it
+# (see routeTree), so an ant walking toward something doesn't need every
+# path it could take to be listed and compared.  The path can't pass through
+# (or end on) a cell with an ant on it, so if an ant blocks every shortest
+# route the path stops short of it.
+#
+#Parameters:
+#   currentState   - The state of the game (GameState)
+#   fromCoord      - where the ant is (an x,y coord)
+#   target         - the cell to get to (an x,y coord)
+#   movement       - movement points the ant has
+#   queen          - if True, the path is kept inside the queen's territory
+#                    (see isPathOkForQueen)
+#
+# Return: a list of coords (tuples) starting at fromCoord, suitable for a
+# MOVE_ANT Move.  This is just [fromCoord] if the ant can't get any closer.
+def pathToward(currentState, fromCoord, target, movement, queen=False):
+    start = (fromCoord[0], fromCoord[1])
+    tree = routeTree(currentState, target)
+    costs = terrainEntry(terrainKey(currentState))[0]
+
+    #walk the route tree (every way through it to a cell costs the same) to
+    #the cell that has spent the most movement, so is the nearest the target
+    spent = { start : 0 }
+    previous = { start : None }
+    best = start
+    waiting = [start]
+    while (len(waiting) > 0):
+        cell = waiting.pop()
+        for nextCell in tree[cell[0] * BOARD_LENGTH + cell[1]]:
+            newCoord = CELL_COORDS[nextCell]
+            newCost = spent[cell] + costs[nextCell]
+            if (newCost > movement) or (newCoord in spent): continue
+            if queen and not QUEEN_TERRITORY[newCoord[0]][newCoord[1]]: continue
+            if (getAntAt(currentState, newCoord) != None): continue
+            spent[newCoord] = newCost
+            previous[newCoord] = cell
+            waiting.append(newCoord)
+            if (newCost > spent[best]):
+                best = newCoord
+
+    path = [best]
+    while (previous[path[-1]] != None):
+        path.append(previous[path[-1]])
+    path.reverse()
+    return path
+
+##
+# Nearest-target fields
+#
+# Evaluation functions often want the distance from each of their ants to
+# the nearest of some set of targets (food, drop-off points, enemy ants...).
+# nearestManhattanField and nearestDistanceField work that out for every cell
+# at once, so the distance for each ant is just field[x][y].  The fields are
+# cached by the set of targets (and, for move costs, the terrain) so they are
+# only rebuilt when the targets change.
+#
+#   MANHATTAN       - [cell index][cell index] the Manhattan distance between
+#                     two cells
+#   manhattanFields - {targets key: field}
+#   nearestFields   - {terrain key: {targets key: field}} (see terrainFields)
+#   NEAREST_CACHE_SIZE - the most fields kept per cache (all of them are
+#                        dropped when there are more)
+#
+MANHATTAN = tuple(tuple(abs(coord[0] - other[0]) + abs(coord[1] - other[1])
+                        for other in CELL_COORDS)
+                  for coord in CELL_COORDS)
+manhattanFields = {}
+nearestFields = {}
+NEAREST_CACHE_SIZE = 512
+
+##
+# targetsKey
+#
+# Return: the targets as a sorted tuple of cell indices (the same for any
+# order or repetition of the same coords)
+#
+def targetsKey(targets):
+    return tuple(sorted(set([target[0] * BOARD_LENGTH + target[1] for target in targets])))
+
+##
+# nearestManhattanField
+#
+# finds the Manhattan distance (every move costing 1) from every cell to the
+# nearest of a set of targets
+#
+#Parameters:
+#   targets - a list of x,y coords
+#
+# Return: [x][y] the distance from each cell to the nearest target (-1
+# everywhere if there are no targets)
+def nearestManhattanField(targets):
+    key = targetsKey(targets)
+    field = manhattanFields.get(key)
+    if field == None:
+        if (len(manhattanFields) >= NEAREST_CACHE_SIZE):
+            manhattanFields.clear()
+        if (len(key) == 0):
+            dist = [-1] * len(CELL_COORDS)
+        elif (len(key) == 1):
+            dist = MANHATTAN[key[0]]
+        else:
+            #the smallest of the targets' distances, cell by cell
+            dist = map(min, *[MANHATTAN[target] for target in key])
+        field = tuple(tuple(dist[x * BOARD_LENGTH : (x + 1) * BOARD_LENGTH])
+                      for x in xrange(0, BOARD_LENGTH))
+        manhattanFields[key] = field
+    return field
+
+##
+# nearestDistanceField
+#
+# finds the cheapest cost (in movement, like distanceField) of moving from
+# every cell to the nearest of a set of targets.  Ants are ignored.
+#
+#Parameters:
+#   currentState - The state of the game (GameState)
+#   targets      - a list of x,y coords
+#
+# Return: [x][y] the cost from each cell to the nearest target (-1
+# everywhere if there are no targets)
+def nearestDistanceField(currentState, targets):
+    key = targetsKey(targets)
+    if (len(key) == 1):
+        return distanceField(currentState, CELL_COORDS[key[0]])
+    terrain = terrainKey(currentState)
+    fields = nearestFields.get(terrain)
+    if fields == None:
+        if (len(nearestFields) >= TERRAIN_CACHE_SIZE):
+            nearestFields.clear()
+        fields = {}
+        nearestFields[terrain] = fields
+    field = fields.get(key)
+    if field == None:
+        if (len(fields) >= NEAREST_CACHE_SIZE):
+            fields.clear()
+        field = computeDistanceField(terrainCosts(terrain), key)
+        fields[key] = field
+    return field
+
 ##
 # stepsToReach
 #
-# estimates the shortest distance between two cells taking
-# movement costs into account.
+# calculates the shortest distance between two cells taking
+# movement costs into account (ants are ignored).  This is a lookup in
+# distanceField.
 #
 #Parameters:
 #   currentState   - The state of the game (GameState)
@@ -277,41 +830,7 @@ def stepsToReach(currentState, src, dst):
     if (not legalCoord(src)): return -1
     if (not legalCoord(dst)): return -1
 
-    #a dictionary of already visted cells and the corresponding cost to reach
-    visited = { src : 0 }
-    #a list of to be processed cells
-    queue = [ src ]
-
-    #this loops processes cells in the queue until it is empty
-    while(len(queue) > 0):
-        cell = queue.pop(0)
-
-        #if this cell is our destination we are done
-        if (cell == dst):
-            return visited[cell]
-
-        #calc distance to all cells adj to this one assuming we reach them
-        #from this one
-        nextSteps = listAdjacent(cell)
-        for newCell in nextSteps:
-            constrAtDest = getConstrAt(currentState, newCell)
-            cost = 1  #default
-            if constrAtDest != None:
-                cost = CONSTR_STATS[constrAtDest.type][MOVE_COST]
-            dist = visited[cell] + cost
-
-            #if the new distance is best so far, update the visited dict
-            if (visited.has_key(newCell)):
-                if (dist < visited[newCell]):
-                    visited[newCell] = dist
-            #if we've never seen this cell before also update dict and
-            #enqueue this new cell to be processed at a future loop iteration
-            else:
-                visited[newCell] = dist
-                queue.append(newCell)
-
-    #we should never reach this point
-    return -1
+    return distanceField(currentState, dst)[src[0]][src[1]]
 
 ##
 # listAllBuildMoves
@@ -349,9 +868,6 @@ def listAllBuildMoves(currentState):
             #see if there is adj food
             inTheClear = True   #assume ok to build until proven otherwise
             for coord in listAdjacent(ant.coords):
-                if (not legalCoord((coord[0],coord[1]))):
-                    continue
-
                 #is there food here?
                 constrHere = getConstrAt(currentState, coord)
                 if (constrHere != None) and (constrHere.type == FOOD):
@@ -378,8 +894,7 @@ def listAllBuildMoves(currentState):
 #
 def isPathOkForQueen(path):
     for coord in path:
-        if (coord[1] == BOARD_LENGTH / 2 - 1) \
-        or (coord[1] == BOARD_LENGTH / 2):
+        if not QUEEN_TERRITORY[coord[0]][coord[1]]:
             return False
     return True
     
@@ -391,9 +906,16 @@ def isPathOkForQueen(path):
 #
 # Parameters:
 #   currentState - the current state
+#   uniqueDest   - if True, only one (cheapest) move is listed per ant per
+#                  destination (see listCheapestMovementPaths).  Otherwise
+#                  every path is listed.
+#   prune        - if True, moves that make no difference to the game are
+#                  left out (see listPrunedMovementPaths)
+#   stats        - a dict to count the moves left out in (see Move pruning),
+#                  or None
 #
 # Returns:  a list of Move objects
-def listAllMovementMoves(currentState):
+def listAllMovementMoves(currentState, uniqueDest=False, prune=False, stats=None):
     result = []
 
     #first get all MOVE_ANT moves for each ant in the inventory
@@ -402,18 +924,25 @@ def listAllMovementMoves(currentState):
         #skip ants that have already moved
         if (ant.hasMoved): continue
 
-        #create a Move object for each valid movement path
-        allPaths = listAllMovementPaths(currentState,
-                                        ant.coords,
-                                        UNIT_STATS[ant.type][MOVEMENT])
-
-        #remove moves that take the queen out of her territory
-        if (ant.type == QUEEN):
-            tmpList = []
-            for path in allPaths:
-                if (isPathOkForQueen(path)):
-                    tmpList.append(path)
-            allPaths = tmpList
+        if prune:
+            allPaths = listPrunedMovementPaths(currentState, ant, uniqueDest, stats)
+        elif uniqueDest:
+            allPaths = listCheapestMovementPaths(currentState,
+                                                 ant.coords,
+                                                 UNIT_STATS[ant.type][MOVEMENT],
+                                                 ant.type == QUEEN)
+        else:
+            allPaths = listAllMovementPaths(currentState,
+                                            ant.coords,
+                                            UNIT_STATS[ant.type][MOVEMENT])
+
+            #remove moves that take the queen out of her territory
+            if (ant.type == QUEEN):
+                tmpList = []
+                for path in allPaths:
+                    if (isPathOkForQueen(path)):
+                        tmpList.append(path)
+                allPaths = tmpList
 
         #construct the list of moves using the paths
         for path in allPaths:
@@ -430,16 +959,336 @@ def listAllMovementMoves(currentState):
 #
 # Parameters:
 #   currentState - the current state
+#   uniqueDest   - if True, only one movement move is listed per ant per
+#                  destination (see listAllMovementMoves)
+#   prune        - if True, movement moves that make no difference to the
+#                  game are left out (see listAllMovementMoves)
+#   stats        - see listAllMovementMoves
 #
 # Returns:  a list of Move objects
-def listAllLegalMoves(currentState):
+def listAllLegalMoves(currentState, uniqueDest=False, prune=False, stats=None):
     result = []
-    result.extend(listAllMovementMoves(currentState))
+    result.extend(listAllMovementMoves(currentState, uniqueDest, prune, stats))
     result.extend(listAllBuildMoves(currentState))
     result.append(Move(END, None, None))
     return result
 
 
+#orders iterLegalMoves can yield moves in
+MOVES_FIRST = 0     #movement moves, then builds (as listAllLegalMoves)
+BUILDS_FIRST = 1    #builds, then movement moves
+ATTACKS_FIRST = 2   #movement moves ending in range of an enemy ant, then
+                    #the other movement moves, then builds
+
+##
+# iterLegalMoves
+#
+# a generator version of listAllLegalMoves.  Moves are made as they are
+# asked for (one ant at a time), so a caller that stops early (on finding a
+# winning move, or when it runs out of time) doesn't pay for listing them
+# all.  END always comes last.
+#
+# Parameters:
+#   currentState - the current state
+#   order        - MOVES_FIRST, BUILDS_FIRST or ATTACKS_FIRST
+#   uniqueDest   - if True, only one movement move is listed per ant per
+#                  destination (see listAllMovementMoves)
+#   prune        - see listAllLegalMoves
+#   stats        - see listAllLegalMoves
+#
+# Yields:  Move objects (the same ones listAllLegalMoves lists)
+def iterLegalMoves(currentState, order=MOVES_FIRST, uniqueDest=False, prune=False, stats=None):
+    if (order == BUILDS_FIRST):
+        for move in listAllBuildMoves(currentState):
+            yield move
+
+    #moves that don't end in range of an enemy (for ATTACKS_FIRST)
+    held = []
+    myInv = getCurrPlayerInventory(currentState)
+    enemyInv = currentState.inventories[1 - currentState.whoseTurn]
+    for ant in myInv.ants:
+        #skip ants that have already moved
+        if (ant.hasMoved): continue
+
+        movement = UNIT_STATS[ant.type][MOVEMENT]
+        if prune:
+            paths = listPrunedMovementPaths(currentState, ant, uniqueDest, stats)
+        elif uniqueDest:
+            paths = listCheapestMovementPaths(currentState, ant.coords, movement,
+                                              ant.type == QUEEN)
+        else:
+            paths = listAllMovementPaths(currentState, ant.coords, movement)
+            #remove moves that take the queen out of her territory
+            if (ant.type == QUEEN):
+                paths = [path for path in paths if isPathOkForQueen(path)]
+
+        attackRange = UNIT_STATS[ant.type][RANGE] ** 2
+        for path in paths:
+            move = Move(MOVE_ANT, path, None)
+            if (order != ATTACKS_FIRST):
+                yield move
+                continue
+            endCoord = path[-1]
+            for enemy in enemyInv.ants:
+                diffX = endCoord[0] - enemy.coords[0]
+                diffY = endCoord[1] - enemy.coords[1]
+                if (attackRange >= diffX * diffX + diffY * diffY):
+                    yield move
+                    break
+            else:
+                held.append(move)
+
+    for move in held:
+        yield move
+    if (order != BUILDS_FIRST):
+        for move in listAllBuildMoves(currentState):
+            yield move
+    yield Move(END, None, None)
+
+
+##
+# Legal move cache
+#
+# Search players often list the moves of the same position more than once
+# (e.g. each sub-move of a turn is a separate getMove, and the position after
+# the last one was usually expanded while choosing it).  cachedLegalMoves
+# keeps the most recently used lists of legal moves keyed by the Zobrist hash
+# of the position (see Zobrist.py).
+#
+#   legalMoveCache      - {(hash, uniqueDest, prune): tuple of FrozenMoves},
+#                         least recently used first
+#   legalMoveCacheStats - {"hits": int, "misses": int}
+#   LEGAL_MOVE_CACHE_SIZE - the most positions kept
+#
+legalMoveCache = OrderedDict()
+legalMoveCacheStats = { "hits" : 0, "misses" : 0 }
+LEGAL_MOVE_CACHE_SIZE = 4096
+
+##
+# cachedLegalMoves
+#
+# the same moves as listAllLegalMoves, from the cache if the position has
+# been seen recently.  The moves are shared by everyone who gets them from
+# the cache, so they are FrozenMoves (their coordLists are tuples, and
+# changing them raises AttributeError).
+#
+# Parameters:
+#   currentState - the current state (GameState or StateView)
+#   uniqueDest   - see listAllLegalMoves
+#   prune        - see listAllLegalMoves
+#   key          - the Zobrist hash of the state (optional).  States that
+#                  AIs have changed by hand may carry an out of date hash, so
+#                  it is worked out afresh unless the caller knows it (e.g.
+#                  state.getHash() for a state only changed with applyMove).
+#
+# Returns:  a tuple of FrozenMove objects
+def cachedLegalMoves(currentState, uniqueDest=False, key=None, prune=False):
+    if key == None:
+        if type(currentState) is StateView:
+            key = currentState.getHash()
+        else:
+            key = Zobrist.hashState(currentState)
+    key = (key, uniqueDest, prune)
+
+    moves = legalMoveCache.pop(key, None)
+    if moves == None:
+        legalMoveCacheStats["misses"] += 1
+        moves = tuple([FrozenMove(move.moveType, move.coordList, move.buildType)
+                       for move in listAllLegalMoves(currentState, uniqueDest, prune)])
+        if (len(legalMoveCache) >= LEGAL_MOVE_CACHE_SIZE):
+            legalMoveCache.popitem(last=False)
+    else:
+        legalMoveCacheStats["hits"] += 1
+    #(re)insert it as the most recently used
+    legalMoveCache[key] = moves
+    return moves
+
+##
+# clearLegalMoveCache
+#
+# empties the legal move cache and resets its hit and miss counts
+#
+def clearLegalMoveCache():
+    legalMoveCache.clear()
+    legalMoveCacheStats["hits"] = 0
+    legalMoveCacheStats["misses"] = 0
+
+
+##
+# getNextStateAdversarial
+#
+# returns the state that results from the current player making a move,
+# exactly as the Game would make it (see GameState.applyMove): a moved ant
+# is marked as moved and attacks an enemy in range, builds are paid for, and
+# END does the end of turn bookkeeping (food pickup and drop-off, building
+# capture, resetting hasMoved) and passes the turn to the opponent.  The
+# state passed in is not changed.
+#
+# Parameters:
+#   currentState - the state before the move (GameState)
+#   move         - a legal Move for the player whose turn it is
+#   attackCoord  - the enemy to attack after a MOVE_ANT if more than one is
+#                  in range (optional: the first in range is attacked, since
+#                  the Game would ask the player's getAttack)
+#
+# Return: a new GameState
+def getNextStateAdversarial(currentState, move, attackCoord=None):
+    nextState = currentState.fastclone()
+    nextState.applyMove(move, attackCoord)
+    return nextState
+
+##
+# getNextState
+#
+# the same as getNextStateAdversarial except that after END it is the same
+# player's turn again (as if the opponent did nothing), for AIs that only
+# look ahead at their own moves
+#
+# Parameters:
+#   currentState - the state before the move (GameState)
+#   move         - a legal Move for the player whose turn it is
+#   attackCoord  - see getNextStateAdversarial (optional)
+#
+# Return: a new GameState
+def getNextState(currentState, move, attackCoord=None):
+    nextState = getNextStateAdversarial(currentState, move, attackCoord)
+    if (move.moveType == END):
+        nextState.whoseTurn = currentState.whoseTurn
+        nextState.rehash()
+    return nextState
+
+
+##
+# Turn plans
+#
+# A turn is a series of MOVE_ANT and BUILD sub-moves ended by END, and most
+# sub-moves don't affect each other: moving ant A then ant B ends the same
+# as moving B then A.  iterTurnPlans lists the different ways a turn can end
+# without trying every order of the same sub-moves.  Two sub-moves are
+# independent if the cells they use (the path, or the cell built on, plus
+# the enemies in attack range at the end of a path) don't overlap and they
+# aren't both builds (which share the food).  Sub-moves are only listed in
+# order of subMoveKey unless a sub-move depends on one after it (so a plan
+# is never a reordering of independent sub-moves of another plan).
+#
+
+##
+# subMoveKey
+#
+# Return: a key that orders the sub-moves of a turn (ants' moves by where
+# they start, then builds)
+#
+def subMoveKey(move):
+    if (move.moveType == MOVE_ANT):
+        return (0, move.coordList[0])
+    return (1, move.coordList[0], move.buildType)
+
+##
+# subMoveCells
+#
+# Return: the set of cells a sub-move uses in a given state (see Turn plans)
+#
+def subMoveCells(currentState, move):
+    cells = set(move.coordList)
+    if (move.moveType == MOVE_ANT):
+        ant = getAntAt(currentState, move.coordList[0])
+        endCoord = move.coordList[-1]
+        attackRange = UNIT_STATS[ant.type][RANGE] ** 2
+        for enemy in currentState.inventories[1 - currentState.whoseTurn].ants:
+            diffX = endCoord[0] - enemy.coords[0]
+            diffY = endCoord[1] - enemy.coords[1]
+            if (attackRange >= diffX * diffX + diffY * diffY):
+                cells.add(enemy.coords)
+    return cells
+
+##
+# iterTurnPlans
+#
+# a generator of the different ways the current player's turn can end.
+# Each plan is a list of sub-moves ending with END, yielded with the state
+# after it (so it is the opponent's turn in that state).  Plans are found
+# depth first (the plan of just ending the turn comes first), movement
+# sub-moves use one cheapest path per destination (see
+# listCheapestMovementPaths) and an ant that ends in range of enemies
+# attacks the first of them (as GameState.applyMove does).  No two plans
+# yielded end in the same state.
+#
+# Parameters:
+#   currentState - the state at the start of (or during) the turn
+#   maxPlans     - the most plans to yield (optional, default all of them;
+#                  there can be a great many)
+#
+# Yields: (plan, state) pairs: a list of Moves and a new GameState
+def iterTurnPlans(currentState, maxPlans=None):
+    state = currentState.fastclone()
+    state.rehash()
+    endMove = Move(END, None, None)
+
+    #the sub-moves made so far, applyMove's undo tokens for them and the
+    #cells each of them used
+    plan = []
+    undos = []
+    planCells = []
+    #for each sub-move made (and the start): the sub-moves left to try after
+    #it, with the cells they use
+    pending = [iter(nextSubMoves(state, plan, planCells))]
+    #the hashes of the states the plans yielded so far end in
+    seen = set()
+
+    while True:
+        #end the turn after the plan so far
+        token = state.applyMove(endMove)
+        if state.getHash() not in seen:
+            seen.add(state.getHash())
+            yield (plan + [endMove], state.fastclone())
+            if (maxPlans != None) and (len(seen) >= maxPlans): return
+        state.undoMove(token)
+
+        #find the next sub-move to try, backing up when there are none left
+        nextMove = None
+        while (len(pending) > 0):
+            nextMove = next(pending[-1], None)
+            if (nextMove != None): break
+            pending.pop()
+            if (len(plan) > 0):
+                plan.pop()
+                planCells.pop()
+                state.undoMove(undos.pop())
+        if (nextMove == None): return
+
+        (move, cells) = nextMove
+        undos.append(state.applyMove(move))
+        plan.append(move)
+        planCells.append(cells)
+        pending.append(iter(nextSubMoves(state, plan, planCells)))
+
+##
+# nextSubMoves
+#
+# a helper for iterTurnPlans: lists the sub-moves that may follow a plan
+# (those that are in order after it or depend on one of its sub-moves that
+# they would otherwise come before)
+#
+# Return: a list of (move, cells) pairs
+def nextSubMoves(state, plan, planCells):
+    result = []
+    for move in listAllLegalMoves(state, True):
+        if (move.moveType == END): continue
+        cells = subMoveCells(state, move)
+        key = subMoveKey(move)
+        for i in xrange(len(plan) - 1, -1, -1):
+            #it depends on this sub-move, so must come after it
+            if (cells & planCells[i]) or \
+               (move.moveType == BUILD and plan[i].moveType == BUILD):
+                break
+            #it could be made before this sub-move instead, to the same end
+            if (key < subMoveKey(plan[i])):
+                cells = None
+                break
+        if (cells != None):
+            result.append((move, cells))
+    return result
+
 
 ##
 # Return: a reference to the inventory of the player whose turn it is
@@ -25,8 +25,15 @@ UNIT_STATS.append((1, 2, 1, 3, 2)) #Ranged soldier
 #   hasMoved - A boolean representing if the ant has moved yet this turn
 #   carrying - A boolean representing if the Ant's carrying food or not.
 #   player - The id of the player that owns the Ant
+#   coordIndex - The coordinate index (a dict of coords to Ants) of the
+#       GameState this Ant belongs to, if that state has built one.  It is
+#       updated whenever the Ant's coords change.  See GameState.getAntAt.
+#   cowToken - Marks which copy-on-write Inventory this Ant belongs to (see
+#       Inventory.owns).  None for Ants that aren't in one.
 ##
 class Ant(object):
+
+    __slots__ = ('coordIndex', 'cowToken', '_coords', 'type', 'hasMoved', 'carrying', 'player', 'health')
     
     ##
     #__init__
@@ -38,13 +45,33 @@ class Ant(object):
     #   inputPlayer - The id of the player that owns the Ant (int)
     ##
     def __init__(self, inputCoords, inputType, inputPlayer):
-        self.coords = inputCoords
+        self.coordIndex = None
+        self.cowToken = None
+        self._coords = inputCoords
         self.type = inputType
         self.hasMoved = False
         self.carrying = False
         self.player = inputPlayer
         self.health = UNIT_STATS[self.type][HEALTH]
 
+    ##
+    #coords
+    #Description: The Ant's position.  Setting it keeps the owning state's
+    #   coordinate index up to date.
+    ##
+    def getCoords(self):
+        return self._coords
+
+    def setCoords(self, newCoords):
+        index = self.coordIndex
+        if index != None:
+            if index.get(self._coords) is self:
+                del index[self._coords]
+            index[newCoords] = self
+        self._coords = newCoords
+
+    coords = property(getCoords, setCoords)
+
     def clone(self):
         rtnAnt = Ant(self.coords, self.type, self.player)
         rtnAnt.hasMoved = self.hasMoved
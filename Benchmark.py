@@ -0,0 +1,918 @@
+import sys, time, random, timeit
+from Constants import *
+from Ant import Ant, UNIT_STATS
+from Construction import Construction, CONSTR_STATS
+from Building import Building
+from Inventory import Inventory
+from GameState import GameState
+import CompactState, StateCodec
+from StateView import StateView
+from Move import Move
+from HeadlessGame import HeadlessGame
+from Tournament import Tournament
+from TimedPlayer import TimedPlayer
+import multiprocessing
+from AIPlayerUtils import listAllLegalMoves
+import AIPlayerUtils
+
+##
+# Benchmark.py
+#
+# Micro-benchmarks for the game state and AI utility code.  None of these
+# need pygame, so they can be run on a headless machine:
+#
+#            python Benchmark.py [<benchmarkName> ...]
+#
+# Running with no arguments runs every benchmark.  These only time the code;
+# the checks that it is right are in Tests.py.
+#
+
+##
+# sampleState
+#
+# Description: builds a reproducible mid-game GameState (without a board)
+# with both players' setup pieces, a handful of ants each and some food.
+#
+# Parameters:
+#   seed - the random seed to use
+#
+# Return: a GameState in the PLAY_PHASE
+#
+def sampleState(seed=0):
+    rand = random.Random(seed)
+    inventories = [Inventory(PLAYER_ONE, [], [], 4),
+                   Inventory(PLAYER_TWO, [], [], 3),
+                   Inventory(NEUTRAL, [], [], 0)]
+    taken = set()
+
+    #pick a free cell in the given rows
+    def freeCell(rows):
+        while True:
+            coord = (rand.randint(0, BOARD_LENGTH - 1), rand.choice(rows))
+            if coord not in taken:
+                taken.add(coord)
+                return coord
+
+    for player in [PLAYER_ONE, PLAYER_TWO]:
+        home = range(0, 4) if player == PLAYER_ONE else range(6, 10)
+        away = range(6, 10) if player == PLAYER_ONE else range(0, 4)
+        inv = inventories[player]
+        inv.constrs.append(Building(freeCell(home), ANTHILL, player))
+        inv.constrs.append(Building(freeCell(home), TUNNEL, player))
+        for i in xrange(0, 9):
+            inventories[NEUTRAL].constrs.append(Construction(freeCell(home), GRASS))
+        for i in xrange(0, 2):
+            inventories[NEUTRAL].constrs.append(Construction(freeCell(away), FOOD))
+
+    #ants go anywhere that doesn't already have an ant on it
+    antCells = set()
+    for player in [PLAYER_ONE, PLAYER_TWO]:
+        inv = inventories[player]
+        inv.ants.append(Ant(inv.getAnthill().coords, QUEEN, player))
+        antCells.add(inv.getAnthill().coords)
+    for player in [PLAYER_ONE, PLAYER_TWO]:
+        inv = inventories[player]
+        for antType in [WORKER, WORKER, DRONE, SOLDIER, R_SOLDIER]:
+            coord = (rand.randint(0, 9), rand.randint(0, 9))
+            while coord in antCells:
+                coord = (rand.randint(0, 9), rand.randint(0, 9))
+            antCells.add(coord)
+            ant = Ant(coord, antType, player)
+            ant.carrying = (antType == WORKER) and rand.random() < 0.5
+            inv.ants.append(ant)
+
+    return GameState(None, inventories, PLAY_PHASE, PLAYER_ONE)
+
+##
+# deepSizeOf
+#
+# Description: estimates the number of bytes used by an object graph.
+# Objects whose ids are in 'exclude' (and anything only reachable through
+# them) are not counted, which lets us measure what a clone adds on top of
+# the original.  Small ints, bools and None are shared by the interpreter
+# and are never counted.
+#
+def deepSizeOf(obj, exclude=frozenset()):
+    seen = set(exclude)
+    total = 0
+    stack = [obj]
+    while stack:
+        item = stack.pop()
+        if id(item) in seen or item is None or type(item) in (bool, int):
+            continue
+        seen.add(id(item))
+        total += sys.getsizeof(item)
+        if isinstance(item, dict):
+            stack.extend(item.keys())
+            stack.extend(item.values())
+        elif isinstance(item, (list, tuple, set, frozenset)):
+            stack.extend(item)
+        if hasattr(item, '__dict__'):
+            stack.append(item.__dict__)
+        for cls in type(item).__mro__:
+            for name in getattr(cls, '__slots__', ()):
+                if hasattr(item, name):
+                    stack.append(getattr(item, name))
+    return total
+
+##
+# allIds
+#
+# Return: the set of ids of every object reachable from obj
+#
+def allIds(obj):
+    seen = set()
+    stack = [obj]
+    while stack:
+        item = stack.pop()
+        if id(item) in seen:
+            continue
+        seen.add(id(item))
+        if isinstance(item, dict):
+            stack.extend(item.keys())
+            stack.extend(item.values())
+        elif isinstance(item, (list, tuple, set, frozenset)):
+            stack.extend(item)
+        if hasattr(item, '__dict__'):
+            stack.append(item.__dict__)
+        for cls in type(item).__mro__:
+            for name in getattr(cls, '__slots__', ()):
+                if hasattr(item, name):
+                    stack.append(getattr(item, name))
+    return seen
+
+##
+# timePerCall
+#
+# Return: the best average seconds per call of func over a few repeats
+#
+def timePerCall(func, number=2000, repeat=3):
+    return min(timeit.repeat(func, number=number, repeat=repeat)) / number
+
+##
+# report
+#
+# prints one benchmark result line
+#
+def report(label, seconds, extra=""):
+    print "  %-40s %10.2f us/call %12.0f calls/s %s" % \
+        (label, seconds * 1e6, 1.0 / seconds, extra)
+
+##
+# benchClone
+#
+# compares GameState.fastclone against CompactState.clone
+#
+def benchClone():
+    print "clone: GameState.fastclone vs CompactState.clone"
+    state = sampleState()
+    compact = CompactState.fromGameState(state)
+
+    fastcloneBytes = deepSizeOf(state.fastclone(), allIds(state))
+    compactBytes = deepSizeOf(compact.clone(), allIds(compact))
+    report("GameState.fastclone", timePerCall(state.fastclone),
+           "%6d bytes/state" % fastcloneBytes)
+    report("CompactState.clone", timePerCall(compact.clone, number=100000),
+           "%6d bytes/state" % compactBytes)
+    report("CompactState.fromGameState",
+           timePerCall(lambda: CompactState.fromGameState(state)))
+    report("CompactState.toGameState", timePerCall(compact.toGameState))
+
+##
+# searchClone / searchMakeUnmake
+#
+# depth-first walks of the move tree that count the nodes visited, using
+# fastclone per child or applyMove/undoMove respectively
+#
+def searchClone(state, depth):
+    if depth == 0:
+        return 1
+    nodes = 1
+    for move in listAllLegalMoves(state):
+        child = state.fastclone()
+        child.applyMove(move)
+        nodes += searchClone(child, depth - 1)
+    return nodes
+
+def searchMakeUnmake(state, depth):
+    if depth == 0:
+        return 1
+    nodes = 1
+    for move in listAllLegalMoves(state):
+        token = state.applyMove(move)
+        nodes += searchMakeUnmake(state, depth - 1)
+        state.undoMove(token)
+    return nodes
+
+##
+# benchMakeUnmake
+#
+# compares the nodes/sec of a depth-2 search using fastclone per child and
+# using applyMove/undoMove
+#
+def benchMakeUnmake():
+    print "search: fastclone per child vs applyMove/undoMove"
+    state = sampleState()
+    for (label, search) in [("fastclone + applyMove", searchClone),
+                            ("applyMove/undoMove", searchMakeUnmake)]:
+        nodes = search(state, 2)
+        seconds = timePerCall(lambda: search(state, 2), number=1, repeat=3)
+        print "  %-40s %10.0f nodes/s (%d nodes)" % (label, nodes / seconds, nodes)
+
+##
+# benchLegalMoves
+#
+# times move generation on the sample mid-game position for each player
+#
+def benchLegalMoves():
+    print "move generation: listAllLegalMoves"
+    state = sampleState()
+    for player in [PLAYER_ONE, PLAYER_TWO]:
+        state.whoseTurn = player
+        report("listAllLegalMoves (player %d)" % player,
+               timePerCall(lambda: listAllLegalMoves(state), number=200),
+               "%4d moves" % len(listAllLegalMoves(state)))
+
+##
+# searchTree
+#
+# Description: expands the move tree to the given depth keeping every node
+# (and its state) alive, the way the minimax AIs do with their treeNode dicts
+#
+# Return: the list of every node in the tree
+#
+def searchTree(state, depth):
+    nodes = []
+    frontier = [{"move": None, "potential_state": state, "parent_node": None}]
+    for level in xrange(0, depth):
+        children = []
+        for node in frontier:
+            for move in listAllLegalMoves(node["potential_state"]):
+                child = node["potential_state"].fastclone()
+                child.applyMove(move)
+                children.append({"move": move, "potential_state": child, "parent_node": node})
+        nodes.extend(children)
+        frontier = children
+    return nodes
+
+##
+# PlainObject / unslotted
+#
+# Description: copies an object graph, making every object whose class has
+# __slots__ a PlainObject that holds the same variables in a __dict__ (as
+# the game objects did before they had __slots__), to measure what the
+# slots save
+#
+# Parameters:
+#   obj - the object graph to copy
+#   memo - {id: copy} of the objects copied so far (objects shared between
+#          graphs copied with the same memo stay shared)
+#
+class PlainObject(object):
+    pass
+
+def unslotted(obj, memo):
+    if id(obj) in memo:
+        return memo[id(obj)]
+    slots = [name for cls in type(obj).__mro__ for name in getattr(cls, '__slots__', ())]
+    if isinstance(obj, list):
+        copy = []
+        memo[id(obj)] = copy
+        copy.extend([unslotted(item, memo) for item in obj])
+    elif isinstance(obj, tuple):
+        items = [unslotted(item, memo) for item in obj]
+        #(a tuple of coords is kept, as it is shared with the original)
+        copy = obj if all([item is original for (item, original) in zip(items, obj)]) else tuple(items)
+        memo[id(obj)] = copy
+    elif isinstance(obj, dict):
+        copy = {}
+        memo[id(obj)] = copy
+        for (key, value) in obj.items():
+            copy[unslotted(key, memo)] = unslotted(value, memo)
+    elif slots:
+        copy = PlainObject()
+        memo[id(obj)] = copy
+        for name in slots:
+            if hasattr(obj, name):
+                copy.__dict__[name] = unslotted(getattr(obj, name), memo)
+    else:
+        return obj
+    return copy
+
+##
+# benchMemory
+#
+# measures the memory kept alive by a fixed depth-2 search tree and the
+# clone throughput of each of the game object classes.  (tracemalloc isn't
+# available in Python 2 so the tree is measured with deepSizeOf.)  The sizes
+# are given for the game objects as they are and for plain-object copies of
+# them (see unslotted), which is what they took before they had __slots__.
+#
+def benchMemory():
+    print "memory: retained search tree and object clone throughput"
+    state = sampleState()
+    nodes = searchTree(state, 2)
+    treeBytes = deepSizeOf(nodes, allIds(state))
+    memo = {}
+    plainState = unslotted(state, memo)
+    plainBytes = deepSizeOf(unslotted(nodes, memo), allIds(plainState))
+    for (label, size) in [("depth-2 tree (fastclone per node)", treeBytes),
+                          ("depth-2 tree (plain objects)", plainBytes)]:
+        print "  %-40s %10d nodes %12d bytes %8d bytes/node" % (label, len(nodes), size, size / len(nodes))
+    ant = state.inventories[PLAYER_ONE].ants[0]
+    building = state.inventories[PLAYER_ONE].constrs[0]
+    construction = state.inventories[NEUTRAL].constrs[0]
+    for (label, obj) in [("Ant.clone", ant), ("Building.clone", building),
+                         ("Construction.clone", construction)]:
+        clone = obj.clone()
+        report(label, timePerCall(obj.clone, number=100000),
+               "%6d bytes/object (%d as a plain object)" %
+               (deepSizeOf(clone, allIds(obj)), deepSizeOf(unslotted(clone, {}), allIds(obj))))
+    clone = state.fastclone()
+    report("GameState.fastclone", timePerCall(state.fastclone),
+           "%6d bytes/state (%d as plain objects)" %
+           (deepSizeOf(clone, allIds(state)), deepSizeOf(unslotted(clone, memo), allIds(plainState))))
+
+##
+# benchShared
+#
+# times fastclone, which shares grass and food with the state it clones
+#
+def benchShared():
+    print "sharing: grass and food shared between fastclones"
+    state = sampleState()
+    report("GameState.fastclone", timePerCall(state.fastclone),
+           "%6d bytes/state" % deepSizeOf(state.fastclone(), allIds(state)))
+
+##
+# benchChildren
+#
+# compares the time to generate every child of the sample position using
+# fastclone and cowclone (each followed by applyMove)
+#
+def benchChildren():
+    print "children: fastclone vs cowclone per child"
+    state = sampleState()
+    moves = listAllLegalMoves(state)
+    state.getAntAt((0, 0))
+
+    def fastChildren():
+        for move in moves:
+            state.fastclone().applyMove(move)
+
+    def cowChildren():
+        for move in moves:
+            state.cowclone().applyMove(move)
+
+    report("fastclone + applyMove (all children)", timePerCall(fastChildren, number=20),
+           "%4d children" % len(moves))
+    report("cowclone + applyMove (all children)", timePerCall(cowChildren, number=20),
+           "%4d children" % len(moves))
+
+##
+# benchStateView
+#
+# compares the per-turn cost of the clone + flipBoard the Game used to give
+# each player against a StateView, both followed by listAllLegalMoves (what
+# a typical AI does first)
+#
+def benchStateView():
+    print "views: clone + flipBoard vs StateView per turn"
+    state = CompactState.fromGameState(sampleState()).toGameState(withBoard=True)
+    for player in [PLAYER_ONE, PLAYER_TWO]:
+        state.whoseTurn = player
+
+        def cloneTurn():
+            theState = state.clone()
+            if player == PLAYER_TWO:
+                theState.flipBoard()
+            listAllLegalMoves(theState)
+
+        def viewTurn():
+            listAllLegalMoves(StateView(state, player))
+
+        report("clone + flip (player %d)" % player,
+               timePerCall(lambda: state.clone().flipBoard() if player == PLAYER_TWO else state.clone()))
+        report("StateView (player %d)" % player, timePerCall(lambda: StateView(state, player)))
+        report("clone + flip + moves (player %d)" % player, timePerCall(cloneTurn, number=500))
+        report("StateView + moves (player %d)" % player, timePerCall(viewTurn, number=500))
+    state.whoseTurn = PLAYER_ONE
+
+##
+# benchCodec
+#
+# compares StateCodec against pickle for size and speed
+#
+def benchCodec():
+    import cPickle
+    print "serialization: StateCodec vs cPickle (protocol 2)"
+    state = sampleState()
+    encoded = StateCodec.encode(state)
+    pickled = cPickle.dumps(state, 2)
+    report("StateCodec.encode", timePerCall(lambda: StateCodec.encode(state)),
+           "%6d bytes/state" % len(encoded))
+    report("StateCodec.decode", timePerCall(lambda: StateCodec.decode(encoded)))
+    report("cPickle.dumps", timePerCall(lambda: cPickle.dumps(state, 2)),
+           "%6d bytes/state" % len(pickled))
+    report("cPickle.loads", timePerCall(lambda: cPickle.loads(pickled)))
+
+##
+# referenceLegalCoord / referenceListAdjacent / referenceQueenPath
+#
+# the original (table-free) versions of legalCoord, listAdjacent and
+# isPathOkForQueen, for checking (see Tests.py) and timing the precomputed
+# tables
+#
+def referenceLegalCoord(coord):
+    if len(coord) != 2:
+        return False
+    return 0 <= coord[0] <= 9 and 0 <= coord[1] <= 9
+
+def referenceListAdjacent(coord):
+    if not referenceLegalCoord(coord):
+        return []
+    result = []
+    for delta in [(-1, 0), (1, 0), (0, -1), (0, 1)]:
+        newCoord = (coord[0] + delta[0], coord[1] + delta[1])
+        if referenceLegalCoord(newCoord):
+            result.append(newCoord)
+    return result
+
+def referenceQueenPath(path):
+    for coord in path:
+        if coord[1] == BOARD_LENGTH / 2 - 1 or coord[1] == BOARD_LENGTH / 2:
+            return False
+    return True
+
+##
+# benchAdjacency
+#
+# compares the table-backed board helpers with the original versions
+#
+def benchAdjacency():
+    print "board helpers: precomputed tables vs computed each call"
+    coords = [(x, y) for x in xrange(0, BOARD_LENGTH) for y in xrange(0, BOARD_LENGTH)]
+    path = [(2, 1), (2, 2), (3, 2), (3, 3)]
+    def allAdjacent(listAdjacent):
+        for coord in coords:
+            listAdjacent(coord)
+    def allLegal(legalCoord):
+        for coord in coords:
+            legalCoord(coord)
+    report("listAdjacent x100 (computed)", timePerCall(lambda: allAdjacent(referenceListAdjacent), number=500))
+    report("listAdjacent x100 (table)", timePerCall(lambda: allAdjacent(AIPlayerUtils.listAdjacent), number=500))
+    report("legalCoord x100 (computed)", timePerCall(lambda: allLegal(referenceLegalCoord), number=500))
+    report("legalCoord x100 (table)", timePerCall(lambda: allLegal(AIPlayerUtils.legalCoord), number=500))
+    report("isPathOkForQueen (computed)", timePerCall(lambda: referenceQueenPath(path), number=20000))
+    report("isPathOkForQueen (table)", timePerCall(lambda: AIPlayerUtils.isPathOkForQueen(path), number=20000))
+
+##
+# benchUniqueMoves
+#
+# compares move generation listing every path with listing one path per
+# destination
+#
+def benchUniqueMoves():
+    print "move generation: every path vs one path per destination"
+    state = sampleState()
+    for player in [PLAYER_ONE, PLAYER_TWO]:
+        state.whoseTurn = player
+        report("listAllLegalMoves (player %d)" % player,
+               timePerCall(lambda: listAllLegalMoves(state), number=200),
+               "%4d moves" % len(listAllLegalMoves(state)))
+        report("listAllLegalMoves unique (player %d)" % player,
+               timePerCall(lambda: listAllLegalMoves(state, True), number=200),
+               "%4d moves" % len(listAllLegalMoves(state, True)))
+    state.whoseTurn = PLAYER_ONE
+
+##
+# referenceStepsToReach
+#
+# the original (uncached breadth-first) stepsToReach, for timing
+#
+def referenceStepsToReach(currentState, src, dst):
+    visited = {src: 0}
+    queue = [src]
+    while len(queue) > 0:
+        cell = queue.pop(0)
+        if cell == dst:
+            return visited[cell]
+        for newCell in AIPlayerUtils.listAdjacent(cell):
+            constr = AIPlayerUtils.getConstrAt(currentState, newCell)
+            dist = visited[cell] + (constr.movementCost if constr != None else 1)
+            if newCell in visited:
+                if dist < visited[newCell]:
+                    visited[newCell] = dist
+            else:
+                visited[newCell] = dist
+                queue.append(newCell)
+    return -1
+
+##
+# benchDistances
+#
+# compares the cached distance fields with a search per stepsToReach call
+#
+def benchDistances():
+    print "distances: cached distanceField vs breadth-first search per call"
+    state = sampleState()
+    targets = [constr.coords for constr in state.inventories[NEUTRAL].constrs
+               if constr.type == FOOD]
+    ants = state.inventories[PLAYER_ONE].ants
+    def allSteps(stepsToReach):
+        for ant in ants:
+            for target in targets:
+                stepsToReach(state, ant.coords, target)
+    def allLookups():
+        fields = [AIPlayerUtils.distanceField(state, target) for target in targets]
+        for ant in ants:
+            for field in fields:
+                field[ant.coords[0]][ant.coords[1]]
+    count = len(ants) * len(targets)
+    report("stepsToReach x%d (search)" % count, timePerCall(lambda: allSteps(referenceStepsToReach), number=50))
+    report("stepsToReach x%d (cached)" % count, timePerCall(lambda: allSteps(AIPlayerUtils.stepsToReach), number=50))
+    report("distanceField + lookups x%d" % count, timePerCall(allLookups, number=50))
+    AIPlayerUtils.clearTerrainFields()
+    report("distanceField (new terrain)",
+           timePerCall(lambda: (AIPlayerUtils.clearTerrainFields(),
+                                AIPlayerUtils.distanceField(state, targets[0])), number=200))
+    report("distanceField (avoiding ants)",
+           timePerCall(lambda: AIPlayerUtils.distanceField(state, targets[0], True), number=200))
+
+##
+# benchNearest
+#
+# compares per-ant minimum distances with nearest-target field lookups, and
+# times heurion (which uses the fields) choosing a move
+#
+def benchNearest():
+    sys.path.insert(0, "AI")
+    import heurion
+    print "nearest targets: min over targets per ant vs field lookups"
+    state = sampleState()
+    targets = [ant.coords for ant in state.inventories[PLAYER_TWO].ants]
+    ants = state.inventories[PLAYER_ONE].ants
+    def allMinimums():
+        for ant in ants:
+            min(abs(ant.coords[0] - t[0]) + abs(ant.coords[1] - t[1]) for t in targets)
+    def allLookups():
+        field = AIPlayerUtils.nearestManhattanField(targets)
+        for ant in ants:
+            field[ant.coords[0]][ant.coords[1]]
+    report("min Manhattan x%d ants" % len(ants), timePerCall(allMinimums))
+    report("nearestManhattanField + lookups", timePerCall(allLookups))
+    report("nearestManhattanField (new targets)",
+           timePerCall(lambda: (AIPlayerUtils.manhattanFields.clear(),
+                                AIPlayerUtils.nearestManhattanField(targets)), number=200))
+    report("nearestDistanceField (new targets)",
+           timePerCall(lambda: (AIPlayerUtils.nearestFields.clear(),
+                                AIPlayerUtils.nearestDistanceField(state, targets)), number=200))
+    player = heurion.AIPlayer(PLAYER_ONE)
+    player.getMove(state)
+    report("heurion.getBestMove", timePerCall(lambda: player.getBestMove(state), number=20),
+           "%4d moves" % len(listAllLegalMoves(state)))
+
+##
+# benchIterMoves
+#
+# compares listing every legal move with iterating lazily, both for the
+# first move and for the whole list
+#
+def benchIterMoves():
+    print "move generation: listAllLegalMoves vs iterLegalMoves"
+    state = sampleState()
+    report("listAllLegalMoves (all)", timePerCall(lambda: listAllLegalMoves(state), number=200),
+           "%4d moves" % len(listAllLegalMoves(state)))
+    report("iterLegalMoves (all)",
+           timePerCall(lambda: list(AIPlayerUtils.iterLegalMoves(state)), number=200))
+    for (name, order) in [("moves first", AIPlayerUtils.MOVES_FIRST),
+                          ("builds first", AIPlayerUtils.BUILDS_FIRST),
+                          ("attacks first", AIPlayerUtils.ATTACKS_FIRST)]:
+        report("iterLegalMoves (first, %s)" % name,
+               timePerCall(lambda: AIPlayerUtils.iterLegalMoves(state, order).next(), number=200))
+
+##
+# benchNextState
+#
+# compares getNextStateAdversarial with a bundled AI's own processMove
+#
+def benchNextState():
+    sys.path.insert(0, "AI")
+    import heurion
+    print "successors: getNextStateAdversarial vs heurion.processMove"
+    state = sampleState()
+    moves = listAllLegalMoves(state)
+    player = heurion.AIPlayer(PLAYER_ONE)
+    report("heurion.processMove x%d" % len(moves),
+           timePerCall(lambda: [player.processMove(state, move) for move in moves], number=50))
+    report("getNextStateAdversarial x%d" % len(moves),
+           timePerCall(lambda: [AIPlayerUtils.getNextStateAdversarial(state, move) for move in moves],
+                       number=50))
+
+##
+# playTurn
+#
+# Description: lets a player make moves (through a StateView, as the Game
+# does) until it ends its turn or has made limit moves
+#
+# Return: the state after the turn
+#
+def playTurn(player, state, limit=20):
+    for i in xrange(0, limit):
+        move = player.getMove(StateView(state, state.whoseTurn))
+        if move.coordList != None:
+            move = Move(move.moveType, [state.coordLookup(coord, state.whoseTurn) for coord in move.coordList],
+                        move.buildType)
+        state = AIPlayerUtils.getNextStateAdversarial(state, move)
+        if move.moveType == END:
+            break
+    return state
+
+##
+# benchMoveCache
+#
+# records the positions the minimax AI lists the moves of over the first
+# turns of a game against a random AI, then times listing them
+# all (in the same order, with the same prune flag) with and without the
+# cache
+#
+def benchMoveCache():
+    sys.path.insert(0, "AI")
+    import mini_max_alpha_beta_pruning, AIPlayer
+    print "legal move cache: the positions minimax lists in a game"
+    listed = []
+    def recordingLegalMoves(currentState, uniqueDest=False, key=None, prune=False):
+        listed.append((currentState.fastclone(), uniqueDest, prune))
+        return AIPlayerUtils.cachedLegalMoves(currentState, uniqueDest, key, prune)
+    player = mini_max_alpha_beta_pruning.AIPlayer(PLAYER_ONE)
+    mini_max_alpha_beta_pruning.cachedLegalMoves = recordingLegalMoves
+    random.seed(0)
+    try:
+        HeadlessGame(maxTurns=20).playGame(player, AIPlayer.AIPlayer(PLAYER_TWO))
+    finally:
+        mini_max_alpha_beta_pruning.cachedLegalMoves = AIPlayerUtils.cachedLegalMoves
+    def cachedListing():
+        AIPlayerUtils.clearLegalMoveCache()
+        for (currentState, uniqueDest, prune) in listed:
+            AIPlayerUtils.cachedLegalMoves(currentState, uniqueDest, prune=prune)
+    report("listAllLegalMoves x%d" % len(listed),
+           timePerCall(lambda: [listAllLegalMoves(currentState, uniqueDest, prune)
+                                for (currentState, uniqueDest, prune) in listed],
+                       number=1))
+    report("cachedLegalMoves x%d" % len(listed), timePerCall(cachedListing, number=1))
+    stats = AIPlayerUtils.legalMoveCacheStats
+    print "  %d hits, %d misses" % (stats["hits"], stats["misses"])
+
+##
+# smallTurnState
+#
+# Description: a sample position cut down (to the given number of ants for
+# player one and 1 food) so that every order of every turn can be tried
+#
+def smallTurnState(seed, numAnts):
+    state = sampleState(seed)
+    inv = state.inventories[PLAYER_ONE]
+    inv.ants = inv.ants[:numAnts]
+    inv.foodCount = 1
+    return state
+
+##
+# exhaustiveTurnEnds
+#
+# Description: tries every order of every sub-move (one path per
+# destination) of a turn
+#
+# Return: the set of hashes of the states the turn can end in and the
+# number of positions visited
+#
+def exhaustiveTurnEnds(currentState):
+    state = currentState.fastclone()
+    state.rehash()
+    endMove = Move(END, None, None)
+    ends = set()
+    visited = [0]
+    def search():
+        visited[0] += 1
+        token = state.applyMove(endMove)
+        ends.add(state.getHash())
+        state.undoMove(token)
+        for move in listAllLegalMoves(state, True):
+            if move.moveType != END:
+                token = state.applyMove(move)
+                search()
+                state.undoMove(token)
+    search()
+    return (ends, visited[0])
+
+##
+# benchTurnPlans
+#
+# compares finding every way a turn can end with iterTurnPlans and with
+# trying every order of every sub-move
+#
+def benchTurnPlans():
+    print "turn plans: iterTurnPlans vs every order of every sub-move"
+    state = smallTurnState(0, 3)
+    (ends, visited) = exhaustiveTurnEnds(state)
+    report("iterTurnPlans (3 ants)",
+           timePerCall(lambda: list(AIPlayerUtils.iterTurnPlans(state)), number=1),
+           "%5d plans" % len(ends))
+    report("every order (3 ants)", timePerCall(lambda: exhaustiveTurnEnds(state), number=1),
+           "%5d positions" % visited)
+    state = sampleState()
+    report("iterTurnPlans (first 100)",
+           timePerCall(lambda: list(AIPlayerUtils.iterTurnPlans(state, 100)), number=5))
+
+##
+# benchPrunedMoves
+#
+# compares the number of moves listed with and without pruning, and the
+# time taken to list them and to play a depth-2 minimax turn with pruning
+#
+def benchPrunedMoves():
+    sys.path.insert(0, "AI")
+    import mini_max_alpha_beta_pruning
+    print "move pruning: listAllLegalMoves with and without prune"
+    state = sampleState()
+    for (name, uniqueDest) in [("every path", False), ("uniqueDest", True)]:
+        report("listAllLegalMoves (%s)" % name,
+               timePerCall(lambda: listAllLegalMoves(state, uniqueDest), number=200),
+               "%4d moves" % len(listAllLegalMoves(state, uniqueDest)))
+        report("listAllLegalMoves (%s, prune)" % name,
+               timePerCall(lambda: listAllLegalMoves(state, uniqueDest, True), number=200),
+               "%4d moves" % len(listAllLegalMoves(state, uniqueDest, True)))
+    counts = { "zeroStep" : 0, "circular" : 0, "dominated" : 0 }
+    listAllLegalMoves(state, False, True, counts)
+    print "  pruned (every path): %d zero-step, %d circular, %d dominated" % \
+        (counts["zeroStep"], counts["circular"], counts["dominated"])
+    player = mini_max_alpha_beta_pruning.AIPlayer(PLAYER_ONE)
+    player.maxDepth = 2
+    def unprunedLegalMoves(currentState, prune=False):
+        return AIPlayerUtils.cachedLegalMoves(currentState)
+    mini_max_alpha_beta_pruning.cachedLegalMoves = unprunedLegalMoves
+    AIPlayerUtils.clearLegalMoveCache()
+    report("minimax turn (depth 2)",
+           timePerCall(lambda: playTurn(player, sampleState()), number=1, repeat=1))
+    mini_max_alpha_beta_pruning.cachedLegalMoves = AIPlayerUtils.cachedLegalMoves
+    AIPlayerUtils.clearLegalMoveCache()
+    report("minimax turn (depth 2, prune)",
+           timePerCall(lambda: playTurn(player, sampleState()), number=1, repeat=1))
+
+##
+# referencePathToward
+#
+# Description: the way an AI would walk an ant toward a target without
+# pathToward: list every path the ant can take and keep the one that ends
+# closest to the target (ties to the first listed)
+#
+# Parameters:
+#   onRoute - if True, only paths that stay on a shortest route to the
+#             target are considered
+#
+def referencePathToward(state, ant, target, onRoute=False):
+    field = AIPlayerUtils.distanceField(state, target)
+    startDist = field[ant.coords[0]][ant.coords[1]]
+    best = [ant.coords]
+    bestDist = startDist
+    for path in AIPlayerUtils.listAllMovementPaths(state, ant.coords, UNIT_STATS[ant.type][MOVEMENT]):
+        if ant.type == QUEEN and not AIPlayerUtils.isPathOkForQueen(path):
+            continue
+        dist = field[path[-1][0]][path[-1][1]]
+        if onRoute:
+            #every step must keep spent + distance left at the start's distance
+            spent = 0
+            for cell in path[1:]:
+                constr = AIPlayerUtils.getConstrAt(state, cell)
+                spent += 1 if constr == None else CONSTR_STATS[constr.type][MOVE_COST]
+                if spent + field[cell[0]][cell[1]] != startDist:
+                    dist = -1
+                    break
+        if dist != -1 and dist < bestDist:
+            best = path
+            bestDist = dist
+    return (best, bestDist)
+
+##
+# benchPathToward
+#
+# compares walking each ant toward the enemy queen with pathToward and by
+# searching every path
+#
+def benchPathToward():
+    print "walking toward a target: pathToward vs every path"
+    state = sampleState()
+    target = state.inventories[PLAYER_TWO].getQueen().coords
+    ants = [ant for ant in state.inventories[PLAYER_ONE].ants if ant.type != QUEEN]
+    report("every path (%d ants)" % len(ants),
+           timePerCall(lambda: [referencePathToward(state, ant, target) for ant in ants], number=200))
+    AIPlayerUtils.pathToward(state, ants[0].coords, target, 1)
+    report("pathToward (%d ants)" % len(ants),
+           timePerCall(lambda: [AIPlayerUtils.pathToward(state, ant.coords, target,
+                                                         UNIT_STATS[ant.type][MOVEMENT])
+                                for ant in ants], number=2000))
+    report("pathToward (new terrain)",
+           timePerCall(lambda: (AIPlayerUtils.clearTerrainFields(),
+                                AIPlayerUtils.pathToward(state, ants[0].coords, target,
+                                                         UNIT_STATS[ants[0].type][MOVEMENT])),
+                       number=200))
+
+##
+# benchHeadlessGame
+#
+# times whole games (setup and play) between two AIs with no user interface
+#
+def benchHeadlessGame():
+    sys.path.insert(0, "AI")
+    import AIPlayer, heurion
+    print "headless games: whole games with no user interface"
+    for (name, playerOne, playerTwo) in [("random vs random", AIPlayer, AIPlayer),
+                                         ("heurion vs random", heurion, AIPlayer)]:
+        random.seed(0)
+        game = HeadlessGame(maxTurns=200)
+        turns = []
+        def play():
+            game.playGame(playerOne.AIPlayer(PLAYER_ONE), playerTwo.AIPlayer(PLAYER_TWO))
+            turns.append(game.turnCount)
+        report("playGame (%s)" % name, timePerCall(play, number=10),
+               "%5.1f turns" % (float(sum(turns)) / len(turns)))
+
+##
+# benchTournament
+#
+# times a small tournament played on one worker process and on one per core
+#
+def benchTournament():
+    print "tournaments: games/second on 1 and %d worker processes" % multiprocessing.cpu_count()
+    pairings = [("AIPlayer", "heurion", 20), ("AIPlayer", "AIPlayer", 20)]
+    for processes in sorted(set([1, multiprocessing.cpu_count()])):
+        def play():
+            for result in Tournament(pairings, processes, maxTurns=200):
+                pass
+        seconds = timePerCall(play, number=1)
+        report("Tournament (%d processes, 40 games)" % processes, seconds,
+               "%6.1f games/s" % (40 / seconds))
+
+##
+# benchTimedMoves
+#
+# times asking an AI for its moves in-process and in a process of its own
+# (as it is when its moves are timed)
+#
+def benchTimedMoves():
+    print "timed moves: an AI's answers in-process and from its own process"
+    sys.path.insert(0, "AI")
+    import AIPlayer
+    state = sampleState()
+    player = AIPlayer.AIPlayer(PLAYER_ONE)
+    timedPlayer = TimedPlayer(player)
+    report("getMove (in-process)",
+           timePerCall(lambda: player.getMove(StateView(state, PLAYER_ONE)), number=500))
+    report("getMove (timed)",
+           timePerCall(lambda: timedPlayer.getMove(StateView(state, PLAYER_ONE)), number=500))
+    timedPlayer.stop()
+    import mini_max_alpha_beta_pruning
+    searcher = mini_max_alpha_beta_pruning.AIPlayer(PLAYER_ONE)
+    for budget in [0.1, 0.5, 2.0]:
+        seconds = timePerCall(lambda: searcher.getMoveTimed(StateView(state, PLAYER_ONE),
+                                                            time.time() + budget), number=1)
+        assert seconds < budget
+        report("minimax getMoveTimed (%.1f s to move)" % budget, seconds)
+    for (name, moveTimeout) in [("untimed", None), ("timed", AI_MOVE_TIMEOUT)]:
+        random.seed(0)
+        game = HeadlessGame(200, moveTimeout)
+        playerOne = AIPlayer.AIPlayer(PLAYER_ONE)
+        playerTwo = AIPlayer.AIPlayer(PLAYER_TWO)
+        report("playGame (random vs random, %s)" % name,
+               timePerCall(lambda: game.playGame(playerOne, playerTwo), number=10))
+        game.stopTimedPlayers()
+
+#all the benchmarks by name (in the order they are run by default)
+BENCHMARKS = [
+    ("clone", benchClone),
+    ("makeunmake", benchMakeUnmake),
+    ("legalmoves", benchLegalMoves),
+    ("memory", benchMemory),
+    ("shared", benchShared),
+    ("children", benchChildren),
+    ("view", benchStateView),
+    ("codec", benchCodec),
+    ("adjacency", benchAdjacency),
+    ("unique", benchUniqueMoves),
+    ("distances", benchDistances),
+    ("nearest", benchNearest),
+    ("itermoves", benchIterMoves),
+    ("nextstate", benchNextState),
+    ("movecache", benchMoveCache),
+    ("turnplans", benchTurnPlans),
+    ("prune", benchPrunedMoves),
+    ("pathtoward", benchPathToward),
+    ("headless", benchHeadlessGame),
+    ("tournament", benchTournament),
+    ("timedmoves", benchTimedMoves),
+]
+
+if __name__ == '__main__':
+    names = sys.argv[1:]
+    for name, bench in BENCHMARKS:
+        if not names or name in names:
+            bench()
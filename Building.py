@@ -11,9 +11,13 @@ from Constants import *
 #   player - int equal to the playerId of the player that owns this Building.
 #   captureHealth - int representing the amount of damage this Building can
 #       take before being captured.
+#   cowToken - Marks which copy-on-write Inventory this Building belongs to
+#       (see Inventory.owns).  None for Buildings that aren't in one.
 ##
 class Building(Construction):
 
+    __slots__ = ('player', 'captureHealth', 'cowToken')
+
     ##
     #__init__
     #Description: Creates a new Building
@@ -26,6 +30,9 @@ class Building(Construction):
         super(Building,self).__init__(inputCoords, inputType)
         self.player = inputPlayer
         self.captureHealth = CONSTR_STATS[inputType][CAP_HEALTH]
+        self.cowToken = None
     
     def clone(self):
-        return Building(self.coords, self.type, self.player)
+        newBuilding = Building(self.coords, self.type, self.player)
+        newBuilding.captureHealth = self.captureHealth
+        return newBuilding
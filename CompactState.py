@@ -0,0 +1,248 @@
+from Constants import *
+from Ant import Ant
+from Construction import Construction
+from Building import Building
+from Inventory import Inventory
+from Location import Location
+from GameState import GameState
+
+##
+# CompactState.py
+#
+# A flat, array-backed alternative to GameState intended for search.  The
+# whole state lives in a single bytearray made up of fixed-size "planes" (one
+# byte per board cell per plane) followed by a few header bytes, so cloning a
+# CompactState is a single memcpy instead of copying an object graph.
+#
+# Cells are indexed as x * BOARD_LENGTH + y (the same order as board[x][y]).
+#
+
+#number of cells on the board
+NUM_CELLS = BOARD_LENGTH * BOARD_LENGTH
+
+#Plane indices (each plane is NUM_CELLS bytes long)
+OCCUPANCY = 0        #bit flags: OCC_ANT | OCC_CONSTR
+ANT_TYPE = 1         #ant type + 1 (0 means no ant)
+ANT_OWNER = 2        #player id of the ant
+ANT_HEALTH = 3       #remaining health of the ant
+ANT_CARRYING = 4     #1 if the ant is carrying food
+ANT_MOVED = 5        #1 if the ant has moved this turn
+ANT_ORDER = 6        #position of the ant in its owner's inventory
+CONSTR_TYPE = 7      #construction type - ANTHILL + 1 (0 means no construction)
+CONSTR_OWNER = 8     #player id of the construction (NEUTRAL for grass/food)
+CONSTR_HEALTH = 9    #capture health of a Building
+CONSTR_ORDER = 10    #position of the construction in its owner's inventory
+NUM_PLANES = 11
+
+#Occupancy flags
+OCC_ANT = 1
+OCC_CONSTR = 2
+
+#Header byte offsets (after the planes)
+HEADER = NUM_PLANES * NUM_CELLS
+FOOD_ONE = HEADER
+FOOD_TWO = HEADER + 1
+WHOSE_TURN = HEADER + 2
+PHASE = HEADER + 3
+
+#total number of bytes needed to store a state
+STATE_SIZE = HEADER + 4
+
+##
+# cellIndex
+#
+# converts an x,y coordinate into an index into a plane
+#
+def cellIndex(coords):
+    return coords[0] * BOARD_LENGTH + coords[1]
+
+##
+# cellCoords
+#
+# converts an index into a plane back into an x,y coordinate
+#
+def cellCoords(index):
+    return (index // BOARD_LENGTH, index % BOARD_LENGTH)
+
+##
+# planeOffset
+#
+# Return: the offset into CompactState.data of a given cell in a given plane
+#
+def planeOffset(plane, coords):
+    return plane * NUM_CELLS + coords[0] * BOARD_LENGTH + coords[1]
+
+
+##
+#CompactState
+#Description: A game state stored as flat byte planes.  CompactStates can be
+#   converted to and from GameStates without losing any information
+#   (including the order of the ants and constructions in the inventories).
+#
+#Variables:
+#   data - a bytearray of length STATE_SIZE holding the planes and header
+##
+class CompactState(object):
+
+    __slots__ = ('data',)
+
+    ##
+    #__init__
+    #Description: Creates a new CompactState
+    #
+    #Parameters:
+    #   inputData - the bytearray to use (optional).  An empty state is
+    #       created if none is given.
+    ##
+    def __init__(self, inputData=None):
+        if inputData == None:
+            inputData = bytearray(STATE_SIZE)
+        self.data = inputData
+
+    ##
+    #clone
+    #Description: Returns a copy of this state (a single buffer copy)
+    ##
+    def clone(self):
+        return CompactState(bytearray(self.data))
+
+    def getWhoseTurn(self):
+        return self.data[WHOSE_TURN]
+
+    def getPhase(self):
+        return self.data[PHASE]
+
+    def getFoodCount(self, playerId):
+        return self.data[FOOD_ONE + playerId]
+
+    ##
+    #getAntAt
+    #Description: Returns the ant at the given coordinates as a tuple of
+    #   (type, owner, health, carrying, hasMoved) or None if the cell is empty
+    ##
+    def getAntAt(self, coords):
+        data = self.data
+        index = coords[0] * BOARD_LENGTH + coords[1]
+        if data[ANT_TYPE * NUM_CELLS + index] == 0:
+            return None
+        return (data[ANT_TYPE * NUM_CELLS + index] - 1,
+                data[ANT_OWNER * NUM_CELLS + index],
+                data[ANT_HEALTH * NUM_CELLS + index],
+                data[ANT_CARRYING * NUM_CELLS + index] == 1,
+                data[ANT_MOVED * NUM_CELLS + index] == 1)
+
+    ##
+    #getConstrAt
+    #Description: Returns the construction at the given coordinates as a tuple
+    #   of (type, owner, captureHealth) or None if there is no construction
+    ##
+    def getConstrAt(self, coords):
+        data = self.data
+        index = coords[0] * BOARD_LENGTH + coords[1]
+        if data[CONSTR_TYPE * NUM_CELLS + index] == 0:
+            return None
+        return (data[CONSTR_TYPE * NUM_CELLS + index] - 1 + ANTHILL,
+                data[CONSTR_OWNER * NUM_CELLS + index],
+                data[CONSTR_HEALTH * NUM_CELLS + index])
+
+    ##
+    #toGameState
+    #Description: Rebuilds the equivalent GameState
+    #
+    #Parameters:
+    #   withBoard - if True the board of Locations is built now and given
+    #       to the state, otherwise it is only built if it is used (like
+    #       fastclone)
+    #
+    #Return: a new GameState
+    ##
+    def toGameState(self, withBoard=False):
+        data = self.data
+        ants = [[], []]
+        constrs = [[], [], []]
+        board = None
+        if withBoard:
+            board = [[Location((col, row)) for row in xrange(0, BOARD_LENGTH)]
+                     for col in xrange(0, BOARD_LENGTH)]
+
+        for index in xrange(0, NUM_CELLS):
+            occupancy = data[index]
+            if occupancy == 0:
+                continue
+            coords = (index // BOARD_LENGTH, index % BOARD_LENGTH)
+            if occupancy & OCC_ANT:
+                ant = Ant(coords, data[ANT_TYPE * NUM_CELLS + index] - 1,
+                          data[ANT_OWNER * NUM_CELLS + index])
+                ant.health = data[ANT_HEALTH * NUM_CELLS + index]
+                ant.carrying = data[ANT_CARRYING * NUM_CELLS + index] == 1
+                ant.hasMoved = data[ANT_MOVED * NUM_CELLS + index] == 1
+                ants[ant.player].append((data[ANT_ORDER * NUM_CELLS + index], ant))
+                if board != None:
+                    board[coords[0]][coords[1]].ant = ant
+            if occupancy & OCC_CONSTR:
+                constrType = data[CONSTR_TYPE * NUM_CELLS + index] - 1 + ANTHILL
+                owner = data[CONSTR_OWNER * NUM_CELLS + index]
+                if owner == NEUTRAL:
+                    constr = Construction(coords, constrType)
+                else:
+                    constr = Building(coords, constrType, owner)
+                    constr.captureHealth = data[CONSTR_HEALTH * NUM_CELLS + index]
+                constrs[owner].append((data[CONSTR_ORDER * NUM_CELLS + index], constr))
+                if board != None:
+                    board[coords[0]][coords[1]].constr = constr
+
+        #restore the original inventory order
+        for entries in ants + constrs:
+            entries.sort(key=lambda entry: entry[0])
+        ants = [[entry[1] for entry in entries] for entries in ants]
+        constrs = [[entry[1] for entry in entries] for entries in constrs]
+
+        inventories = [Inventory(PLAYER_ONE, ants[PLAYER_ONE], constrs[PLAYER_ONE], data[FOOD_ONE]),
+                       Inventory(PLAYER_TWO, ants[PLAYER_TWO], constrs[PLAYER_TWO], data[FOOD_TWO]),
+                       Inventory(NEUTRAL, [], constrs[NEUTRAL], 0)]
+        return GameState(board, inventories, data[PHASE], data[WHOSE_TURN])
+
+
+##
+# fromGameState
+#
+# Description: Builds the CompactState equivalent to a GameState.  Only the
+# inventories are read so this is safe for states made with fastclone.
+#
+# Parameters:
+#   state - the GameState to convert
+#
+# Return: a new CompactState
+#
+def fromGameState(state):
+    data = bytearray(STATE_SIZE)
+    for inv in state.inventories:
+        order = 0
+        for ant in inv.ants:
+            index = ant.coords[0] * BOARD_LENGTH + ant.coords[1]
+            data[index] |= OCC_ANT
+            data[ANT_TYPE * NUM_CELLS + index] = ant.type + 1
+            data[ANT_OWNER * NUM_CELLS + index] = ant.player
+            data[ANT_HEALTH * NUM_CELLS + index] = ant.health
+            data[ANT_CARRYING * NUM_CELLS + index] = 1 if ant.carrying else 0
+            data[ANT_MOVED * NUM_CELLS + index] = 1 if ant.hasMoved else 0
+            data[ANT_ORDER * NUM_CELLS + index] = order
+            order += 1
+        order = 0
+        for constr in inv.constrs:
+            index = constr.coords[0] * BOARD_LENGTH + constr.coords[1]
+            data[index] |= OCC_CONSTR
+            data[CONSTR_TYPE * NUM_CELLS + index] = constr.type - ANTHILL + 1
+            if inv.player == NEUTRAL:
+                data[CONSTR_OWNER * NUM_CELLS + index] = NEUTRAL
+            else:
+                #a captured building belongs to its new owner (as in GameState.clone)
+                data[CONSTR_OWNER * NUM_CELLS + index] = constr.player
+                data[CONSTR_HEALTH * NUM_CELLS + index] = constr.captureHealth
+            data[CONSTR_ORDER * NUM_CELLS + index] = order
+            order += 1
+    data[FOOD_ONE] = state.inventories[PLAYER_ONE].foodCount
+    data[FOOD_TWO] = state.inventories[PLAYER_TWO].foodCount
+    data[WHOSE_TURN] = state.whoseTurn
+    data[PHASE] = state.phase
+    return CompactState(data)
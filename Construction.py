@@ -19,9 +19,15 @@ CONSTR_STATS.append((1,None,None)) #Food
 #   coords - An int[] of length 2, representing the Construction's position on
 #       the board.  Positions start at (0, 0) in the upper left and increase
 #       down and to the right.
+#
+#   Constructions that aren't Buildings (grass and food) never change after
+#   setup and are shared between a GameState and its fastclones, so they
+#   are frozen (see FrozenConstruction) when a state is first cloned.
 ##
 class Construction(object):
 
+    __slots__ = ('coords', 'type', 'movementCost')
+
     ##
     #__init__
     #Description: Creates a new Construction. Only ever called by subclasses.
@@ -36,4 +42,52 @@ class Construction(object):
         self.movementCost = CONSTR_STATS[inputType][MOVE_COST]
     
     def clone(self):
-        return Construction(self.coords, self.type)
\ No newline at end of file
+        return Construction(self.coords, self.type)
+
+##
+#FrozenConstruction
+#Description: A grass or food Construction that is shared between states and
+#   so can't be changed: setting any of its variables raises AttributeError.
+#   Constructions become FrozenConstructions (in place, keeping who they are)
+#   through freezeConstrs.  A clone of one is an ordinary Construction.
+##
+class FrozenConstruction(Construction):
+
+    __slots__ = ()
+
+    #(the variables are set through Construction's slots)
+    def __init__(self, inputCoords, inputType):
+        _setCoords(self, inputCoords)
+        _setType(self, inputType)
+        _setMovementCost(self, CONSTR_STATS[inputType][MOVE_COST])
+
+    def __setattr__(self, name, value):
+        raise AttributeError("grass and food are shared between states, so they can't be changed")
+
+    def __delattr__(self, name):
+        raise AttributeError("grass and food are shared between states, so they can't be changed")
+
+    #(pickled as the arguments to make it again, since its variables can't
+    #be set one by one)
+    def __reduce__(self):
+        return (FrozenConstruction, (self.coords, self.type))
+
+_setCoords = Construction.__dict__['coords'].__set__
+_setType = Construction.__dict__['type'].__set__
+_setMovementCost = Construction.__dict__['movementCost'].__set__
+
+##
+#freezeConstrs
+#Description: Freezes a list of grass and food Constructions (see
+#   FrozenConstruction), unless that has been done already.  Anything added
+#   to the list since it was frozen is its last item, so the rest are only
+#   looked at if that isn't frozen.
+#
+#Parameters:
+#   constrs - the NEUTRAL inventory's constrs
+##
+def freezeConstrs(constrs):
+    if constrs and type(constrs[-1]) is not FrozenConstruction:
+        for constr in constrs:
+            if type(constr) is Construction:
+                constr.__class__ = FrozenConstruction
\ No newline at end of file
@@ -2,7 +2,10 @@ import copy
 from Constants import *
 from Inventory import Inventory
 from Building import Building
+from Construction import Construction, CONSTR_STATS, freezeConstrs
+from Ant import Ant, UNIT_STATS
 from Location import *
+import Zobrist
 
 def addCoords(tuple1, tuple2):
     if len(tuple1) != len(tuple2):
@@ -16,19 +19,72 @@ def subtractCoords(tuple1, tuple2):
     else:
         return tuple([tuple1[i] - tuple2[i] for i in range(0, len(tuple1))])
 
+##
+# listsKey
+#
+# Description: captures enough about some lists to tell (cheaply) whether
+# items have been added or removed since: each list itself, its length and
+# its last item.  (Anything appended becomes the last item.)
+#
+# Return: a tuple to pass to listsUnchanged
+#
+def listsKey(*lists):
+    key = []
+    for items in lists:
+        key.append(items)
+        key.append(len(items))
+        key.append(items[-1] if items else None)
+    return tuple(key)
+
+##
+# listsUnchanged
+#
+# Return: True if the given lists match a key made by listsKey
+#
+def listsUnchanged(key, *lists):
+    i = 0
+    for items in lists:
+        if items is not key[i] or len(items) != key[i + 1] or \
+           (items and items[-1] is not key[i + 2]):
+            return False
+        i += 3
+    return True
+
 ##
 #GameState
 #
 #Description: The current state of the game.
 #
 #Variables:
-#   board - The game Board being used.
+#   board - The game Board being used.  A state made without one (such as a
+#       clone or fastclone) builds it from the inventories the first time it
+#       is used (see getBoard).
 #   inventories - A tuple containing the Inventory for each player.
 #   phase - The current phase of the game.
 #    whoseTurn - The ID of the Player who's turn it currently is.
+#   hashKey - The Zobrist hash of the state, or None if it hasn't been
+#       computed yet (see getHash).
+#   antIndex - A dict mapping coords to the Ant there, or None if it hasn't
+#       been built yet (see getAntAt).
+#   constrIndex - A dict mapping coords to the Construction there, or None if
+#       it hasn't been built yet (see getConstrAt).
+#   boardKey - None if the board was given to the state (or there isn't one
+#       yet), otherwise the listsKey of the inventories the board was built
+#       from.
+#   terrain - The terrain key (see getTerrainKey), or None if it hasn't been
+#       worked out yet.
+#   terrainListsKey - The listsKey of the construction lists the terrain key
+#       was worked out from.
+#
+#   GameState and the objects it holds use __slots__ (no per-instance
+#   __dict__) so that the many states kept alive during a search stay small.
 ##
 class GameState(object):
 
+    __slots__ = ('_board', 'boardKey', 'inventories', 'phase', 'whoseTurn', 'hashKey',
+                 'antIndex', 'antIndexKey', 'constrIndex', 'constrIndexKey',
+                 'terrain', 'terrainListsKey')
+
     ##
     #__init__
     #Description: Creates a new GameState
@@ -41,10 +97,106 @@ class GameState(object):
     #   inputTurn - The ID of the Player who's turn it is (int)
     ##
     def __init__(self, inputBoard, inputInventories, inputPhase, inputTurn):
-        self.board = inputBoard
+        self._board = inputBoard
+        self.boardKey = None
         self.inventories = inputInventories
         self.phase = inputPhase
         self.whoseTurn = inputTurn
+        self.hashKey = None
+        self.antIndex = None
+        self.antIndexKey = None
+        self.constrIndex = None
+        self.constrIndexKey = None
+        self.terrain = None
+        self.terrainListsKey = None
+
+    ##
+    #board
+    #Description: The board of Locations.  If the state wasn't given a board
+    #   one is built from the inventories when it is first used, so states
+    #   that are never looked at this way don't pay for it.  A built board is
+    #   thrown away (and built again if needed) when the inventory lists
+    #   change, when applyMove/undoMove are used or when the board is flipped.
+    #   Code that moves pieces of such a state by hand must call
+    #   invalidateBoard afterward.
+    #
+    #   A board that was given to the state (e.g. the Game's) is never
+    #   rebuilt; whoever changes the state keeps it up to date.
+    ##
+    def getBoard(self):
+        board = self._board
+        if board == None:
+            return self.buildBoard()
+        if self.boardKey != None and not listsUnchanged(self.boardKey, *self.boardLists()):
+            return self.buildBoard()
+        return board
+
+    def setBoard(self, newBoard):
+        self._board = newBoard
+        self.boardKey = None
+
+    board = property(getBoard, setBoard)
+
+    ##
+    #boardLists
+    #Return: every ants and constrs list in the inventories
+    ##
+    def boardLists(self):
+        inventories = self.inventories
+        return (inventories[PLAYER_ONE].ants, inventories[PLAYER_TWO].ants,
+                inventories[PLAYER_ONE].constrs, inventories[PLAYER_TWO].constrs,
+                inventories[NEUTRAL].constrs)
+
+    ##
+    #buildBoard
+    #Description: Builds the board from the inventories
+    #
+    #Return: the new board
+    ##
+    def buildBoard(self):
+        board = [[Location((col, row)) for row in xrange(0, BOARD_LENGTH)]
+                 for col in xrange(0, BOARD_LENGTH)]
+        for inv in self.inventories:
+            for constr in inv.constrs:
+                board[constr.coords[0]][constr.coords[1]].constr = constr
+            for ant in inv.ants:
+                board[ant.coords[0]][ant.coords[1]].ant = ant
+        self._board = board
+        self.boardKey = listsKey(*self.boardLists())
+        return board
+
+    ##
+    #invalidateBoard
+    #Description: Throws away a board that was built from the inventories so
+    #   it is rebuilt the next time it is used.  (A board that was given to
+    #   the state is kept.)
+    ##
+    def invalidateBoard(self):
+        if self.boardKey != None:
+            self._board = None
+            self.boardKey = None
+
+    ##
+    #getHash
+    #Description: Returns the 64-bit Zobrist hash of this state.  The hash is
+    #   computed the first time it is asked for and after that is kept up to
+    #   date by applyMove/undoMove and copied by clone/fastclone.  Code that
+    #   changes the state by hand must call rehash afterward.
+    #
+    #Return: the hash (int)
+    ##
+    def getHash(self):
+        if self.hashKey == None:
+            self.hashKey = Zobrist.hashState(self)
+        return self.hashKey
+
+    ##
+    #rehash
+    #Description: Discards the stored hash so it is recomputed on the next
+    #   call to getHash.  Needed after changing the state without applyMove.
+    ##
+    def rehash(self):
+        self.hashKey = None
 
     ##
     #coordLookup
@@ -68,16 +220,28 @@ class GameState(object):
     #
     ##
     def flipBoard(self):
-        for col in self.board:
-            col.reverse()
-            
-        self.board.reverse()
+        if self.boardKey != None:
+            self.invalidateBoard()
+        elif self._board != None:
+            for col in self._board:
+                col.reverse()
+
+            self._board.reverse()
         
         for inv in self.inventories:
             for ant in inv.ants:
                 ant.coords = self.coordLookup(ant.coords, PLAYER_TWO)
-            for constr in inv.constrs:
-                constr.coords = self.coordLookup(constr.coords, PLAYER_TWO)
+            if inv.player == NEUTRAL:
+                #grass and food may be shared with fastclones so replace them
+                #instead of changing them
+                inv.constrs = [Construction(self.coordLookup(constr.coords, PLAYER_TWO), constr.type)
+                               for constr in inv.constrs]
+            else:
+                for constr in inv.constrs:
+                    constr.coords = self.coordLookup(constr.coords, PLAYER_TWO)
+        self.hashKey = None
+        self.constrIndex = None
+        self.terrain = None
       
     ##
     #clearConstrs
@@ -88,51 +252,64 @@ class GameState(object):
         for col in self.board:
             for loc in col:
                 loc.constr = None
+        #the board no longer matches the inventories so it mustn't be rebuilt
+        self.boardKey = None
+        self.hashKey = None
 
     ##
     #clone
-    #Description: Returns a deep copy of itself
+    #Description: Returns a deep copy of itself.  If this state was given a
+    #   board the board is taken to be the truth and the copy's ants and
+    #   Buildings are read from it; otherwise this is the same as fastclone.
+    #   Either way the copy's board is only built if it is used.
     #
     #Return: The GameState identical to the original
     ##
     def clone(self):
-        newBoard = []
+        board = self._board
+        if board == None or self.boardKey != None:
+            return self.fastclone()
         ants1 = []
         ants2 = []
         cons1 = []
         cons2 = []
-        cons3 = []
         food1 = self.inventories[PLAYER_ONE].foodCount
         food2 = self.inventories[PLAYER_TWO].foodCount
-        for col in xrange(0,len(self.board)):
-            newBoard.append([])
-            for row in xrange(0,len(self.board)):
-                newLoc = self.board[col][row].clone()
-                newBoard[col].append(newLoc)
+        for col in xrange(0,len(board)):
+            for row in xrange(0,len(board)):
+                loc = board[col][row]
                 #Organize constructions into inventories
-                if newLoc.constr != None and type(newLoc.constr) is Building and newLoc.constr.player == PLAYER_ONE:
-                    cons1.append(newLoc.constr)
-                elif newLoc.constr != None and type(newLoc.constr) is Building and newLoc.constr.player == PLAYER_TWO:
-                    cons2.append(newLoc.constr)
+                if loc.constr != None and type(loc.constr) is Building and loc.constr.player == PLAYER_ONE:
+                    cons1.append(loc.constr.clone())
+                elif loc.constr != None and type(loc.constr) is Building and loc.constr.player == PLAYER_TWO:
+                    cons2.append(loc.constr.clone())
                 #Organize ants into inventories
-                if newLoc.ant != None and newLoc.ant.player == PLAYER_ONE:
-                    ants1.append(newLoc.ant)
-                elif newLoc.ant != None and newLoc.ant.player == PLAYER_TWO:
-                    ants2.append(newLoc.ant)
-        for constr in self.inventories[NEUTRAL].constrs:
-            cons3.append(constr.clone())
+                if loc.ant != None and loc.ant.player == PLAYER_ONE:
+                    ants1.append(loc.ant.clone())
+                elif loc.ant != None and loc.ant.player == PLAYER_TWO:
+                    ants2.append(loc.ant.clone())
+        #grass and food are shared (see fastclone)
+        freezeConstrs(self.inventories[NEUTRAL].constrs)
+        cons3 = self.inventories[NEUTRAL].constrs[:]
         newInventories = [Inventory(PLAYER_ONE, ants1, cons1, food1),
                           Inventory(PLAYER_TWO, ants2, cons2, food2),
                           Inventory(NEUTRAL, [], cons3, 0) ]
-        return GameState(newBoard, newInventories, self.phase, self.whoseTurn)
+        newState = GameState(None, newInventories, self.phase, self.whoseTurn)
+        newState.hashKey = self.hashKey
+        return newState
 
 
     ##
     #fastclone
     #
-    #Description: Returns a deep copy of itself *without* a board (which is set
-    # to None).  Omitting the board makes the clone run much faster and, if
-    # necessary, the board can be reconstructed from the inventories.
+    #Description: Returns a deep copy of itself *without* a board.  Omitting
+    # the board makes the clone run much faster; if the board is used it is
+    # built from the inventories then (see getBoard).
+    #
+    # Grass and food never change once they are placed so the clone shares
+    # them with the original (the NEUTRAL inventory gets a new list holding
+    # the same Constructions, which are frozen so nothing can change them,
+    # see Construction.FrozenConstruction).  Ants and Buildings are copied.
     #
     #Return: a GameState object _almost_ identical to the original
     ##
@@ -143,12 +320,10 @@ class GameState(object):
         ants2 = [ None ] * len(self.inventories[PLAYER_TWO].ants)
         cons1 = [ None ] * len(self.inventories[PLAYER_ONE].constrs)
         cons2 = [ None ] * len(self.inventories[PLAYER_TWO].constrs)
-        cons3 = [ None ] * len(self.inventories[NEUTRAL].constrs)
         antIndex1 = 0
         antIndex2 = 0
         conIndex1 = 0
         conIndex2 = 0
-        conIndex3 = 0
 
         #clone all the entries in the inventories
         for ant in self.inventories[PLAYER_ONE].ants:
@@ -163,9 +338,9 @@ class GameState(object):
         for constr in self.inventories[PLAYER_TWO].constrs:
             cons2[conIndex2] = constr.clone()
             conIndex2 += 1
-        for constr in self.inventories[NEUTRAL].constrs:
-            cons3[conIndex3] = constr.clone()
-            conIndex3 += 1
+        #grass and food are shared, not cloned
+        freezeConstrs(self.inventories[NEUTRAL].constrs)
+        cons3 = self.inventories[NEUTRAL].constrs[:]
 
         #clone the list of inventory objects
         food1 = self.inventories[PLAYER_ONE].foodCount
@@ -174,4 +349,429 @@ class GameState(object):
                            Inventory(PLAYER_TWO, ants2, cons2, food2),
                            Inventory(NEUTRAL, [], cons3, 0) ]
         
-        return GameState(newBoard, newInventories, self.phase, self.whoseTurn)
+        newState = GameState(newBoard, newInventories, self.phase, self.whoseTurn)
+        newState.hashKey = self.hashKey
+        if self.terrain != None:
+            newState.copyTerrainKey(self)
+        return newState
+
+    ##
+    #cowclone
+    #
+    #Description: Returns a copy-on-write copy of itself without a board.  The
+    # copy shares the inventories' lists, Ants and Buildings with the original
+    # instead of copying them; whichever state changes one of them first (via
+    # applyMove) copies just that object.  This makes generating the children
+    # of a node cost about the number of objects each move changes rather than
+    # the number of objects in the state.
+    #
+    # After this is called *both* states must only be changed with
+    # applyMove/undoMove, since changing a shared object by hand would change
+    # it in the other state too.  fastclone (or clone) of either gives an
+    # ordinary independent state.
+    #
+    #Return: a GameState equal to the original
+    ##
+    def cowclone(self):
+        freezeConstrs(self.inventories[NEUTRAL].constrs)
+        newInventories = [ self.inventories[PLAYER_ONE].cowfork(),
+                           self.inventories[PLAYER_TWO].cowfork(),
+                           Inventory(NEUTRAL, [], self.inventories[NEUTRAL].constrs[:], 0) ]
+        newState = GameState(None, newInventories, self.phase, self.whoseTurn)
+        newState.hashKey = self.hashKey
+        #the indexes are still right for the copy (until it changes)
+        if self.antIndex != None and listsUnchanged(self.antIndexKey, self.inventories[PLAYER_ONE].ants,
+                                                    self.inventories[PLAYER_TWO].ants):
+            newState.antIndex = self.antIndex.copy()
+            newState.antIndexKey = self.antIndexKey
+        if self.constrIndex != None and listsUnchanged(self.constrIndexKey, self.inventories[PLAYER_ONE].constrs,
+                                                       self.inventories[PLAYER_TWO].constrs,
+                                                       self.inventories[NEUTRAL].constrs):
+            newState.constrIndex = self.constrIndex.copy()
+            newState.constrIndexKey = listsKey(newInventories[PLAYER_ONE].constrs,
+                                               newInventories[PLAYER_TWO].constrs,
+                                               newInventories[NEUTRAL].constrs)
+        if self.terrain != None:
+            newState.copyTerrainKey(self)
+        return newState
+
+    ##
+    #writableAnt
+    #Description: Returns a version of the given ant that this state may
+    #   change in place (the ant itself unless it is shared with a cowclone, in
+    #   which case it is replaced by a copy).  Keeps the ant index up to date.
+    ##
+    def writableAnt(self, ant):
+        inv = self.inventories[ant.player]
+        if inv.owns(ant):
+            return ant
+        index = self.antIndex
+        if index != None and not listsUnchanged(self.antIndexKey, self.inventories[PLAYER_ONE].ants,
+                                                self.inventories[PLAYER_TWO].ants):
+            index = None
+        newAnt = inv.writableAnt(ant)
+        if index != None:
+            index[newAnt.coords] = newAnt
+            newAnt.coordIndex = index
+            self.antIndexKey = listsKey(self.inventories[PLAYER_ONE].ants,
+                                        self.inventories[PLAYER_TWO].ants)
+        else:
+            self.antIndex = None
+        return newAnt
+
+    ##
+    #writableConstr
+    #Description: The Building equivalent of writableAnt.  (The construction
+    #   index is simply rebuilt, since this only happens on captures.)
+    ##
+    def writableConstr(self, building):
+        inv = self.inventories[building.player]
+        if inv.owns(building):
+            return building
+        self.constrIndex = None
+        self.terrain = None
+        return inv.writableConstr(building)
+
+
+    ##
+    #getAntAt
+    #Description: Returns the ant at the given coordinates (or None) using a
+    #   coordinate index built from the inventories.  The board is not used so
+    #   this works for states made with fastclone.
+    #
+    #   The index is built on first use and stays correct as ants move (see
+    #   Ant.coords).  Adding or removing ants is noticed by comparing each
+    #   inventory's ant list, its length and its last ant with what they were
+    #   when the index was built; the index is rebuilt if any of them changed.
+    ##
+    def getAntAt(self, coords):
+        index = self.antIndex
+        if index == None or not listsUnchanged(self.antIndexKey, self.inventories[PLAYER_ONE].ants,
+                                               self.inventories[PLAYER_TWO].ants):
+            index = self.buildAntIndex()
+        return index.get(coords)
+
+    ##
+    #getConstrAt
+    #Description: Returns the construction at the given coordinates (or None)
+    #   using a coordinate index built from the inventories, in the same way
+    #   as getAntAt.
+    ##
+    def getConstrAt(self, coords):
+        index = self.constrIndex
+        if index == None or not listsUnchanged(self.constrIndexKey, self.inventories[PLAYER_ONE].constrs,
+                                               self.inventories[PLAYER_TWO].constrs,
+                                               self.inventories[NEUTRAL].constrs):
+            index = self.buildConstrIndex()
+        return index.get(coords)
+
+    ##
+    #buildAntIndex
+    #Description: (Re)builds the coordinate index of ants
+    #
+    #Return: the new index (dict)
+    ##
+    def buildAntIndex(self):
+        index = {}
+        for inv in self.inventories:
+            for ant in inv.ants:
+                index[ant.coords] = ant
+                ant.coordIndex = index
+        self.antIndex = index
+        self.antIndexKey = listsKey(self.inventories[PLAYER_ONE].ants,
+                                    self.inventories[PLAYER_TWO].ants)
+        return index
+
+    ##
+    #buildConstrIndex
+    #Description: (Re)builds the coordinate index of constructions
+    #
+    #Return: the new index (dict)
+    ##
+    def buildConstrIndex(self):
+        index = {}
+        for inv in self.inventories:
+            for constr in inv.constrs:
+                index[constr.coords] = constr
+        self.constrIndex = index
+        self.constrIndexKey = listsKey(self.inventories[PLAYER_ONE].constrs,
+                                       self.inventories[PLAYER_TWO].constrs,
+                                       self.inventories[NEUTRAL].constrs)
+        return index
+
+    ##
+    #getTerrainKey
+    #Description: Returns the coords and movement cost of every construction
+    #   that doesn't cost 1 to move onto, which tells terrain layouts apart
+    #   (see AIPlayerUtils.distanceField).  The key is worked out on first use
+    #   and kept until the construction lists change, noticed in the same way
+    #   as for getConstrAt (and the board).
+    #
+    #Return: the key (a tuple of (coords, movement cost))
+    ##
+    def getTerrainKey(self):
+        inventories = self.inventories
+        constrs1 = inventories[PLAYER_ONE].constrs
+        constrs2 = inventories[PLAYER_TWO].constrs
+        constrs3 = inventories[NEUTRAL].constrs
+        #(listsUnchanged written out, as this is used for every distance looked up)
+        lists = self.terrainListsKey
+        if self.terrain != None and \
+           constrs1 is lists[0] and len(constrs1) == lists[1] and \
+           constrs2 is lists[3] and len(constrs2) == lists[4] and \
+           constrs3 is lists[6] and len(constrs3) == lists[7] and \
+           (not constrs1 or constrs1[-1] is lists[2]) and \
+           (not constrs2 or constrs2[-1] is lists[5]) and \
+           (not constrs3 or constrs3[-1] is lists[8]):
+            return self.terrain
+        self.terrain = tuple([(constr.coords, constr.movementCost)
+                              for inv in inventories for constr in inv.constrs
+                              if constr.movementCost != 1])
+        self.terrainListsKey = listsKey(constrs1, constrs2, constrs3)
+        return self.terrain
+
+    ##
+    #copyTerrainKey
+    #Description: Gives a copy of another state (with the same constructions
+    #   in the same order) that state's terrain key, if it has an up to date
+    #   one, so the copy doesn't work it out again
+    ##
+    def copyTerrainKey(self, other):
+        otherInventories = other.inventories
+        if other.terrain == None or not listsUnchanged(other.terrainListsKey,
+                                                       otherInventories[PLAYER_ONE].constrs,
+                                                       otherInventories[PLAYER_TWO].constrs,
+                                                       otherInventories[NEUTRAL].constrs):
+            return
+        inventories = self.inventories
+        self.terrain = other.terrain
+        self.terrainListsKey = listsKey(inventories[PLAYER_ONE].constrs,
+                                        inventories[PLAYER_TWO].constrs,
+                                        inventories[NEUTRAL].constrs)
+
+    ##
+    #applyMove
+    #Description: Makes the given move on this state in place, following the
+    #   same rules as Game.runGame: moving an ant marks it as moved and then
+    #   resolves its attack, building deducts the food cost and END does the
+    #   end-of-turn bookkeeping (capturing buildings, picking up and dropping
+    #   off food, resetting hasMoved) before passing the turn.  The move is
+    #   assumed to be legal.  A board given to the state is kept up to date
+    #   (one built from the inventories is thrown away).
+    #   Shared objects of a cowclone are copied before they are changed.
+    #
+    #Parameters:
+    #   move - the Move to make (Move)
+    #   attackCoord - the enemy to attack if the moving ant has a choice.  If
+    #       None, the first attackable enemy in the inventory is attacked.
+    #
+    #Return: an undo token that can be passed to undoMove to restore the state
+    ##
+    def applyMove(self, move, attackCoord=None):
+        self.invalidateBoard()
+        board = self._board
+        whoseTurn = self.whoseTurn
+        myInv = self.inventories[whoseTurn]
+        oldHash = self.hashKey
+        key = oldHash
+
+        if move.moveType == MOVE_ANT:
+            startCoord = move.coordList[0]
+            endCoord = move.coordList[-1]
+            ant = self.writableAnt(self.getAntAt(startCoord))
+            oldHasMoved = ant.hasMoved
+            if key != None:
+                key ^= Zobrist.antKey(ant)
+            ant.coords = endCoord
+            ant.hasMoved = True
+            if key != None:
+                key ^= Zobrist.antKey(ant)
+            if board != None:
+                board[startCoord[0]][startCoord[1]].ant = None
+                board[endCoord[0]][endCoord[1]].ant = ant
+
+            #resolve the attack (the engine requires one if any enemy is in range)
+            enemyInv = self.inventories[1 - whoseTurn]
+            attackRange = UNIT_STATS[ant.type][RANGE] ** 2
+            target = None
+            for enemy in enemyInv.ants:
+                enemyCoord = enemy.coords
+                diffX = endCoord[0] - enemyCoord[0]
+                diffY = endCoord[1] - enemyCoord[1]
+                if attackRange >= diffX * diffX + diffY * diffY:
+                    if attackCoord == None or enemyCoord == attackCoord:
+                        target = enemy
+                        break
+            if target == None:
+                self.hashKey = key
+                return (MOVE_ANT, oldHash, ant, startCoord, oldHasMoved, None, 0, -1)
+
+            target = self.writableAnt(target)
+            oldHealth = target.health
+            if key != None:
+                key ^= Zobrist.antKey(target)
+            target.health -= UNIT_STATS[ant.type][ATTACK]
+            deadIndex = -1
+            if target.health <= 0:
+                deadIndex = enemyInv.ants.index(target)
+                del enemyInv.ants[deadIndex]
+                if board != None:
+                    board[target.coords[0]][target.coords[1]].ant = None
+            elif key != None:
+                key ^= Zobrist.antKey(target)
+            self.hashKey = key
+            return (MOVE_ANT, oldHash, ant, startCoord, oldHasMoved, target, oldHealth, deadIndex)
+
+        elif move.moveType == BUILD:
+            coord = move.coordList[0]
+            if move.buildType == TUNNEL:
+                cost = CONSTR_STATS[TUNNEL][BUILD_COST]
+                built = Building(coord, TUNNEL, whoseTurn)
+                built.cowToken = myInv.cowToken
+                myInv.writableConstrs().append(built)
+                if board != None:
+                    board[coord[0]][coord[1]].constr = built
+            else:
+                cost = UNIT_STATS[move.buildType][COST]
+                built = Ant(coord, move.buildType, whoseTurn)
+                built.hasMoved = True
+                built.cowToken = myInv.cowToken
+                myInv.writableAnts().append(built)
+                if board != None:
+                    board[coord[0]][coord[1]].ant = built
+            if key != None:
+                key ^= Zobrist.foodKey(whoseTurn, myInv.foodCount)
+            myInv.foodCount -= cost
+            if key != None:
+                key ^= Zobrist.foodKey(whoseTurn, myInv.foodCount)
+                if type(built) is Ant:
+                    key ^= Zobrist.antKey(built)
+                else:
+                    key ^= Zobrist.constrKey(built)
+            self.hashKey = key
+            return (BUILD, oldHash, built, cost)
+
+        elif move.moveType == END:
+            #every ant may change (at least hasMoved is reset)
+            if myInv.cowToken != None:
+                for ant in myInv.ants[:]:
+                    self.writableAnt(ant)
+            #remember everything END may change so it can be put back
+            antStates = [(ant, ant.hasMoved, ant.carrying) for ant in myInv.ants]
+            captures = []
+            oldFood = myInv.foodCount
+            for ant in myInv.ants:
+                if key != None:
+                    key ^= Zobrist.antKey(ant)
+                constrUnderAnt = self.getConstrAt(ant.coords)
+                if constrUnderAnt != None:
+                    #unmoved ants on enemy buildings lower their capture health
+                    if type(constrUnderAnt) is Building and not ant.hasMoved and not constrUnderAnt.player == whoseTurn:
+                        constrUnderAnt = self.writableConstr(constrUnderAnt)
+                        if key != None:
+                            key ^= Zobrist.constrKey(constrUnderAnt)
+                        captures.append(self.damageBuilding(constrUnderAnt, whoseTurn))
+                        if key != None:
+                            key ^= Zobrist.constrKey(constrUnderAnt)
+                    #workers on food pick it up
+                    elif constrUnderAnt.type == FOOD and ant.type == WORKER:
+                        ant.carrying = True
+                    #carried food is dropped off at the anthill and tunnels
+                    elif (constrUnderAnt.type == ANTHILL or constrUnderAnt.type == TUNNEL) and ant.carrying == True:
+                        myInv.foodCount += 1
+                        ant.carrying = False
+                ant.hasMoved = False
+                if key != None:
+                    key ^= Zobrist.antKey(ant)
+            self.whoseTurn = 1 - whoseTurn
+            if key != None:
+                key ^= Zobrist.foodKey(whoseTurn, oldFood) ^ \
+                       Zobrist.foodKey(whoseTurn, myInv.foodCount) ^ Zobrist.TURN_KEY
+            self.hashKey = key
+            return (END, oldHash, whoseTurn, antStates, captures, oldFood)
+
+        return None
+
+    ##
+    #damageBuilding
+    #Description: Lowers the capture health of an enemy building by one,
+    #   transferring it to the capturing player (with full capture health) if
+    #   it reaches zero.  Anthills are never transferred; a zero capture health
+    #   anthill means the game is over.
+    #
+    #Parameters:
+    #   building - the Building being captured (Building)
+    #   capturer - the id of the capturing player (int)
+    #
+    #Return: (building, oldPlayer, oldCaptureHealth, oldInventoryIndex) for undoMove
+    ##
+    def damageBuilding(self, building, capturer):
+        oldPlayer = building.player
+        oldHealth = building.captureHealth
+        oldIndex = -1
+        building.captureHealth -= 1
+        if building.captureHealth == 0 and building.type != ANTHILL:
+            building.player = capturer
+            building.captureHealth = CONSTR_STATS[building.type][CAP_HEALTH]
+            #keep inventories grouped by owner (as clone does)
+            oldConstrs = self.inventories[oldPlayer].writableConstrs()
+            if building in oldConstrs:
+                oldIndex = oldConstrs.index(building)
+                del oldConstrs[oldIndex]
+                self.inventories[capturer].writableConstrs().append(building)
+        return (building, oldPlayer, oldHealth, oldIndex)
+
+    ##
+    #undoMove
+    #Description: Reverses a move made by applyMove.  Moves must be undone in
+    #   the reverse order they were made.
+    #
+    #Parameters:
+    #   token - the undo token returned by applyMove
+    ##
+    def undoMove(self, token):
+        self.invalidateBoard()
+        board = self._board
+        moveType = token[0]
+        self.hashKey = token[1]
+
+        if moveType == MOVE_ANT:
+            (moveType, oldHash, ant, startCoord, oldHasMoved, target, oldHealth, deadIndex) = token
+            if target != None:
+                target.health = oldHealth
+                if deadIndex >= 0:
+                    self.inventories[target.player].ants.insert(deadIndex, target)
+                    if board != None:
+                        board[target.coords[0]][target.coords[1]].ant = target
+            if board != None:
+                board[ant.coords[0]][ant.coords[1]].ant = None
+                board[startCoord[0]][startCoord[1]].ant = ant
+            ant.coords = startCoord
+            ant.hasMoved = oldHasMoved
+
+        elif moveType == BUILD:
+            (moveType, oldHash, built, cost) = token
+            inv = self.inventories[self.whoseTurn]
+            if type(built) is Ant:
+                inv.ants.pop()
+                if board != None:
+                    board[built.coords[0]][built.coords[1]].ant = None
+            else:
+                inv.constrs.pop()
+                if board != None:
+                    board[built.coords[0]][built.coords[1]].constr = None
+            inv.foodCount += cost
+
+        elif moveType == END:
+            (moveType, oldHash, whoseTurn, antStates, captures, oldFood) = token
+            self.whoseTurn = whoseTurn
+            self.inventories[whoseTurn].foodCount = oldFood
+            for (ant, hasMoved, carrying) in antStates:
+                ant.hasMoved = hasMoved
+                ant.carrying = carrying
+            for (building, oldPlayer, oldHealth, oldIndex) in reversed(captures):
+                if oldIndex >= 0:
+                    self.inventories[building.player].constrs.remove(building)
+                    self.inventories[oldPlayer].constrs.insert(oldIndex, building)
+                building.player = oldPlayer
+                building.captureHealth = oldHealth
@@ -0,0 +1,1157 @@
+import random, traceback
+import HumanPlayer
+from Construction import *
+from Constants import *
+from GameState import *
+from Inventory import *
+from Building import *
+from Location import *
+from Ant import *
+from Move import *
+from StateView import StateView
+from TimedPlayer import TimedPlayer, InProcessTimedPlayer, MoveTimeout, AIError
+
+##
+# HeadlessGame.py
+#
+# The rules of the game and the loop that plays it, with no user interface
+# (so nothing here needs pygame or a display).  A HeadlessGame can play two
+# Players against each other on its own:
+#
+#            game = HeadlessGame()
+#            winner = game.playGame(playerOne, playerTwo)
+#
+# The GUI (see Game.py) is a HeadlessGame that draws the board, shows
+# messages and waits for the user through the hook methods below (notify,
+# drawBoard, pauseForAIMode, clearHighlights and highlightAttacks), which do
+# nothing here.
+#
+# An AI that raises an exception when asked for a placement, move or attack
+# forfeits the game.  If it is given a moveTimeout, a HeadlessGame also
+# enforces that on the AI players (each runs in a process of its own, or is
+# stopped by a timer in this one, see TimedPlayer.py): an AI that takes
+# longer than that to answer forfeits the game too.  AIs are asked for their
+# moves with getMoveTimed, which tells them the deadline; one that has
+# published a move (see Player.publishMove) when the deadline passes has that
+# move played instead of forfeiting.
+#
+
+##
+#HeadlessGame
+#Description: Keeps track of game logic and manages the play loop.
+#
+#Variables:
+#   state - the GameState of the game being played
+#   currentPlayers - the two Players playing it (PLAYER_ONE's first)
+#   gameOver - True once the game has ended
+#   winner, loser - the playerIds of the winner and loser (None until the
+#       game has been won, and for a draw)
+#   turnCount - the number of turns ended in the play phase so far
+#   maxTurns - the game is a draw once this many turns (counting each
+#       player's turns separately) have been played.  None for no limit.
+#   moveTimeout - the time limit (in seconds) on each answer of an AI
+#       player, or None for no limit
+#   timedPlayers - {AI player: the TimedPlayer that runs it} (kept from game
+#       to game, so each AI's process and timing stats are too)
+#   inProcess - if True, timed AIs run in this process (see
+#       InProcessTimedPlayer) rather than each in a process of its own
+#   timedOut - the playerId of the player that ran out of time (None unless
+#       one has)
+#   crashed - the playerId of the player that raised an exception (None
+#       unless one has)
+#   errorNotify - True while an error message is showing for a human player
+#   expectingAttack - True while a human player is choosing an ant to attack
+#   randomSetup - if True, human players' setup pieces are placed at random
+##
+class HeadlessGame(object):
+
+    ##
+    #__init__
+    #Description: Initializes the game's attributes
+    #
+    #Parameters:
+    #   maxTurns - see maxTurns above (optional)
+    #   moveTimeout - see moveTimeout above (optional)
+    #   inProcess - see inProcess above (optional)
+    ##
+    def __init__(self, maxTurns=None, moveTimeout=None, inProcess=False):
+        self.maxTurns = maxTurns
+        self.moveTimeout = moveTimeout
+        self.inProcess = inProcess
+        self.timedPlayers = {}
+        self.randomSetup = False
+        self.initGame()
+
+    ##
+    #initGame
+    #Description: resets the game's attributes to their starting state
+    #
+    ##
+    def initGame(self):
+        board = [[Location((col, row)) for row in xrange(0,BOARD_LENGTH)] for col in xrange(0,BOARD_LENGTH)]
+        p1Inventory = Inventory(PLAYER_ONE, [], [], 0)
+        p2Inventory = Inventory(PLAYER_TWO, [], [], 0)
+        neutralInventory = Inventory(NEUTRAL, [], [], 0)
+        self.state = GameState(board, [p1Inventory, p2Inventory, neutralInventory], MENU_PHASE, PLAYER_ONE)
+        self.currentPlayers = []
+        self.errorNotify = False
+        self.gameOver = False
+        self.winner = None
+        self.loser = None
+        self.turnCount = 0
+        self.timedOut = None
+        self.crashed = None
+        #Human vs AI mode
+        self.expectingAttack = False
+
+    ##
+    #playGame
+    #Description: Plays a whole game (from setup) between two players
+    #
+    #Parameters:
+    #   playerOne - the Player that goes first (Player)
+    #   playerTwo - the other Player (Player)
+    #
+    #Returns: PLAYER_ONE or PLAYER_TWO (whichever won), or None for a draw
+    ##
+    def playGame(self, playerOne, playerTwo):
+        self.initGame()
+        #the players' ids are the sides they play (as in AI vs. AI mode)
+        playerOne.playerId = PLAYER_ONE
+        playerTwo.playerId = PLAYER_TWO
+        self.currentPlayers = [self.timed(playerOne), self.timed(playerTwo)]
+        for player in self.currentPlayers:
+            if type(player) is TimedPlayer:
+                #(an AI in a process of its own has its own random numbers)
+                player.reseed(random.getrandbits(32))
+        self.state.phase = SETUP_PHASE_1
+        self.runGame()
+        return self.winner
+
+    ##
+    #timed
+    #Description: Returns the player to play in place of a given one: the
+    #   TimedPlayer that runs it if it is an AI and moves are timed, otherwise
+    #   the player itself
+    ##
+    def timed(self, player):
+        if self.moveTimeout == None or type(player) is HumanPlayer.HumanPlayer:
+            return player
+        if player not in self.timedPlayers:
+            if self.inProcess:
+                self.timedPlayers[player] = InProcessTimedPlayer(player, self.moveTimeout)
+            else:
+                self.timedPlayers[player] = TimedPlayer(player, self.moveTimeout)
+        return self.timedPlayers[player]
+
+    ##
+    #askPlayer
+    #Description: Asks the player whose turn it is for something (calls one of
+    #   its methods).  An AI that runs out of time or raises an exception
+    #   forfeits the game (see error).
+    #
+    #Parameters:
+    #   method - the player's method
+    #   args - the arguments to call it with
+    #
+    #Return: (True, the player's answer), or (False, None) if it forfeited
+    ##
+    def askPlayer(self, method, *args):
+        try:
+            return (True, method(*args))
+        except MoveTimeout as timeout:
+            self.error(TIMED_OUT, timeout.seconds)
+        except Exception as crash:
+            self.error(AI_CRASHED, crashReport(crash))
+        return (False, None)
+
+    ##
+    #stopTimedPlayers
+    #Description: Stops the AI players' processes (they are started again if
+    #   the players play another game)
+    ##
+    def stopTimedPlayers(self):
+        for timedPlayer in self.timedPlayers.values():
+            timedPlayer.stop()
+
+    ##
+    #notify
+    #Description: Shows a message to the user (the GUI's status line)
+    ##
+    def notify(self, message):
+        pass
+
+    ##
+    #drawBoard
+    #Description: Redraws the board (and checks for user input)
+    ##
+    def drawBoard(self):
+        pass
+
+    ##
+    #pauseForAIMode
+    #Description: Waits for the user to step through an AI vs. AI game
+    ##
+    def pauseForAIMode(self):
+        pass
+
+    ##
+    #clearHighlights
+    #Description: Clears any highlighted path or attack targets
+    ##
+    def clearHighlights(self):
+        pass
+
+    ##
+    #highlightAttacks
+    #Description: Highlights the ants a human player may attack
+    #
+    #Parameters:
+    #   coords - the coordinates of the ants (as the player sees them)
+    ##
+    def highlightAttacks(self, coords):
+        pass
+
+    ##
+    # runGame
+    #
+    # Description: the main game loop
+    #
+    # ToDo:  This method is way too large and needs to be broken up
+    #
+    ##
+    def runGame(self):
+        #build a list of things to place for player 1 in setup phase 1
+        #1 anthill/queen, 1 tunnel/worker, 9 obstacles
+        constrsToPlace = []
+        constrsToPlace += [Building(None, ANTHILL, PLAYER_ONE)]
+        constrsToPlace += [Building(None, TUNNEL, PLAYER_ONE)]
+        constrsToPlace += [Construction(None, GRASS) for i in xrange(0,9)]
+    
+        while not self.gameOver:
+            if self.state.phase == MENU_PHASE:
+                #if we are in menu phase at this point, a reset was requested so break
+                break
+            elif self.state.phase == PLAY_PHASE:
+                #share the state with the player from its point of view (a
+                #copy is only made if the player changes it).  The view and
+                #what it hands out only pass for the real objects with
+                #isinstance, and not always then: type() and "is" tests
+                #tell them apart (see StateView.py)
+                theState = StateView(self.state, self.state.whoseTurn)
+            else:
+                #create a copy of the state to share with the player
+                theState = self.state.clone()
+                #if the player is player two, flip the board
+                if theState.whoseTurn == PLAYER_TWO:
+                    theState.flipBoard()
+
+            if self.state.phase == SETUP_PHASE_1 or self.state.phase == SETUP_PHASE_2:
+                currentPlayer = self.currentPlayers[self.state.whoseTurn]
+                if type(currentPlayer) is HumanPlayer.HumanPlayer:
+                    if constrsToPlace[0].type == ANTHILL:
+                        self.notify("Place anthill on your side.")
+                    elif constrsToPlace[0].type == TUNNEL:
+                        self.notify("Place tunnel on your side.")
+                    elif constrsToPlace[0].type == GRASS:
+                        self.notify("Place grass on your side.")
+                    elif constrsToPlace[0].type == FOOD:
+                        self.notify("Place food on enemy's side.")
+                #clear targets list as anything on list been processed on last loop
+                targets = []
+                
+                #do auto-random setup for human player if required
+                if (self.randomSetup) and (type(currentPlayer) is HumanPlayer.HumanPlayer):
+                    if (constrsToPlace[0].type != FOOD):
+                        coord = (random.randint(0,9), random.randint(0,3))
+                        if (self.state.board[coord[0]][coord[1]].constr == None):
+                            targets.append(coord)
+                    elif (constrsToPlace[0].type == FOOD):
+                        coord = (random.randint(0,9), random.randint(6,9))
+                        if (self.state.board[coord[0]][coord[1]].constr == None):
+                            targets.append(coord)
+
+                #hide the 1st player's set anthill and grass placement from the 2nd player
+                if theState.whoseTurn == PLAYER_TWO and self.state.phase == SETUP_PHASE_1:
+                    theState.clearConstrs()
+                    
+                #get the placement from the player
+                (answered, placement) = self.askPlayer(currentPlayer.getPlacement, theState)
+                if not answered:
+                    break
+                targets += placement
+                #only want to place as many targets as constructions to place
+                if len(targets) > len(constrsToPlace):
+                    targets = targets[:len(constrsToPlace)]
+
+                validPlace = self.isValidPlacement(constrsToPlace, targets)
+                if validPlace:
+                    for target in targets:
+                        #translate coords to match player
+                        target = self.state.coordLookup(target, self.state.whoseTurn)
+                        #get construction to place
+                        constr = constrsToPlace.pop(0)
+                        #give constr its coords
+                        constr.coords = target
+                        #put constr on board
+                        self.state.board[target[0]][target[1]].constr = constr
+                        if constr.type == ANTHILL or constr.type == TUNNEL:
+                            #update the inventory
+                            self.state.inventories[self.state.whoseTurn].constrs.append(constr)
+                        else:  #grass and food
+                            self.state.inventories[NEUTRAL].constrs.append(constr)
+                    
+                    #if AI mode, pause to observe move until next or continue is clicked
+                    self.pauseForAIMode()
+                    if self.state.phase == MENU_PHASE:
+                        #if we are in menu phase at this point, a reset was requested so we need to break the game loop.
+                        break
+                    
+                    if not constrsToPlace:
+                        constrsToPlace = []
+                        if self.state.phase == SETUP_PHASE_1:
+                            if self.state.whoseTurn == PLAYER_ONE:
+                                constrsToPlace += [Building(None, ANTHILL, PLAYER_TWO)]
+                                constrsToPlace += [Building(None, TUNNEL, PLAYER_TWO)]
+                                constrsToPlace += [Construction(None, GRASS) for i in xrange(0,9)]
+                            elif self.state.whoseTurn == PLAYER_TWO:
+                                constrsToPlace += [Construction(None, FOOD) for i in xrange(0,2)]
+                                self.state.phase = SETUP_PHASE_2
+                        elif self.state.phase == SETUP_PHASE_2:
+                            if self.state.whoseTurn == PLAYER_ONE:
+                                constrsToPlace += [Construction(None, FOOD) for i in xrange(0,2)]
+                            elif self.state.whoseTurn == PLAYER_TWO:
+                                #if we're finished placing, add in queens and move to play phase
+                                p1inventory = self.state.inventories[PLAYER_ONE]
+                                p2inventory = self.state.inventories[PLAYER_TWO]
+                                #get anthill coords
+                                p1AnthillCoords = p1inventory.constrs[0].coords
+                                p2AnthillCoords = p2inventory.constrs[0].coords
+                                #get tunnel coords
+                                p1TunnelCoords = p1inventory.constrs[1].coords
+                                p2TunnelCoords = p2inventory.constrs[1].coords
+                                #create queen and worker ants
+                                p1Queen = Ant(p1AnthillCoords, QUEEN, PLAYER_ONE)
+                                p2Queen = Ant(p2AnthillCoords, QUEEN, PLAYER_TWO)
+                                p1Worker = Ant(p1TunnelCoords, WORKER, PLAYER_ONE)
+                                p2Worker = Ant(p2TunnelCoords, WORKER, PLAYER_TWO)
+                                #put ants on board
+                                self.state.board[p1Queen.coords[0]][p1Queen.coords[1]].ant = p1Queen
+                                self.state.board[p2Queen.coords[0]][p2Queen.coords[1]].ant = p2Queen
+                                self.state.board[p1Worker.coords[0]][p1Worker.coords[1]].ant = p1Worker
+                                self.state.board[p2Worker.coords[0]][p2Worker.coords[1]].ant = p2Worker
+                                #add the queens to the inventories
+                                p1inventory.ants.append(p1Queen)
+                                p2inventory.ants.append(p2Queen)
+                                p1inventory.ants.append(p1Worker)
+                                p2inventory.ants.append(p2Worker)
+                                #give the players the initial food
+                                p1inventory.foodCount = 1
+                                p2inventory.foodCount = 1
+                                #change to play phase
+                                self.notify("")
+                                self.state.phase = PLAY_PHASE
+                                
+                        #change player turn in state
+                        self.state.whoseTurn = (self.state.whoseTurn + 1) % 2
+                            
+                else:
+                    if not type(currentPlayer) is HumanPlayer.HumanPlayer:
+                        #cause current player to lose game because AIs aren't allowed to make mistakes.
+                        self.error(INVALID_PLACEMENT, targets)
+                        break
+                    elif validPlace != None:
+                        self.notify("Invalid placement.")
+                        self.errorNotify = True
+                
+            elif self.state.phase == PLAY_PHASE: 
+                currentPlayer = self.currentPlayers[self.state.whoseTurn]
+                
+                #display instructions for human player
+                if type(currentPlayer) is HumanPlayer.HumanPlayer:
+                    #An error message is showing
+                    if not self.errorNotify:
+                        #nothing selected yet
+                        if not currentPlayer.coordList:
+                            self.notify("Select an ant or building.")
+                        #ant selected
+                        elif not self.state.board[currentPlayer.coordList[0][0]][currentPlayer.coordList[0][1]].ant == None:
+                            self.notify("Select move for ant.")
+                        #Anthill selected
+                        elif not self.state.board[currentPlayer.coordList[0][0]][currentPlayer.coordList[0][1]].constr == None:
+                            self.notify("Select an ant type to build.")
+                        else:
+                            self.notify("")
+
+                            
+                #get the move from the current player (an AI's may be timed)
+                (answered, move) = self.askPlayer(currentPlayer.getMove, theState)
+                if not answered:
+                    break
+                
+                if isinstance(move, Move) and move.coordList != None:
+                    #translate coords of move to match player (into a new Move:
+                    #the player may hold on to the one it gave, e.g. in a cache,
+                    #and its coordList may be any sequence, e.g. a tuple).  What
+                    #isn't a sequence of tuples is left for isValidMove to reject.
+                    try:
+                        coords = list(move.coordList)
+                    except TypeError:
+                        coords = None
+                    if coords != None:
+                        move = Move(move.moveType,
+                                    [self.state.coordLookup(coord, self.state.whoseTurn)
+                                     if type(coord) is tuple else coord
+                                     for coord in coords],
+                                    move.buildType)
+                
+                #make sure it's a valid move
+                validMove = self.isValidMove(move)
+                
+                #complete the move if valid
+                if validMove:
+                    #check move type
+                    if move.moveType == MOVE_ANT:
+                        startCoord = move.coordList[0]
+                        endCoord = move.coordList[-1]
+                        
+                        #take ant from start coord
+                        antToMove = self.state.board[startCoord[0]][startCoord[1]].ant
+                        #change ant's coords and hasMoved status
+                        antToMove.coords = (endCoord[0], endCoord[1])
+                        antToMove.hasMoved = True
+                        #remove ant from location
+                        self.state.board[startCoord[0]][startCoord[1]].ant = None
+                        #put ant at last loc in coordList
+                        self.state.board[endCoord[0]][endCoord[1]].ant = antToMove
+                        
+                        #clear all highlights after move happens
+                        self.clearHighlights()
+                        
+                        #if AI mode, pause to observe move until next or continue is clicked                               
+                        self.pauseForAIMode()
+                        if self.state.phase == MENU_PHASE:
+                            #if we are in menu phase at this point, a reset was requested so we need to break the game loop.
+                            break
+                        
+                        #check and take action for attack
+                        self.resolveAttack(antToMove, currentPlayer)
+                        if self.state.phase == MENU_PHASE or self.gameOver:
+                            #if we are in menu phase at this point, a reset was requested so we need to break the game loop.
+                            #(the game is over if the player ran out of time)
+                            break
+
+                        #clear all highlights after attack happens
+                        self.clearHighlights()
+                        
+                    elif move.moveType == BUILD:
+                        coord = move.coordList[0]
+                        currentPlayerInv = self.state.inventories[self.state.whoseTurn]
+                                                 
+                        #subtract the cost of the item from the player's food count
+                        if move.buildType == TUNNEL:
+                            currentPlayerInv.foodCount -= CONSTR_STATS[move.buildType][BUILD_COST]
+                            
+                            tunnel = Building(coord, TUNNEL, self.state.whoseTurn)
+                            self.state.board[coord[0]][coord[1]].constr = tunnel
+                            currentPlayerInv.constrs.append(tunnel)
+                        else:
+                            currentPlayerInv.foodCount -= UNIT_STATS[move.buildType][COST]
+                            
+                            ant = Ant(coord, move.buildType, self.state.whoseTurn)
+                            ant.hasMoved = True
+                            self.state.board[coord[0]][coord[1]].ant = ant
+                            self.state.inventories[self.state.whoseTurn].ants.append(ant)
+                        
+                        #if AI mode, pause to observe move until next or continue is clicked
+                        self.pauseForAIMode()
+                        if self.state.phase == MENU_PHASE:
+                            #if we are in menu phase at this point, a reset was requested so we need to break the game loop.
+                            break
+                        
+                        #clear all highlights after build
+                        self.clearHighlights()
+                        
+                    elif move.moveType == END:
+                        #take care of end of turn business for ants and contructions
+                        for ant in self.state.inventories[self.state.whoseTurn].ants:
+                            constrUnderAnt = self.state.board[ant.coords[0]][ant.coords[1]].constr
+                            if constrUnderAnt != None:
+                                #if constr is enemy's and ant hasnt moved, affect capture health of buildings
+                                if type(constrUnderAnt) is Building and not ant.hasMoved and not constrUnderAnt.player == self.state.whoseTurn:
+                                    constrUnderAnt.captureHealth -= 1
+                                    if constrUnderAnt.captureHealth == 0 and constrUnderAnt.type != ANTHILL:
+                                        #move the building to its new owner's inventory
+                                        self.state.inventories[constrUnderAnt.player].constrs.remove(constrUnderAnt)
+                                        self.state.inventories[self.state.whoseTurn].constrs.append(constrUnderAnt)
+                                        constrUnderAnt.player = self.state.whoseTurn
+                                        constrUnderAnt.captureHealth = CONSTR_STATS[constrUnderAnt.type][CAP_HEALTH]
+                                #have all worker ants on food sources gather food
+                                elif constrUnderAnt.type == FOOD and ant.type == WORKER:
+                                    ant.carrying = True
+                                #deposit carried food (only workers carry)
+                                elif (constrUnderAnt.type == ANTHILL or constrUnderAnt.type == TUNNEL) and ant.carrying == True:
+                                    self.state.inventories[self.state.whoseTurn].foodCount += 1
+                                    ant.carrying = False
+                            
+                            #reset hasMoved on all ants of player
+                            ant.hasMoved = False   
+                            
+                        #clear any currently highlighted squares
+                        self.clearHighlights()
+                        
+                        #switch whose turn it is
+                        self.state.whoseTurn = (self.state.whoseTurn + 1) % 2
+                        self.turnCount += 1
+
+                        #notify player which AI is acting
+                        nextPlayerName = self.currentPlayers[self.state.whoseTurn].author
+                        self.notify(nextPlayerName + "'s turn.")
+                        
+                        #if AI mode, pause to observe move until next or continue is clicked
+                        self.pauseForAIMode()
+                        if self.state.phase == MENU_PHASE:
+                            #if we are in menu phase at this point, a reset was requested so we need to break the game loop.
+                            break
+                else:     
+                    #human can give None move, AI can't
+                    if not type(currentPlayer) is HumanPlayer.HumanPlayer:
+                        self.error(INVALID_MOVE, move)
+                        break
+                    elif validMove != None:
+                        #if validMove is False and not None, clear move
+                        currentPlayer.coordList = []
+                        self.clearHighlights()
+          
+            #determine if if someone is a winner.
+            if self.hasWon(PLAYER_ONE):
+                self.setWinner(PLAYER_ONE)
+                
+            elif self.hasWon(PLAYER_TWO):
+                self.setWinner(PLAYER_TWO)
+
+            #call it a draw if the game has gone on too long
+            elif self.maxTurns != None and self.turnCount >= self.maxTurns:
+                self.gameOver = True
+                
+            #redraw the board periodically and check for user input
+            self.drawBoard()
+            
+        #end game loop
+
+    ##
+    #setWinner
+    #Description: Given a current player ID (0 or 1), sets that player to be the winner of the current game.
+    #
+    #Parameters:
+    #   id - the current player ID. (int)
+    ##
+    def setWinner(self, id):
+        self.gameOver = True
+        self.winner = self.currentPlayers[id].playerId
+        self.loser = self.currentPlayers[(id + 1) % 2].playerId
+         
+        #tell the players if they won or lost (the game is decided, so an AI
+        #that fails to take the news is only reported)
+        for (player, hasWon) in [(self.currentPlayers[id], True),
+                                 (self.currentPlayers[(id + 1) % 2], False)]:
+            try:
+                player.registerWin(hasWon)
+            except Exception as crash:
+                print "AI ERROR: registerWin raised an exception\n" + crashReport(crash)
+    
+    ##
+    #resolveAttack 
+    #Description: Checks a player wants to attack and takes appropriate action.
+    #
+    #Parameters:
+    #   attackingAnt - The Ant that has an available attack (Ant)
+    #   currentPlayer - The Player whose turn it currently is (Player)
+    ##   
+    def resolveAttack(self, attackingAnt, currentPlayer):
+        #check if player wants to attack
+        validAttackCoords = []
+        opponentId = (self.state.whoseTurn + 1) % 2
+        range = UNIT_STATS[attackingAnt.type][RANGE]
+        for ant in self.state.inventories[opponentId].ants:
+            if self.isValidAttack(attackingAnt, ant.coords):
+                #keep track of valid attack coords (flipped for player two)
+                validAttackCoords.append(self.state.coordLookup(ant.coords, self.state.whoseTurn))
+        if validAttackCoords != []:
+            #give instruction to human player
+            if type(currentPlayer) is HumanPlayer.HumanPlayer:
+                self.notify("Select ant to attack")
+            
+            #players must attack if possible and we know at least one is valid
+            attackCoord = None
+            validAttack = False
+            
+            #if a human player, let it know an attack is expected (to affect location clicked context)
+            if type(currentPlayer) is HumanPlayer.HumanPlayer:
+                #give the valid attack coords to the ui to highlight                                
+                self.highlightAttacks(validAttackCoords)
+                #set expecting attack for location clicked context
+                self.expectingAttack = True
+            
+            #keep requesting coords until valid attack is given
+            while attackCoord == None or not validAttack:               
+                #Draw the board again (to recognize user input inside loop)
+                self.drawBoard()
+                
+                if self.state.phase == MENU_PHASE:
+                    #if we are in menu phase at this point, a reset was requested so we need to break the game loop.
+                    return
+                
+                #Give the player a view of the state from its point of view
+                #(see the view made in runGame)
+                theState = StateView(self.state, self.state.whoseTurn)
+                        
+                #get the attack from the player (flipped for player two)
+                (answered, attackCoord) = self.askPlayer(currentPlayer.getAttack, theState,
+                                                         attackingAnt.clone(), validAttackCoords)
+                if not answered:
+                    return
+                attackCoord = self.state.coordLookup(attackCoord, self.state.whoseTurn)
+                
+                #check for the move's validity
+                validAttack = self.isValidAttack(attackingAnt, attackCoord)
+                if not validAttack:
+                    if not type(currentPlayer) is HumanPlayer.HumanPlayer:
+                        #if an ai submitted an invalid attack, exit
+                        self.error(INVALID_ATTACK, attackCoord)
+                        break
+                    else:
+                        #if a human submitted an invalid attack, reset coordList
+                        currentPlayer.coordList = []
+
+            #if we reached this point though loop, we must have a valid attack
+            #if a human player, let it know an attack is expected (to affect location clicked context)
+            if type(currentPlayer) is HumanPlayer.HumanPlayer:
+                self.expectingAttack = False
+                currentPlayer.coordList = []
+            
+            #decrement ants health
+            attackedAnt = self.state.board[attackCoord[0]][attackCoord[1]].ant
+            attackedAnt.health -= UNIT_STATS[attackingAnt.type][ATTACK]
+            
+            #check for dead ant
+            if attackedAnt.health <= 0:
+                #remove dead ant from board
+                self.state.board[attackCoord[0]][attackCoord[1]].ant = None
+                #remove dead ant from inventory
+                self.state.inventories[opponentId].ants.remove(attackedAnt)
+                
+            #if AI mode, pause to observe attack until next or continue is clicked
+            self.pauseForAIMode()
+
+    ##
+    # errorReport
+    #
+    # Description:  Notifies the user of an invalid move.  For AI
+    # players, this takes the form of a message on the console.
+    #
+    # Parameters:
+    #   msg - the message to send
+    #
+    def errorReport(self, msg):
+        currentPlayer = self.currentPlayers[self.state.whoseTurn]
+        if type(currentPlayer) is HumanPlayer.HumanPlayer:
+            return
+        print msg
+        
+    ##
+    #isValidMove(Move)
+    #Description: Checks to see if the move is valid for the current player.
+    # 
+    #Parameters:
+    #   move - The Move to check (Move)
+    #
+    #Returns: None if no move is given, true if the given move is valid, or false if the given move is invalid
+    ##
+    def isValidMove(self, move):
+        #check for no move
+        if move == None:
+            self.errorReport("ERROR: Invalid Move: " + str(move))
+            return None
+        
+        #check that the move is well-formed typewise (tuples, ints, etc)
+        if not isinstance(move, Move):
+            self.errorReport("ERROR: Invalid Move: " + str(move))
+            self.errorReport("ERROR:  player did not supply an object of type 'Move'")
+            return False
+        if type(move.moveType) != int:
+            self.errorReport("ERROR: Invalid Move: " + str(move))
+            self.errorReport("       Move type must be an integer.")
+            return False
+        #for END type moves, lots we don't need to check
+        if move.moveType == END:
+            return True
+        if move.coordList == None or type(move.coordList) != list or len(move.coordList) == 0:
+            self.errorReport("ERROR: Invalid Move: " + str(move))
+            self.errorReport("       The coordinate list is empty!")
+            return False
+        index = 0
+        for coord in move.coordList:
+            if (type(coord) != tuple):
+                self.errorReport("ERROR: Invalid Move: " + str(move))
+                self.errorReport("       Coordinate at index " + str(index) + " is not a tuple.")
+                return False
+            if (len(coord) != 2):
+                self.errorReport("ERROR: Invalid Move: " + str(move))
+                self.errorReport("       Coordinate at index " + str(index) + " has " + str(len(coord)) + "entries instead of 2.")
+                return False
+            if (type(coord[0]) != int) or (type(coord[1]) != int):
+                self.errorReport("ERROR: Invalid Move: " + str(move))
+                self.errorReport("       Coordinate at index " + str(index) + " contains a value that is not an int.")
+                return False
+            index += 1
+        if type(move.buildType) != type(None) and type(move.buildType) != int:
+            return False
+
+        #for MOVE_ANT and BUILD type moves
+        if move.moveType == MOVE_ANT:
+            firstCoord = move.coordList[0]
+            #check valid start location (good coords and ant ownership)
+            if self.checkMoveStart(firstCoord):
+                #get ant to move
+                antToMove = self.state.board[firstCoord[0]][firstCoord[1]].ant
+                movePoints = UNIT_STATS[antToMove.type][MOVEMENT]             
+                previousCoord = None
+
+                index = 0
+                for coord in move.coordList:
+                    #if first runthough, need to set up previous coord
+                    if previousCoord == None:
+                        previousCoord = coord
+                        continue  
+                    #if any to-coords are invalid, return invalid move
+                    if not self.checkMovePath(previousCoord, coord):
+                        self.errorReport("ERROR: Invalid Move: " + str(move))
+                        self.errorReport("       Illegal movement path at index" + str(index))
+                        return False
+                        
+                    #subtract cost of loc from movement points
+                    constrAtLoc = self.state.board[coord[0]][coord[1]].constr
+                    if constrAtLoc == None or antToMove.type == DRONE:
+                        movePoints -= 1
+                    else:
+                        movePoints -= CONSTR_STATS[constrAtLoc.type][MOVE_COST]
+                        
+                    previousCoord = coord
+                    index += 1
+                    
+                #Check for Queen ant trying to leave her territory
+                if (antToMove.type == QUEEN):
+                    for coord in move.coordList:
+                        if (coord[1] == BOARD_LENGTH / 2 - 1) \
+                        or (coord[1] == BOARD_LENGTH / 2):
+                            self.errorReport("ERROR: Invalid Move: " + str(move))
+                            self.errorReport("       Queen ant may not leave her own territory")
+                            return False
+                            
+                #within movement range and hasn't moved yet?
+                if (movePoints < 0):
+                    self.errorReport("ERROR: Invalid Move: " + str(move))
+                    self.errorReport("       Ant has insufficient movement points for this move")
+                    return False
+                if antToMove.hasMoved:
+                    self.errorReport("ERROR: Invalid Move: " + str(move))
+                    self.errorReport("       Ant has already made a move this turn")
+                    return False
+                else:
+                    return True
+                        
+        elif move.moveType == BUILD:
+            #coord list must contain one point for build
+            if len(move.coordList) != 1:
+                self.errorReport("ERROR: Invalid Move: " + str(move))
+                self.errorReport("       for a BUILD move, the coordinate list should contain exactly 1 coordinate")
+                return False
+        
+            buildCoord = move.coordList[0]
+            #check valid start location
+            if self.checkBuildStart(buildCoord):
+                #we're building either an ant or constr for sure
+               
+                if self.state.board[buildCoord[0]][buildCoord[1]].ant == None:
+                #we know we're building an ant
+                    buildCost = None
+                    #check buildType for valid ant
+                    if move.buildType == WORKER:
+                        buildCost = UNIT_STATS[WORKER][COST]
+                    elif move.buildType == DRONE:
+                        buildCost = UNIT_STATS[DRONE][COST]
+                    elif move.buildType == SOLDIER:
+                        buildCost = UNIT_STATS[SOLDIER][COST]
+                    elif move.buildType == R_SOLDIER:
+                        buildCost = UNIT_STATS[R_SOLDIER][COST]
+                    else:
+                        self.errorReport("ERROR: Invalid Move: " + str(move))
+                        self.errorReport("       the buildType must be one of:  WORKER, DRONE, SOLDIER or R_SOLDIER.")
+                        return False
+                    
+                    #check the player has enough food
+                    currFood = self.state.inventories[self.state.whoseTurn].foodCount
+                    if currFood >= buildCost:
+                        self.notify("")
+                        return True
+                    else:
+                        self.errorReport("ERROR: Invalid Move: " + str(move))
+                        self.errorReport("       Player has " + str(currFood) + " food but needs " + str(buildCost) + " to build this ant")
+                        self.notify("Requires " + str(buildCost) + " food.")
+                        self.errorNotify = True
+                        return False
+                else:
+                #we know we're building a construction
+                    adjacentCoords = []
+                    adjacentCoords.append(addCoords(buildCoord, (0, -1)))
+                    adjacentCoords.append(addCoords(buildCoord, (0, 1)))
+                    adjacentCoords.append(addCoords(buildCoord, (-1, 0)))
+                    adjacentCoords.append(addCoords(buildCoord, (1, 0)))
+                
+                    #check that there's no food in adjacent locations
+                    for aCoord in adjacentCoords:
+                        if aCoord[0] >= 0 and aCoord[0] < 10 and aCoord[1] >= 0 and aCoord[1] < 10:
+                            if (self.state.board[aCoord[0]][aCoord[1]].constr != None and
+                                    self.state.board[aCoord[0]][aCoord[1]].constr.type == FOOD):
+                                self.errorReport("ERROR: Invalid Move: " + str(move))
+                                self.errorReport("       Cannot tunnel build next to food.")
+                                self.notify("Cannot tunnel build next to food.")
+                                self.errorNotify = True
+                                return False
+                 
+                    buildCost = CONSTR_STATS[TUNNEL][BUILD_COST]
+                    if self.state.inventories[self.state.whoseTurn].foodCount >= buildCost:
+                        self.notify("")
+                        return True
+                    else:
+                        self.notify("Requires "+ str(buildCost) + " food.")
+                        self.errorNotify = True
+                        self.errorReport("ERROR: Invalid Move: " + str(move))
+                        self.errorReport("       Must have at least " + str(buildCost) + " food to build a tunnel.")
+                        return False
+            else:  #invalid build start
+                self.errorReport("ERROR: Invalid Move: " + str(move))
+                self.errorReport("       Build location invalid.  Possible cause:")
+                loc = self.state.board[buildCoord[0]][buildCoord[1]]
+                if loc.ant == None:  #building ant
+                    self.errorReport("         - Anthill does not belong to current player")
+                else:
+                    if (move.buildType != TUNNEL):
+                        self.errorReport("         - Anthill is already occupied")
+                    elif (loc.ant.hasMoved):
+                        self.errorReport("         - Worker ant has already moved this turn")
+                    else:
+                        self.errorReport("         - Worker ant does not belong to current player")
+        else:
+            #invalid numeric move type
+            return False
+            
+    ##
+    #isValidPlacement
+    #Description: Checks that the given placement of Constructions is valid
+    #
+    #Paramters:
+    #   items - The items to place (Construction[])
+    #   targets - A list of the coordinates to place the items at ((int,int)[])
+    #
+    #Returns None if no target is given, true if it is a valid placement, or false if it is an invalid placement
+    ##
+    def isValidPlacement(self, items, targets):
+        #check for well-formed input of targets (from players)
+        if type(targets) == type(None) or type(targets) != list:
+            return False
+         #If no target, return None (human vs ai caught by caller)
+        if len(targets) == 0:
+            return None
+        for coord in targets:
+            if not self.isValidCoord(coord):
+                return False
+
+        for i in range(0, len(targets)):
+            #Nobody can place in the center two rows of the board or on their opponents side
+                 
+            #check item type
+            if items[i].type == ANTHILL or items[i].type == TUNNEL or items[i].type == GRASS:
+                #check targets[i] is within proper boundaries y-wise
+                #must be on own side
+                if not self.isInHomeTerritory(targets[i]):
+                    return False
+            #check item type
+            elif items[i].type == FOOD:
+                #check targets[i] is within proper boundaries y-wise
+                #must be on opponent's side
+                if not self.isInEnemyTerritory(targets[i]):
+                    return False
+            else:
+                #I don't know what this type is.
+                return False
+            
+            #change target to access appropriate players locations
+            aTarget = self.state.coordLookup(targets[i], self.state.whoseTurn)
+            #make sure nothing is there yet
+            if not self.state.board[aTarget[0]][aTarget[1]].constr == None:
+                return False
+                    
+        return True
+      
+    ##
+    #isValidAttack
+    #Description: Determines whether the attack with the given parameters is valid
+    #   Attacking ant is assured to exist and belong to the player whose turn it is
+    #
+    #Parameters:
+    #   attackingAnt - The Ant that is attacking (Ant)
+    #   attackCoord - The coordinates of the Ant that is being attacked ((int,int))
+    #
+    #Returns: None if there is no attackCoord, true if valid attack, or false if invalid attack
+    ##  
+    def isValidAttack(self, attackingAnt, attackCoord):
+        if attackCoord == None:
+            return None
+        
+        #check for well-formed input from players
+        if not self.isValidCoord(attackCoord):
+            return False
+    
+        attackLoc = self.state.board[attackCoord[0]][attackCoord[1]]
+        
+        if attackLoc.ant == None or attackLoc.ant.player == attackingAnt.player:
+            return False
+        
+        #we know we have an enemy ant
+        range = UNIT_STATS[attackingAnt.type][RANGE]
+        diffX = abs(attackingAnt.coords[0] - attackCoord[0])
+        diffY = abs(attackingAnt.coords[1] - attackCoord[1])
+        
+        #pythagoras would be proud
+        if range ** 2 >= diffX ** 2 + diffY ** 2:
+            #return True if within range
+            return True
+        else:
+            return False
+   
+    ##
+    #isValidCoord
+    #Description: Retruns whether this coord represents a valid board location. 
+    #
+    #Parameters:
+    #   coord - The coord to be checked trying to be checked ((int, int))
+    #
+    #Returns: True if the coordinate is between (0,0) and (9,9)
+    ##
+    def isValidCoord(self, coord):
+        #check for well-formed coord
+        if type(coord) != tuple or len(coord) != 2 or type(coord[0]) != int or type(coord[1]) != int:
+            return False
+        
+        #check boundaries
+        if coord[0] < 0 or coord[1] < 0 or coord[0] >= BOARD_LENGTH or coord[1] >= BOARD_LENGTH:
+            return False
+            
+        return True
+   
+    ##
+    # isInHomeTerritory
+    #
+    # Description: determines whether the position is in the player's
+    # home territory
+    #
+    # Parameters:
+    #   coord - The coord to be checked trying to be checked ((int, int))
+    #
+    # Returns: True if it is and False otherwise
+    #
+    ##
+    def isInHomeTerritory(self, coord):
+        if not self.isValidCoord(coord):
+            return False
+        if not (coord[1] >= 0 and coord[1] < BOARD_LENGTH / 2 - 1):
+            return False
+        return True
+
+    ##
+    # isInEnemyTerritory
+    #
+    # Description: determines whether the position is in the player's
+    # enemy's territory
+    #
+    # Parameters:
+    #   coord - The coord to be checked trying to be checked ((int, int))
+    #
+    # Returns: True if it is and False otherwise
+    #
+    ##
+    def isInEnemyTerritory(self, coord):
+        if not self.isValidCoord(coord):
+            return False
+        if not (coord[1] < BOARD_LENGTH and coord[1] >= BOARD_LENGTH / 2 + 1):
+            return False
+        return True
+
+    ##
+    #checkMoveStart 
+    #Description: Checks if the location is valid to move from.
+    #  (bounds and ant ownership)
+    #
+    #Parameters:
+    #   coord - The starting point for the move ((int, int))
+    #
+    #Returns: True if it is a valid starting point for a move and false if not
+    ##
+    def checkMoveStart(self, coord):
+        #check location is on board
+        if self.isValidCoord(coord):
+            antToMove = self.state.board[coord[0]][coord[1]].ant
+            #check that an ant exists at the loc
+            if antToMove != None:
+                #check that it's the player's ant and that it hasn't moved
+                if antToMove.player == self.state.whoseTurn and not antToMove.hasMoved:
+                    return True
+                                      
+        return False
+
+    ##
+    #checkMovePath
+    #Description: Checks if the location is valid to move to.
+    #  (clear path, adjacent locations) 
+    #
+    #Parameters:
+    #   fromCoord - The Ant's current coordinate ((int, int))
+    #   toCoord - The coorinate to move the Ant to ((int, int))
+    #
+    #Returns: True if it is a valid move and false otherwise
+    #
+    #Note: fromCoord must always have been checked by the time it's passed
+    #  (either in checkMoveStart or previous checkMovePath call)
+    ##
+    def checkMovePath(self, fromCoord, toCoord):
+        #check location is on board
+        if self.isValidCoord(toCoord):
+            #check that squares are adjacent (difference on only one axis is 1)
+            if ((abs(fromCoord[0] - toCoord[0]) == 1 and abs(fromCoord[1] - toCoord[1]) == 0) or
+                    (abs(fromCoord[0] - toCoord[0]) == 0 and abs(fromCoord[1] - toCoord[1]) == 1)):
+                antAtLoc = self.state.board[toCoord[0]][toCoord[1]].ant
+                #check if an ant exists at the loc
+                if antAtLoc ==  None:
+                    return True
+                    
+        return False
+
+    ##
+    #checkBuildStart 
+    #Description: Checks if the location is valid to build from.
+    #  (bounds and building ownership)
+    #
+    #Parameters:
+    #   coord - The coordinate trying to be used to build ((int, int))
+    #
+    #Returns: True if it is a valid build location and false otherwise
+    ##    
+    def checkBuildStart(self, coord):
+        #check location is on board
+        if self.isValidCoord(coord):
+            loc = self.state.board[coord[0]][coord[1]]
+            #check that an empty anthill exists at the loc
+            if loc.constr != None and loc.constr.type == ANTHILL and loc.ant == None:
+                #check that it's the player's anthill
+                if loc.constr.player == self.state.whoseTurn:
+                    return True
+            #check that an ant exists at an empty location
+            elif loc.ant != None and loc.ant.type == WORKER and loc.constr == None:       
+                #check that it's the player's ant and it hasn't moved
+                if loc.ant.player == self.state.whoseTurn and not loc.ant.hasMoved:
+                    return True
+                    
+        return False
+
+    ##
+    #hasWon(int)
+    #Description: Determines whether the game has ended in victory for the given player.
+    #
+    #Parameters:
+    #   playerId - The ID of the player being checked for winning (int)
+    #   
+    #Returns: True if the player with playerId has won the game.
+    ##
+    def hasWon(self, playerId):
+        opponentId = (playerId + 1) % 2
+        
+        if ((self.state.phase == PLAY_PHASE) and 
+        ((self.state.inventories[opponentId].getQueen() == None) or
+        (self.state.inventories[opponentId].getAnthill().captureHealth <= 0) or
+        (self.state.inventories[playerId].foodCount >= FOOD_GOAL) or
+        (self.state.inventories[opponentId].foodCount == 0 and 
+            len(self.state.inventories[opponentId].ants) == 1))):
+            return True
+        else:
+            return False
+
+    ##
+    #error
+    #Description: Called when an AI player makes an error. Gives a description
+    #    of what went wrong and exits the program.
+    #
+    #Parameters:
+    #   errorCode - A code indicating the type of error
+    #        info - the offending object that caused the error
+    ##
+    def error(self, errorCode, info):
+        errorMsg = "AI ERROR: "
+
+        if errorCode == INVALID_PLACEMENT:
+            #info is a coord list
+            errorMsg += "invalid placement\nCoords given: "
+            lastCoord = info.pop()
+            for coord in info:
+                errorMsg += "(" + str(coord[0]) + ", " + str(coord[1]) + "), "
+            errorMsg += "(" + str(lastCoord[0]) + ", " + str(lastCoord[1]) + ")"
+
+        elif errorCode == INVALID_MOVE:
+            #info is a move
+            errorMsg += "invalid move: " + str(info) + "\n"
+            if info == None:
+                errorMsg += "Move is non-move type: None"
+            elif type(info) != Move:
+                errorMsg += "Move is non-move type: " + str(type(info))
+            elif info.moveType == None:
+                errorMsg += "moveType is non-int type: None"
+            elif type(info.moveType) != int:
+                errorMsg += "moveType is non-int type: " + str(type(info.moveType))
+            elif info.moveType < MOVE_ANT or info.moveType > END:
+                errorMsg += "moveType not a recognized value: " + str(info.moveType)
+            elif info.moveType == MOVE_ANT:
+                pass
+
+        elif errorCode == TIMED_OUT:
+            #info is the time limit
+            errorMsg += "no answer within " + str(info) + " seconds"
+            self.timedOut = self.state.whoseTurn
+
+        elif errorCode == AI_CRASHED:
+            #info is the traceback
+            errorMsg += "exception raised\n" + info
+            self.crashed = self.state.whoseTurn
+
+        else: #INVALID_ATTACK
+            #info is a coord          
+            errorMsg += "invalid attack\n"
+            errorMsg += "(" + str(info[0]) + ", " + str(info[1]) + ")"
+    
+        print errorMsg
+        self.setWinner((self.state.whoseTurn + 1) % 2)
+
+
+##
+# crashReport
+#
+# Description: returns the traceback of an exception raised by an AI (for an
+# AI in a process of its own, the traceback from that process)
+#
+# Parameters:
+#   crash - the exception (being handled)
+#
+def crashReport(crash):
+    if type(crash) is AIError:
+        return str(crash)
+    return traceback.format_exc()
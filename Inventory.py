@@ -11,9 +11,17 @@ from Constants import *
 #    anthill - The player's anthill
 #    constrs - An array of all the Player's Constructions
 #   foodCount - The amount of food that the player has to use
+#   cowToken - None normally.  For a copy-on-write inventory (see
+#       GameState.cowclone) a token that marks the Ants and Buildings this
+#       inventory owns; everything else may be shared with other states and
+#       must be copied (with writableAnt/writableConstr) before it's changed.
+#   sharedAnts, sharedConstrs - True if the ants/constrs list itself may be
+#       shared with another inventory and must be copied before it's changed
 ##
 class Inventory(object):
 
+    __slots__ = ('player', 'ants', 'constrs', 'foodCount', 'cowToken', 'sharedAnts', 'sharedConstrs')
+
     ##
     #__init__
     #Description: Creates a new Inventory
@@ -28,6 +36,9 @@ class Inventory(object):
         self.ants = antArray
         self.constrs = inputConstructions      
         self.foodCount = inputFood
+        self.cowToken = None
+        self.sharedAnts = False
+        self.sharedConstrs = False
         
     ##
     # return the queen in this inventory
@@ -68,3 +79,68 @@ class Inventory(object):
     # duplicate this inventory
     def clone(self):
         return Inventory(self.player,self.ants,self.constrs,self.foodCount)
+
+    ##
+    # make a copy-on-write duplicate of this inventory.  The two share their
+    # lists and everything in them, so both are given new tokens: from now on
+    # neither owns anything it had before.
+    def cowfork(self):
+        self.cowToken = object()
+        self.sharedAnts = True
+        self.sharedConstrs = True
+        newInv = Inventory(self.player, self.ants, self.constrs, self.foodCount)
+        newInv.cowToken = object()
+        newInv.sharedAnts = True
+        newInv.sharedConstrs = True
+        return newInv
+
+    ##
+    # return True if the given Ant or Building may be changed in place
+    def owns(self, item):
+        return self.cowToken == None or item.cowToken is self.cowToken
+
+    ##
+    # return the ants list, copying it first if it is shared
+    def writableAnts(self):
+        if self.sharedAnts:
+            self.ants = self.ants[:]
+            self.sharedAnts = False
+        return self.ants
+
+    ##
+    # return the constrs list, copying it first if it is shared
+    def writableConstrs(self):
+        if self.sharedConstrs:
+            self.constrs = self.constrs[:]
+            self.sharedConstrs = False
+        return self.constrs
+
+    ##
+    # return a version of the given ant that this inventory owns, replacing it
+    # with a copy if it is shared
+    def writableAnt(self, ant):
+        if self.owns(ant):
+            return ant
+        ants = self.writableAnts()
+        newAnt = ant.clone()
+        newAnt.cowToken = self.cowToken
+        for i in xrange(0, len(ants)):
+            if ants[i] is ant:
+                ants[i] = newAnt
+                break
+        return newAnt
+
+    ##
+    # return a version of the given Building that this inventory owns,
+    # replacing it with a copy if it is shared
+    def writableConstr(self, constr):
+        if self.owns(constr):
+            return constr
+        constrs = self.writableConstrs()
+        newConstr = constr.clone()
+        newConstr.cowToken = self.cowToken
+        for i in xrange(0, len(constrs)):
+            if constrs[i] is constr:
+                constrs[i] = newConstr
+                break
+        return newConstr
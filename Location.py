@@ -9,6 +9,8 @@
 ##
 class Location(object):
 
+    __slots__ = ('ant', 'constr', 'coords')
+
     ##
     #__init__
     #Description: Creates a new Location
@@ -0,0 +1,166 @@
+import os, sys, time, random, argparse
+from Constants import *
+from HeadlessGame import HeadlessGame
+
+##
+# Match.py
+#
+# Plays a match of many games between two AIs from the AI folder with no
+# user interface, alternating which side each AI plays, and reports the
+# results:
+#
+#            python Match.py <AI_A> <AI_B> [--games N] [--seed S] [--max-turns T]
+#                            [--move-timeout SECONDS]
+#
+# (or "python Game.py match ..." with the same arguments).  An AI can be
+# named by its module (file name) or its author string.  Each game is seeded
+# with the match seed plus the game's number, so any game of a match can be
+# replayed on its own.  Each AI runs in a process of its own and forfeits a
+# game if it takes longer than the move timeout (AI_MOVE_TIMEOUT by default)
+# to answer, or if it raises an exception.
+#
+
+#games are drawn after this many turns (both players' turns counted) unless
+#told otherwise
+DEFAULT_MAX_TURNS = 1000
+
+##
+# loadAI
+#
+# Description: makes a player from the AI folder
+#
+# Parameters:
+#   name - the AI's module name or author
+#   playerId - the id to give the player
+#
+# Return: a new AIPlayer (or None if there is no such AI)
+#
+def loadAI(name, playerId):
+    if "AI" not in sys.path:
+        sys.path.insert(0, "AI")
+    moduleNames = [fileName[:-3] for fileName in sorted(os.listdir("AI"))
+                   if fileName.endswith(".py")]
+    if name in moduleNames:
+        return __import__(name).AIPlayer(playerId)
+    for moduleName in moduleNames:
+        player = __import__(moduleName).AIPlayer(playerId)
+        if player.author == name:
+            return player
+    return None
+
+##
+# playMatch
+#
+# Description: plays games back-to-back between two players, swapping sides
+# after each game (playerA goes first in the first game)
+#
+# Parameters:
+#   playerA, playerB - the Players
+#   numGames - the number of games to play
+#   seed - the random seed of the match (optional)
+#   maxTurns - games are drawn after this many turns (optional)
+#   moveTimeout - the time limit (in seconds) on each of the players'
+#       answers, or None for no limit (optional)
+#   verbose - if True, the result of each game is printed as it ends
+#
+# Return: a dict of playerA's "wins", "losses" and "draws", the total
+# "turns" played in all the games, the "seconds" the match took and the
+# players' "timings" (each player's timing stats, see TimedPlayer, or None
+# if moves were not timed)
+#
+def playMatch(playerA, playerB, numGames, seed=0, maxTurns=DEFAULT_MAX_TURNS,
+              moveTimeout=AI_MOVE_TIMEOUT, verbose=False):
+    results = { "wins" : 0, "losses" : 0, "draws" : 0, "turns" : 0, "seconds" : 0.0 }
+    names = [playerA.author, playerB.author]
+    if names[0] == names[1]:
+        names = [names[0] + " (A)", names[1] + " (B)"]
+    game = HeadlessGame(maxTurns, moveTimeout)
+    startTime = time.time()
+    for gameNum in xrange(0, numGames):
+        random.seed(seed + gameNum)
+        if gameNum % 2 == 0:
+            players = [playerA, playerB]
+        else:
+            players = [playerB, playerA]
+        winner = game.playGame(players[PLAYER_ONE], players[PLAYER_TWO])
+        results["turns"] += game.turnCount
+
+        if winner == None:
+            results["draws"] += 1
+            outcome = "draw"
+        elif players[winner] is playerA:
+            results["wins"] += 1
+            outcome = names[0] + " won"
+        else:
+            results["losses"] += 1
+            outcome = names[1] + " won"
+        for (side, what) in [(game.timedOut, "timed out"), (game.crashed, "crashed")]:
+            if side != None:
+                if players[side] is playerA:
+                    outcome += " (" + names[0] + " " + what + ")"
+                else:
+                    outcome += " (" + names[1] + " " + what + ")"
+        if verbose:
+            print "game %d (seed %d): %s after %d turns" % (gameNum + 1, seed + gameNum,
+                                                          outcome, game.turnCount)
+    results["seconds"] = time.time() - startTime
+    if moveTimeout == None:
+        results["timings"] = [None, None]
+    else:
+        results["timings"] = [game.timed(playerA).stats, game.timed(playerB).stats]
+    game.stopTimedPlayers()
+    return results
+
+##
+# main
+#
+# Description: runs a match from the command line and prints its results
+#
+# Parameters:
+#   args - the command line arguments (after the program name)
+#
+def main(args):
+    parser = argparse.ArgumentParser(prog="Match.py",
+                                     description="Plays a match between two AIs with no display.")
+    parser.add_argument("playerA", help="the first AI (module name or author)")
+    parser.add_argument("playerB", help="the second AI (module name or author)")
+    parser.add_argument("--games", type=int, default=100, help="number of games (default 100)")
+    parser.add_argument("--seed", type=int, default=0, help="random seed (default 0)")
+    parser.add_argument("--max-turns", type=int, default=DEFAULT_MAX_TURNS,
+                        help="turns before a game is drawn (default %d)" % DEFAULT_MAX_TURNS)
+    parser.add_argument("--move-timeout", type=float, default=AI_MOVE_TIMEOUT,
+                        help="seconds an AI may take to move, 0 for no limit (default %d)" % AI_MOVE_TIMEOUT)
+    parser.add_argument("--verbose", action="store_true", help="print the result of every game")
+    options = parser.parse_args(args)
+
+    playerA = loadAI(options.playerA, PLAYER_ONE)
+    playerB = loadAI(options.playerB, PLAYER_TWO)
+    for (name, player) in [(options.playerA, playerA), (options.playerB, playerB)]:
+        if player == None:
+            print "ERROR:  AI '" + name + "' not found."
+            return 1
+
+    moveTimeout = options.move_timeout
+    if moveTimeout <= 0:
+        moveTimeout = None
+    results = playMatch(playerA, playerB, options.games, options.seed,
+                        options.max_turns, moveTimeout, options.verbose)
+
+    games = options.games
+    print "%s vs %s: %d games (seed %d)" % (playerA.author, playerB.author, games, options.seed)
+    print "  %s: %d wins, %d losses, %d draws" % (playerA.author, results["wins"],
+                                                  results["losses"], results["draws"])
+    if games > 0:
+        print "  average turns: %.1f" % (float(results["turns"]) / games)
+        print "  %.2f games/second (%.1f seconds)" % (games / max(results["seconds"], 1e-9),
+                                                       results["seconds"])
+    for (player, timing) in zip([playerA, playerB], results["timings"]):
+        if timing != None and timing["calls"] > 0:
+            print "  %s: %d timeouts and %d published moves played in %d answers" % (
+                player.author, timing["timeouts"], timing["published"], timing["calls"])
+            print "      (average %.3f s, slowest %.3f s)" % (timing["seconds"] / timing["calls"],
+                                                           timing["slowest"])
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
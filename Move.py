@@ -11,6 +11,8 @@ from Constants import *
 ##
 class Move(object):
 
+    __slots__ = ('moveType', 'coordList', 'buildType')
+
     ##
     #__init__
     #Description: Creates a new Move
@@ -38,3 +40,45 @@ class Move(object):
             coordStr = ""
         
         return "<Move: " + moveName + " " + buildName + " " +  coordStr + ">"
+
+
+##
+#FrozenMove
+#Description: A Move that can't be changed once it is made, for moves that
+#   are shared (e.g. by AIPlayerUtils.cachedLegalMoves).  Its coordList is a
+#   tuple, and setting any of its variables raises AttributeError.
+##
+class FrozenMove(Move):
+
+    __slots__ = ()
+
+    #(the variables are set through Move's slots, which is quicker than
+    #object.__setattr__ and these are made in bulk)
+    def __init__(self, inputMoveType, inputCoordList, inputBuildType):
+        if inputCoordList != None:
+            inputCoordList = tuple(inputCoordList)
+        _setMoveType(self, inputMoveType)
+        _setCoordList(self, inputCoordList)
+        _setBuildType(self, inputBuildType)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("a FrozenMove can't be changed")
+
+    def __delattr__(self, name):
+        raise AttributeError("a FrozenMove can't be changed")
+
+    #(pickled as the arguments to make it again, since unpickling would
+    #otherwise set its variables)
+    def __reduce__(self):
+        return (FrozenMove, (self.moveType, self.coordList, self.buildType))
+
+    #(printed as the same Move with a list of coords would be)
+    def __str__(self):
+        coordList = self.coordList
+        if coordList != None:
+            coordList = list(coordList)
+        return str(Move(self.moveType, coordList, self.buildType))
+
+_setMoveType = Move.__dict__['moveType'].__set__
+_setCoordList = Move.__dict__['coordList'].__set__
+_setBuildType = Move.__dict__['buildType'].__set__
@@ -6,9 +6,13 @@
 #
 #Variables:
 #   playerId - The id of the player.
+#   publisher - Set by the game while it is listening for moves published by
+#       the player (see publishMove), otherwise None.
 ##
 class Player(object):
 
+    publisher = None
+
     ##
     #__init__
     #Description: Creates a new Player
@@ -46,6 +50,37 @@ class Player(object):
     def getMove(self, currentState):
         #method template, not implemented
         pass
+
+    ##
+    #getMoveTimed
+    #Description: Gets the next move from the Player when the move has to be
+    #   made by a deadline (the game asks this of AIs whose moves are timed).
+    #   A player that can make use of the time (e.g. by searching deeper)
+    #   can override this, publishing the best move it has found so far as it
+    #   goes (see publishMove) in case the deadline passes before it returns.
+    #   By default the move is whatever getMove gives.
+    #
+    #Parameters:
+    #   currentState - The state of the current game waiting for the player's move (GameState)
+    #   deadline - The time (as given by time.time()) by which the move must be made (float)
+    #
+    #Return: The Move to be made
+    ##
+    def getMoveTimed(self, currentState, deadline):
+        return self.getMove(currentState)
+
+    ##
+    #publishMove
+    #Description: Tells the game the move to make if the player's time runs
+    #   out before getMoveTimed returns (replacing any published before).
+    #   Does nothing unless the game is listening.
+    #
+    #Parameters:
+    #   move - The Move (as getMove would return it)
+    ##
+    def publishMove(self, move):
+        if self.publisher != None:
+            self.publisher(move)
     
     ##
     #getAttack
@@ -0,0 +1,252 @@
+import struct
+from Constants import *
+from Ant import Ant
+from Construction import Construction
+from Building import Building
+from Inventory import Inventory
+from GameState import GameState
+
+##
+# StateCodec.py
+#
+# A compact, versioned binary encoding of GameStates for sending states
+# between processes, replay files and training data.  A typical mid-game
+# state takes well under a hundred bytes (compared to several kilobytes of
+# pickle).
+#
+# Layout of an encoded state (all values are unsigned bytes):
+#
+#   version, phase, whoseTurn, food one, food two,
+#   ant count one, ant count two, building count one, building count two,
+#   grass/food count,
+#   then for each ant (player one's, then player two's, in inventory order):
+#       cell, type | carrying << 4 | hasMoved << 5, health
+#   then for each Building (player one's inventory, then player two's):
+#       cell, (type - ANTHILL) | player << 4, captureHealth
+#   then for each grass/food:
+#       cell | FOOD_FLAG
+#
+# where cell = x * BOARD_LENGTH + y.  Only the inventories are encoded; the
+# decoded state builds its board when it is used (like fastclone).
+#
+# A stream (see StateWriter/StateReader) is the STREAM_MAGIC string followed
+# by records, each an encoded state preceded by its length as a 2-byte
+# little-endian int.
+#
+
+#version written by encode (decode rejects any other)
+CODEC_VERSION = 1
+
+#number of bytes before the ants
+HEADER_SIZE = 10
+
+#flags packed into the bytes
+CARRYING_FLAG = 1 << 4
+MOVED_FLAG = 1 << 5
+FOOD_FLAG = 1 << 7
+
+#first bytes of a stream of states
+STREAM_MAGIC = "ANTS"
+
+#format of a record's length prefix
+LENGTH = struct.Struct("<H")
+
+#decoded grass and food, keyed by their encoded byte.  These never change
+#(see Construction) so every decoded state can share them.
+neutralConstrs = {}
+
+##
+# encode
+#
+# Description: encodes a GameState
+#
+# Parameters:
+#   state - the GameState (only its inventories are read)
+#
+# Return: the encoding (str)
+#
+def encode(state):
+    inventories = state.inventories
+    ants1 = inventories[PLAYER_ONE].ants
+    ants2 = inventories[PLAYER_TWO].ants
+    cons1 = inventories[PLAYER_ONE].constrs
+    cons2 = inventories[PLAYER_TWO].constrs
+    cons3 = inventories[NEUTRAL].constrs
+    data = [CODEC_VERSION, state.phase, state.whoseTurn,
+            inventories[PLAYER_ONE].foodCount, inventories[PLAYER_TWO].foodCount,
+            len(ants1), len(ants2), len(cons1), len(cons2), len(cons3)]
+    for ants in (ants1, ants2):
+        for ant in ants:
+            coords = ant.coords
+            flags = ant.type
+            if ant.carrying:
+                flags |= CARRYING_FLAG
+            if ant.hasMoved:
+                flags |= MOVED_FLAG
+            data.append(coords[0] * BOARD_LENGTH + coords[1])
+            data.append(flags)
+            data.append(ant.health)
+    for constrs in (cons1, cons2):
+        for constr in constrs:
+            coords = constr.coords
+            data.append(coords[0] * BOARD_LENGTH + coords[1])
+            data.append((constr.type - ANTHILL) | constr.player << 4)
+            data.append(constr.captureHealth)
+    for constr in cons3:
+        coords = constr.coords
+        cell = coords[0] * BOARD_LENGTH + coords[1]
+        if constr.type == FOOD:
+            cell |= FOOD_FLAG
+        data.append(cell)
+    return str(bytearray(data))
+
+##
+# decode
+#
+# Description: rebuilds a GameState from its encoding
+#
+# Parameters:
+#   encoded - a str made by encode
+#
+# Return: a new GameState (without a board until one is used)
+#
+def decode(encoded):
+    data = bytearray(encoded)
+    if len(data) < HEADER_SIZE or data[0] != CODEC_VERSION:
+        raise ValueError("not an encoded GameState (version %d)" % CODEC_VERSION)
+    (version, phase, whoseTurn, food1, food2,
+     numAnts1, numAnts2, numCons1, numCons2, numCons3) = data[0:HEADER_SIZE]
+    if len(data) != HEADER_SIZE + 3 * (numAnts1 + numAnts2 + numCons1 + numCons2) + numCons3:
+        raise ValueError("encoded GameState has the wrong length")
+    pos = HEADER_SIZE
+
+    antLists = []
+    for (player, count) in ((PLAYER_ONE, numAnts1), (PLAYER_TWO, numAnts2)):
+        ants = [None] * count
+        for i in xrange(0, count):
+            cell = data[pos]
+            flags = data[pos + 1]
+            ant = Ant((cell // BOARD_LENGTH, cell % BOARD_LENGTH), flags & 0xf, player)
+            ant.carrying = (flags & CARRYING_FLAG) != 0
+            ant.hasMoved = (flags & MOVED_FLAG) != 0
+            ant.health = data[pos + 2]
+            ants[i] = ant
+            pos += 3
+        antLists.append(ants)
+
+    constrLists = []
+    for count in (numCons1, numCons2):
+        constrs = [None] * count
+        for i in xrange(0, count):
+            cell = data[pos]
+            packed = data[pos + 1]
+            building = Building((cell // BOARD_LENGTH, cell % BOARD_LENGTH),
+                                (packed & 0xf) + ANTHILL, packed >> 4)
+            building.captureHealth = data[pos + 2]
+            constrs[i] = building
+            pos += 3
+        constrLists.append(constrs)
+
+    neutral = [None] * numCons3
+    for i in xrange(0, numCons3):
+        constr = neutralConstrs.get(data[pos])
+        if constr == None:
+            cell = data[pos] & ~FOOD_FLAG
+            constr = Construction((cell // BOARD_LENGTH, cell % BOARD_LENGTH),
+                                  FOOD if data[pos] & FOOD_FLAG else GRASS)
+            neutralConstrs[data[pos]] = constr
+        neutral[i] = constr
+        pos += 1
+
+    inventories = [Inventory(PLAYER_ONE, antLists[0], constrLists[0], food1),
+                   Inventory(PLAYER_TWO, antLists[1], constrLists[1], food2),
+                   Inventory(NEUTRAL, [], neutral, 0)]
+    return GameState(None, inventories, phase, whoseTurn)
+
+
+##
+#StateWriter
+#Description: Writes a stream of encoded GameStates to a file
+#
+#Variables:
+#   stream - the file (opened for binary writing) being written to
+##
+class StateWriter(object):
+
+    ##
+    #__init__
+    #Description: Creates a new StateWriter and writes the stream header
+    #
+    #Parameters:
+    #   outputStream - a file-like object opened for binary writing
+    ##
+    def __init__(self, outputStream):
+        self.stream = outputStream
+        self.stream.write(STREAM_MAGIC)
+
+    ##
+    #write
+    #Description: Appends one GameState to the stream
+    ##
+    def write(self, state):
+        encoded = encode(state)
+        self.stream.write(LENGTH.pack(len(encoded)) + encoded)
+
+    ##
+    #writeAll
+    #Description: Appends every GameState in an iterable to the stream
+    ##
+    def writeAll(self, states):
+        records = []
+        for state in states:
+            encoded = encode(state)
+            records.append(LENGTH.pack(len(encoded)))
+            records.append(encoded)
+        self.stream.write("".join(records))
+
+
+##
+#StateReader
+#Description: Reads a stream of GameStates written by a StateWriter.
+#   Iterating over a StateReader yields the states in order.
+#
+#Variables:
+#   stream - the file (opened for binary reading) being read from
+##
+class StateReader(object):
+
+    ##
+    #__init__
+    #Description: Creates a new StateReader and checks the stream header
+    #
+    #Parameters:
+    #   inputStream - a file-like object opened for binary reading
+    ##
+    def __init__(self, inputStream):
+        self.stream = inputStream
+        if self.stream.read(len(STREAM_MAGIC)) != STREAM_MAGIC:
+            raise ValueError("not a stream of encoded GameStates")
+
+    ##
+    #read
+    #Description: Reads the next GameState
+    #
+    #Return: the GameState or None at the end of the stream
+    ##
+    def read(self):
+        prefix = self.stream.read(LENGTH.size)
+        if not prefix:
+            return None
+        if len(prefix) != LENGTH.size:
+            raise ValueError("truncated stream of encoded GameStates")
+        (length,) = LENGTH.unpack(prefix)
+        encoded = self.stream.read(length)
+        if len(encoded) != length:
+            raise ValueError("truncated stream of encoded GameStates")
+        return decode(encoded)
+
+    def __iter__(self):
+        state = self.read()
+        while state != None:
+            yield state
+            state = self.read()
@@ -0,0 +1,562 @@
+from Constants import *
+from Ant import Ant
+import Zobrist
+
+##
+# StateView.py
+#
+# A read-only view of a GameState from one player's point of view.  The Game
+# used to give each player a clone of its state every time it asked for a
+# move (flipping the clone for player two so both players see themselves at
+# the top of the board).  A StateView gives the player the same picture
+# without copying anything: the ants, constructions, inventories and board
+# Locations it hands out are thin proxies that read the real objects and
+# mirror their coordinates for player two.
+#
+# If the player changes anything (sets an attribute, changes an inventory's
+# list of ants or constructions, calls applyMove, etc.) the view makes a
+# private clone of the state first and from then on everything, including
+# proxies and lists that were handed out earlier, refers to the clone.  clone
+# and fastclone also return real GameStates (copies of that private clone).
+#
+# The view is not a real GameState, and what it hands out are not the real
+# objects: the ant and construction proxies pass for Ants and Constructions
+# with isinstance, but not with type() (and the view, its inventories and
+# Locations don't pass either way).  A proxy is never the real object (so
+# "is" tests against objects the player kept from elsewhere fail), and once
+# the copy is made the inventories hand out the copy's objects rather than
+# the proxies handed out before.
+#
+# A view is only meant to be used while the player decides what to do with
+# it (the Game makes a new one each time it asks).  The state it shows is not
+# copied, so a player that wants to keep it must clone it.
+#
+
+##
+#StateView
+#Description: A read-only view of a GameState as seen by a given player
+#
+#Variables:
+#   state - the GameState being viewed
+#   playerId - the player whose point of view is shown
+#   flip - True if coordinates are mirrored (for PLAYER_TWO)
+#   copy - the private (already flipped) clone of the state once one has
+#       been made, otherwise None
+#   proxies - a dict of the proxies handed out so far, keyed by the objects
+#       they stand for (so the same object always gets the same proxy)
+#   copyMap - once the copy is made, a dict from the real objects of the
+#       proxies handed out to their counterparts in the copy
+#   inventoryViews, boardView - the proxies for the inventories and board
+#       (made when first used)
+#   antAt, constrAt - dicts from (view) coordinates to the proxies there,
+#       for getAntAt/getConstrAt (made when first used)
+#   terrain - (the viewed state's terrain key, the view's) once the view's
+#       has been worked out from it (see getTerrainKey), otherwise None
+##
+class StateView(object):
+
+    __slots__ = ('state', 'playerId', 'flip', 'copy', 'proxies', 'copyMap',
+                 'inventoryViews', 'boardView', 'antAt', 'constrAt', 'terrain')
+
+    ##
+    #__init__
+    #Description: Creates a new StateView
+    #
+    #Parameters:
+    #   inputState - the GameState to view (GameState)
+    #   inputPlayerId - the player whose point of view to show (int)
+    ##
+    def __init__(self, inputState, inputPlayerId):
+        self.state = inputState
+        self.playerId = inputPlayerId
+        self.flip = inputPlayerId == PLAYER_TWO
+        self.copy = None
+        self.proxies = {}
+        self.copyMap = None
+        self.inventoryViews = None
+        self.boardView = None
+        self.antAt = None
+        self.constrAt = None
+        self.terrain = None
+
+    ##
+    #mirror
+    #Description: Converts coordinates between the real state and the view
+    #   (the conversion is its own inverse)
+    ##
+    def mirror(self, coords):
+        if not self.flip or coords == None:
+            return coords
+        return (BOARD_LENGTH - 1 - coords[0], BOARD_LENGTH - 1 - coords[1])
+
+    ##
+    #getCopy
+    #Description: Returns the private clone of the state, making it (and
+    #   switching every proxy over to it) the first time it is needed
+    ##
+    def getCopy(self):
+        if self.copy == None:
+            #(fastclone keeps the inventory order the view shows)
+            copy = self.state.fastclone()
+            if self.flip:
+                copy.flipBoard()
+            copyMap = {}
+            for item in self.proxies.keys():
+                if type(item) is Ant:
+                    copyMap[item] = copy.getAntAt(self.mirror(item.coords))
+                else:
+                    copyMap[item] = copy.getConstrAt(self.mirror(item.coords))
+            self.copyMap = copyMap
+            self.copy = copy
+        return self.copy
+
+    ##
+    #wrap
+    #Description: Returns the proxy for an Ant or Construction of the real
+    #   state (or None)
+    ##
+    def wrap(self, item):
+        if item == None:
+            return None
+        proxy = self.proxies.get(item)
+        if proxy == None:
+            if type(item) is Ant:
+                proxy = AntView(self, item)
+            else:
+                proxy = ConstrView(self, item)
+            self.proxies[item] = proxy
+        return proxy
+
+    def getWhoseTurn(self):
+        if self.copy != None:
+            return self.copy.whoseTurn
+        return self.state.whoseTurn
+
+    def setWhoseTurn(self, value):
+        self.getCopy().whoseTurn = value
+
+    whoseTurn = property(getWhoseTurn, setWhoseTurn)
+
+    def getPhase(self):
+        if self.copy != None:
+            return self.copy.phase
+        return self.state.phase
+
+    def setPhase(self, value):
+        self.getCopy().phase = value
+
+    phase = property(getPhase, setPhase)
+
+    def getInventories(self):
+        if self.copy != None:
+            return self.copy.inventories
+        if self.inventoryViews == None:
+            self.inventoryViews = [InventoryView(self, PLAYER_ONE),
+                                   InventoryView(self, PLAYER_TWO),
+                                   InventoryView(self, NEUTRAL)]
+        return self.inventoryViews
+
+    def setInventories(self, value):
+        self.getCopy().inventories = value
+
+    inventories = property(getInventories, setInventories)
+
+    def getBoard(self):
+        if self.copy != None:
+            return self.copy.board
+        if self.boardView == None:
+            self.boardView = [[LocationView(self, (col, row)) for row in xrange(0, BOARD_LENGTH)]
+                              for col in xrange(0, BOARD_LENGTH)]
+        return self.boardView
+
+    def setBoard(self, value):
+        self.getCopy().board = value
+
+    board = property(getBoard, setBoard)
+
+    ##
+    #getAntAt / getConstrAt
+    #Description: Return the (proxy for the) ant or construction at the given
+    #   coordinates of the view
+    ##
+    def getAntAt(self, coords):
+        if self.copy != None:
+            return self.copy.getAntAt(coords)
+        if self.antAt == None:
+            self.antAt = dict([(self.mirror(ant.coords), self.wrap(ant))
+                               for inv in self.state.inventories for ant in inv.ants])
+        return self.antAt.get(coords)
+
+    def getConstrAt(self, coords):
+        if self.copy != None:
+            return self.copy.getConstrAt(coords)
+        if self.constrAt == None:
+            self.constrAt = dict([(self.mirror(constr.coords), self.wrap(constr))
+                                  for inv in self.state.inventories for constr in inv.constrs])
+        return self.constrAt.get(coords)
+
+    def coordLookup(self, coords, playerId):
+        return self.state.coordLookup(coords, playerId)
+
+    ##
+    #getHash
+    #Description: Returns the Zobrist hash of the state as the player sees it.
+    #   (The viewed state is changed by hand, so this is always worked out
+    #   afresh rather than trusting a stored hash.)
+    ##
+    def getHash(self):
+        if self.copy != None:
+            self.copy.rehash()
+            return self.copy.getHash()
+        return Zobrist.hashState(self.state, self.flip)
+
+    ##
+    #getTerrainKey
+    #Description: Returns the terrain key (see GameState.getTerrainKey) of the
+    #   state as the player sees it: the viewed state's own key, mirrored if
+    #   need be (and kept for as long as the state's key is the same)
+    ##
+    def getTerrainKey(self):
+        if self.copy != None:
+            return self.copy.getTerrainKey()
+        key = self.state.getTerrainKey()
+        if not self.flip:
+            return key
+        if self.terrain == None or self.terrain[0] is not key:
+            self.terrain = (key, tuple([(self.mirror(coords), cost) for (coords, cost) in key]))
+        return self.terrain[1]
+
+    ##
+    #clone / fastclone
+    #Description: Return a real GameState as seen by the player
+    ##
+    def clone(self):
+        return self.getCopy().clone()
+
+    def fastclone(self):
+        return self.getCopy().fastclone()
+
+    ##
+    #unwrap
+    #Description: Returns what a proxy (or a list of them) given back by the
+    #   player stands for in the private clone.  Anything else is returned as
+    #   it is.
+    ##
+    def unwrap(self, item):
+        if type(item) is AntView or type(item) is ConstrView:
+            return item.target()
+        if isinstance(item, (list, tuple)):
+            return [self.unwrap(element) for element in item]
+        return item
+
+    ##
+    #__getattr__
+    #Description: Anything else a GameState has (applyMove, getHash, ...) is
+    #   taken from the private clone
+    ##
+    def __getattr__(self, name):
+        return getattr(self.getCopy(), name)
+
+    ##
+    #__reduce_ex__
+    #Description: A view is pickled (e.g. to send it to another process) as
+    #   the GameState it shows
+    ##
+    def __reduce_ex__(self, protocol):
+        return (unpickledState, (self.getCopy(),))
+
+
+##
+# unpickledState
+#
+# a pickled StateView is rebuilt as (a copy of) the GameState it showed
+#
+def unpickledState(state):
+    return state
+
+
+##
+#AntView
+#Description: The proxy for an Ant seen through a StateView
+##
+class AntView(object):
+
+    __slots__ = ('view', 'ant')
+
+    def __init__(self, inputView, inputAnt):
+        self.view = inputView
+        self.ant = inputAnt
+
+    ##
+    #target
+    #Description: Returns the Ant this proxy currently reads from: the real
+    #   one, or its counterpart in the view's copy once there is one
+    ##
+    def target(self):
+        if self.view.copy == None:
+            return self.ant
+        return self.view.copyMap[self.ant]
+
+    def getCoords(self):
+        if self.view.copy == None:
+            return self.view.mirror(self.ant.coords)
+        return self.target().coords
+
+    def setCoords(self, value):
+        self.view.getCopy()
+        self.target().coords = value
+
+    coords = property(getCoords, setCoords)
+
+    ##
+    #clone
+    #Description: Returns a real Ant (with the view's coordinates)
+    ##
+    def clone(self):
+        newAnt = self.target().clone()
+        newAnt.coords = self.coords
+        return newAnt
+
+    #(so that isinstance(proxy, Ant) is True)
+    __class__ = property(lambda self: Ant)
+
+
+##
+#ConstrView
+#Description: The proxy for a Construction or Building seen through a
+#   StateView.  (Only Buildings have a player and captureHealth.)
+##
+class ConstrView(object):
+
+    __slots__ = ('view', 'constr')
+
+    def __init__(self, inputView, inputConstr):
+        self.view = inputView
+        self.constr = inputConstr
+
+    def target(self):
+        if self.view.copy == None:
+            return self.constr
+        return self.view.copyMap[self.constr]
+
+    def getCoords(self):
+        if self.view.copy == None:
+            return self.view.mirror(self.constr.coords)
+        return self.target().coords
+
+    def setCoords(self, value):
+        self.view.getCopy()
+        self.target().coords = value
+
+    coords = property(getCoords, setCoords)
+
+    def clone(self):
+        newConstr = self.target().clone()
+        newConstr.coords = self.coords
+        return newConstr
+
+    __class__ = property(lambda self: type(self.constr))
+
+
+##
+# viewAttribute
+#
+# Description: makes a property for a proxy class that reads an attribute of
+# the proxy's target and, if set, writes it to the view's private copy
+#
+def viewAttribute(name):
+    def getter(self):
+        return getattr(self.target(), name)
+
+    def setter(self, value):
+        self.view.getCopy()
+        setattr(self.target(), name, value)
+
+    return property(getter, setter)
+
+for name in ['type', 'hasMoved', 'carrying', 'player', 'health']:
+    setattr(AntView, name, viewAttribute(name))
+for name in ['type', 'movementCost', 'player', 'captureHealth']:
+    setattr(ConstrView, name, viewAttribute(name))
+
+
+##
+#InventoryView
+#Description: The proxy for an Inventory seen through a StateView
+##
+class InventoryView(object):
+
+    __slots__ = ('view', 'player', 'antViews', 'constrViews')
+
+    def __init__(self, inputView, inputPlayer):
+        self.view = inputView
+        self.player = inputPlayer
+        self.antViews = None
+        self.constrViews = None
+
+    def target(self):
+        if self.view.copy == None:
+            return self.view.state.inventories[self.player]
+        return self.view.copy.inventories[self.player]
+
+    def getAnts(self):
+        if self.view.copy != None:
+            return self.target().ants
+        if self.antViews == None:
+            self.antViews = ListView(self.view, self.player, 'ants',
+                                     [self.view.wrap(ant) for ant in self.target().ants])
+        return self.antViews
+
+    def setAnts(self, value):
+        self.view.getCopy()
+        self.target().ants = value
+
+    ants = property(getAnts, setAnts)
+
+    def getConstrs(self):
+        if self.view.copy != None:
+            return self.target().constrs
+        if self.constrViews == None:
+            self.constrViews = ListView(self.view, self.player, 'constrs',
+                                        [self.view.wrap(constr) for constr in self.target().constrs])
+        return self.constrViews
+
+    def setConstrs(self, value):
+        self.view.getCopy()
+        self.target().constrs = value
+
+    constrs = property(getConstrs, setConstrs)
+
+    def getFoodCount(self):
+        return self.target().foodCount
+
+    def setFoodCount(self, value):
+        self.view.getCopy()
+        self.target().foodCount = value
+
+    foodCount = property(getFoodCount, setFoodCount)
+
+    def getQueen(self):
+        for ant in self.ants:
+            if ant.type == QUEEN: return ant
+        return None
+
+    def getAnthill(self):
+        for constr in self.constrs:
+            if constr.type == ANTHILL: return constr
+        return None
+
+    def getTunnels(self):
+        return [constr for constr in self.constrs if constr.type == TUNNEL]
+
+    def clone(self):
+        return self.view.getCopy().inventories[self.player].clone()
+
+
+##
+#ListView
+#Description: An inventory's list of ants or constructions seen through a
+#   StateView: a list of proxies that, if it is changed, makes the view's
+#   private copy, makes the change to the copy's list and then shows that
+#   list (keeping the proxies it already held)
+#
+#Variables:
+#   view - the StateView
+#   player - the inventory's player
+#   name - 'ants' or 'constrs'
+##
+class ListView(list):
+
+    __slots__ = ('view', 'player', 'name')
+
+    def __init__(self, inputView, inputPlayer, inputName, items):
+        list.__init__(self, items)
+        self.view = inputView
+        self.player = inputPlayer
+        self.name = inputName
+
+    ##
+    #target
+    #Description: Returns the list in the view's private copy (making it)
+    ##
+    def target(self):
+        return getattr(self.view.getCopy().inventories[self.player], self.name)
+
+    ##
+    #sync
+    #Description: Makes this list show the copy's list again after a change
+    ##
+    def sync(self):
+        proxies = dict([(self.view.copyMap[item], proxy)
+                        for (item, proxy) in self.view.proxies.items()])
+        list.__setitem__(self, slice(None, None), [proxies.get(item, item) for item in self.target()])
+
+
+##
+# listMutator
+#
+# Description: makes a method for ListView that makes a change (append, pop,
+# etc.) to the copy's list instead of the view's
+#
+def listMutator(name):
+    def mutator(self, *args, **kwargs):
+        target = self.target()
+        result = getattr(target, name)(*[self.view.unwrap(arg) for arg in args], **kwargs)
+        self.sync()
+        if result is target:
+            #(+= and *= return the list changed)
+            return self
+        return result
+    return mutator
+
+for name in ['append', 'extend', 'insert', 'pop', 'remove', 'reverse', 'sort',
+             '__setitem__', '__delitem__', '__setslice__', '__delslice__',
+             '__iadd__', '__imul__']:
+    setattr(ListView, name, listMutator(name))
+
+
+##
+#LocationView
+#Description: The proxy for a board Location seen through a StateView
+##
+class LocationView(object):
+
+    __slots__ = ('view', 'coords')
+
+    def __init__(self, inputView, inputCoords):
+        self.view = inputView
+        self.coords = inputCoords
+
+    def target(self):
+        if self.view.copy == None:
+            realCoords = self.view.mirror(self.coords)
+            return self.view.state.board[realCoords[0]][realCoords[1]]
+        return self.view.copy.board[self.coords[0]][self.coords[1]]
+
+    def getAnt(self):
+        if self.view.copy == None:
+            return self.view.wrap(self.target().ant)
+        return self.target().ant
+
+    def setAnt(self, value):
+        self.view.getCopy()
+        self.target().ant = value
+
+    ant = property(getAnt, setAnt)
+
+    def getConstr(self):
+        if self.view.copy == None:
+            return self.view.wrap(self.target().constr)
+        return self.target().constr
+
+    def setConstr(self, value):
+        self.view.getCopy()
+        self.target().constr = value
+
+    constr = property(getConstr, setConstr)
+
+    def getMoveCost(self):
+        return self.target().getMoveCost()
+
+    def clone(self):
+        return self.view.getCopy().board[self.coords[0]][self.coords[1]].clone()
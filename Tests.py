@@ -0,0 +1,1041 @@
+import sys, time, random, unittest
+from Constants import *
+from Ant import Ant, UNIT_STATS
+from Construction import Construction
+import CompactState, Zobrist, StateCodec
+from StateView import StateView
+from Move import Move
+from HeadlessGame import HeadlessGame
+from Player import Player
+from AIPlayerUtils import listAllLegalMoves
+import AIPlayerUtils
+from Benchmark import sampleState, smallTurnState, exhaustiveTurnEnds, referenceLegalCoord, \
+     referenceListAdjacent, referenceQueenPath, referenceStepsToReach, referencePathToward
+
+##
+# Tests.py
+#
+# Checks that the game state and AI utility code is right: against the
+# game's own rules (HeadlessGame), against the slower, obviously right
+# versions of it that Benchmark.py times it against, and for what the
+# bundled AIs and timed games rely on.  None of these need pygame either:
+#
+#            python -m unittest Tests
+#            python -m unittest Tests.StateTests.testMakeUnmake
+#
+# The check functions below make the checks (plain asserts, on one sample
+# position or game) and the TestCases at the end run them for a range of
+# seeds.
+#
+
+##
+# checkBoard
+#
+# asserts that every Location of a state's board holds exactly the ant and
+# construction the inventories say is there
+#
+def checkBoard(state):
+    board = state.board
+    for x in xrange(0, BOARD_LENGTH):
+        for y in xrange(0, BOARD_LENGTH):
+            assert board[x][y].ant is state.getAntAt((x, y))
+            assert board[x][y].constr is state.getConstrAt((x, y))
+
+##
+#ScriptedPlayer
+#Description: A Player that plays its side of a MoveScript's game: it leaves
+#   its moves and attacks to the script (which looks at the game's own state
+#   rather than at the view it is given)
+##
+class ScriptedPlayer(Player):
+
+    def __init__(self, inputPlayerId, script):
+        Player.__init__(self, inputPlayerId, "Scripted")
+        self.script = script
+
+    def getMove(self, currentState):
+        return self.script.nextMove()
+
+    def getAttack(self, currentState, attackingAnt, enemyLocations):
+        return self.script.nextAttack()
+
+##
+#MoveScript
+#Description: Plays random legal moves (and random attacks, see randomAttack)
+#   from the sample position through a HeadlessGame, so the game's own rules
+#   make them, recording each move with the state of the game before it.
+#   The last move ends the turn, and the game stops there (or when someone
+#   has won).
+#
+#Variables:
+#   moves - the (Move, attackCoord) pairs played, in the game's coords
+#   states - the CompactState data of the game before each move, then after
+#       the last
+##
+class MoveScript(object):
+
+    def __init__(self, seed, steps):
+        self.rand = random.Random(seed)
+        self.steps = steps
+        self.moves = []
+        self.states = []
+        self.attackCoord = None
+        self.game = HeadlessGame()
+        self.game.state = CompactState.fromGameState(sampleState(seed)).toGameState(withBoard=True)
+        self.game.currentPlayers = [ScriptedPlayer(PLAYER_ONE, self),
+                                    ScriptedPlayer(PLAYER_TWO, self)]
+        self.game.runGame()
+        self.states.append(CompactState.fromGameState(self.game.state).data)
+        #(an AI that is told its move is invalid loses without anyone winning)
+        assert len(self.moves) == steps or self.game.hasWon(PLAYER_ONE) or \
+               self.game.hasWon(PLAYER_TWO)
+
+    ##
+    #nextMove
+    #Description: records the state and picks the next move, returning it
+    #   in the coords of the player whose turn it is
+    ##
+    def nextMove(self):
+        state = self.game.state
+        self.states.append(CompactState.fromGameState(state).data)
+        if len(self.moves) == self.steps - 1:
+            move = Move(END, None, None)
+            self.game.maxTurns = self.game.turnCount + 1
+        else:
+            moves = listAllLegalMoves(state)
+            move = moves[self.rand.randint(0, len(moves) - 1)]
+        self.attackCoord = randomAttack(state, move, self.rand)
+        self.moves.append((move, self.attackCoord))
+        if move.coordList == None:
+            return move
+        return Move(move.moveType, [state.coordLookup(coord, state.whoseTurn) for coord in move.coordList],
+                    move.buildType)
+
+    ##
+    #nextAttack
+    #Description: returns the attack picked with the last move (in the coords
+    #   of the player whose turn it is)
+    ##
+    def nextAttack(self):
+        return self.game.state.coordLookup(self.attackCoord, self.game.state.whoseTurn)
+
+##
+# randomAttack
+#
+# Description: picks the enemy a move attacks at random (as the Game lets the
+# player choose) from those in range after it
+#
+# Parameters:
+#   state - the GameState the move is made in
+#   move - a legal Move for the player whose turn it is
+#   rand - the random.Random to choose with
+#
+# Return: the coords of the enemy attacked (None unless the move is a
+# MOVE_ANT ending in range of an enemy)
+#
+def randomAttack(state, move, rand):
+    if move.moveType != MOVE_ANT:
+        return None
+    mover = state.getAntAt(move.coordList[0])
+    end = move.coordList[-1]
+    inRange = [enemy.coords for enemy in state.inventories[1 - state.whoseTurn].ants
+               if UNIT_STATS[mover.type][RANGE] ** 2 >=
+                  (end[0] - enemy.coords[0]) ** 2 + (end[1] - enemy.coords[1]) ** 2]
+    if not inRange:
+        return None
+    return inRange[rand.randint(0, len(inRange) - 1)]
+
+##
+# checkMakeUnmake
+#
+# Description: plays random moves (and random attacks) from the sample
+# position through a HeadlessGame (see MoveScript), checking at every step
+# that applyMove gives the same state as the game's own rules and that
+# undoMove restores the original exactly.  A fastclone the move is applied
+# to must give that state as well.  The incrementally updated hash is
+# checked against a full recompute as well.  The move is also made on a
+# cowclone, which must match as well and must not disturb the state it was
+# cloned from (or be disturbed by it).  A copy with a board of its own plays
+# along to check the board is kept up to date, and the (lazily built) boards
+# of the others are checked too.
+#
+# Parameters:
+#   seed - the random seed to use
+#   steps - how many moves to play
+#
+def checkMakeUnmake(seed, steps):
+    script = MoveScript(seed, steps)
+    state = sampleState(seed)
+    state.getHash()
+    boardState = CompactState.fromGameState(state).toGameState(withBoard=True)
+    for i in xrange(0, len(script.moves)):
+        (move, attackCoord) = script.moves[i]
+        if i % 10 == 0:
+            checkBoard(state)
+        before = CompactState.fromGameState(state).data
+        assert before == script.states[i]
+        beforeHash = state.getHash()
+        after = script.states[i + 1]
+        child = state.fastclone()
+        child.applyMove(move, attackCoord)
+        cowChild = state.cowclone()
+        cowToken = cowChild.applyMove(move, attackCoord)
+        assert CompactState.fromGameState(state).data == before
+        assert CompactState.fromGameState(child).data == after
+        token = state.applyMove(move, attackCoord)
+        assert CompactState.fromGameState(state).data == after
+        assert CompactState.fromGameState(cowChild).data == after
+        assert state.getHash() == child.getHash() == cowChild.getHash() == Zobrist.hashState(state)
+        state.undoMove(token)
+        assert CompactState.fromGameState(state).data == before
+        assert state.getHash() == beforeHash
+        assert CompactState.fromGameState(cowChild).data == after
+        cowChild.undoMove(cowToken)
+        assert CompactState.fromGameState(cowChild).data == before
+        state.applyMove(move, attackCoord)
+        boardState.applyMove(move, attackCoord)
+        assert CompactState.fromGameState(boardState).data == CompactState.fromGameState(state).data
+        checkBoard(boardState)
+        checkBoard(child)
+
+##
+# snapshotNeutral
+#
+# Return: everything about the grass and food of a state (including which
+# objects they are) so it can be checked later that none of it changed
+#
+def snapshotNeutral(state):
+    return [(id(constr), constr.coords, constr.type, constr.movementCost)
+            for constr in state.inventories[NEUTRAL].constrs]
+
+##
+# bundledAIs
+#
+# Return: the modules of every AI in the AI folder (in order of name)
+#
+def bundledAIs():
+    import os, glob
+    folder = os.path.join(os.path.dirname(os.path.abspath(__file__)), "AI")
+    if folder not in sys.path:
+        sys.path.insert(0, folder)
+    return [__import__(os.path.splitext(os.path.basename(path))[0])
+            for path in sorted(glob.glob(os.path.join(folder, "*.py")))]
+
+##
+# quietly
+#
+# Return: what func returns when called with args, with anything it prints
+# thrown away (some AIs print the board as they choose a move)
+#
+def quietly(func, *args):
+    from StringIO import StringIO
+    stdout = sys.stdout
+    sys.stdout = StringIO()
+    try:
+        return func(*args)
+    finally:
+        sys.stdout = stdout
+
+##
+# checkSharedConstrs
+#
+# Description: grass and food are shared between a state and its fastclones
+# (see GameState.fastclone) so nothing may modify them.  This asks every
+# bundled AI for a move (an AI that crashes fails the check, as changing a
+# shared Construction raises an exception) and plays random moves with
+# applyMove/undoMove, checking afterward that the shared Constructions are
+# untouched, and that changing them by hand is stopped.
+#
+def checkSharedConstrs():
+    state = sampleState()
+    before = snapshotNeutral(state)
+    for module in bundledAIs():
+        player = module.AIPlayer(PLAYER_ONE)
+        #the AIs learn where their anthill is during setup
+        player.hillCoords = state.inventories[PLAYER_ONE].getAnthill().coords
+        if hasattr(player, "maxDepth"):
+            player.maxDepth = 2
+        quietly(player.getMove, state.fastclone())
+        assert snapshotNeutral(state) == before, module.__name__
+    for seed in xrange(0, 10):
+        checkMakeUnmake(seed, 100)
+    assert snapshotNeutral(state) == before
+    for constr in state.fastclone().inventories[NEUTRAL].constrs:
+        for (name, value) in [("coords", (0, 0)), ("type", TUNNEL), ("movementCost", 1)]:
+            try:
+                setattr(constr, name, value)
+                assert False, "a shared Construction was changed"
+            except AttributeError:
+                pass
+    assert snapshotNeutral(state) == before
+
+##
+# moveKeys
+#
+# Return: the moves as comparable tuples
+#
+def moveKeys(moves):
+    return [(move.moveType, move.coordList, move.buildType) for move in moves]
+
+##
+# checkStateView
+#
+# Description: checks that a StateView shows the same thing as the clone +
+# flipBoard it replaces: the same legal moves and board for both players.
+# Changing something through the view must leave the real state alone.
+#
+def checkStateView(seed):
+    state = CompactState.fromGameState(sampleState(seed)).toGameState(withBoard=True)
+    before = CompactState.fromGameState(state).data
+    for player in [PLAYER_ONE, PLAYER_TWO]:
+        state.whoseTurn = player
+        flipped = state.fastclone()
+        if player == PLAYER_TWO:
+            flipped.flipBoard()
+        view = StateView(state, player)
+        assert moveKeys(listAllLegalMoves(view)) == moveKeys(listAllLegalMoves(flipped))
+        for x in xrange(0, BOARD_LENGTH):
+            for y in xrange(0, BOARD_LENGTH):
+                for (viewed, real) in [(view.board[x][y].ant, flipped.board[x][y].ant),
+                                       (view.board[x][y].constr, flipped.board[x][y].constr)]:
+                    assert (viewed == None) == (real == None)
+                    if real != None:
+                        assert (viewed.coords, viewed.type) == (real.coords, real.type)
+        #changing the view copies the state first
+        ant = view.inventories[player].ants[0]
+        ant.health = 99
+        view.applyMove(listAllLegalMoves(view)[0])
+        assert ant.health == 99 and view.inventories[player].ants[0].health == 99
+        assert CompactState.fromGameState(view.fastclone()).data != \
+               CompactState.fromGameState(flipped).data
+        #and so does changing an inventory's lists in place
+        view = StateView(state, player)
+        for (ants, constrs) in [(inv.ants, inv.constrs) for inv in view.inventories[:2]]:
+            first = ants[0]
+            assert isinstance(first, Ant) and isinstance(constrs[0], Construction)
+            ants.pop()
+            assert view.copy != None and first in ants
+            ants.remove(first)
+            del constrs[0]
+            assert first not in ants
+        for inv in [PLAYER_ONE, PLAYER_TWO]:
+            assert len(view.inventories[inv].ants) == len(state.inventories[inv].ants) - 2
+            assert len(view.fastclone().inventories[inv].ants) == len(state.inventories[inv].ants) - 2
+            assert len(view.inventories[inv].constrs) == len(state.inventories[inv].constrs) - 1
+        state.whoseTurn = PLAYER_ONE
+        assert CompactState.fromGameState(state).data == before
+
+##
+# checkViewMoves
+#
+# Description: asks every bundled AI for a move in a sample position (as
+# each player) through a StateView and through a flipped clone like the one
+# the Game used to give it instead, checking that it makes the same move
+# either way and leaves the real state alone.  (The clone is a fastclone,
+# which keeps the inventories in the order the view shows them; clone
+# orders them by where they are on the board, which changes the order moves
+# are listed in.)
+#
+def checkViewMoves(seed):
+    state = CompactState.fromGameState(sampleState(seed)).toGameState(withBoard=True)
+    before = CompactState.fromGameState(state).data
+    for module in bundledAIs():
+        for player in [PLAYER_ONE, PLAYER_TWO]:
+            state.whoseTurn = player
+            flipped = state.fastclone()
+            if player == PLAYER_TWO:
+                flipped.flipBoard()
+            moves = []
+            for shown in [StateView(state, player), flipped]:
+                ai = module.AIPlayer(player)
+                #the AIs learn where their anthill is during setup
+                ai.hillCoords = shown.inventories[player].getAnthill().coords
+                if hasattr(ai, "maxDepth"):
+                    ai.maxDepth = 2
+                random.seed(seed)
+                move = quietly(ai.getMove, shown)
+                moves.append((move.moveType, None if move.coordList == None else list(move.coordList),
+                              move.buildType))
+            assert moves[0] == moves[1], (module.__name__, player, moves)
+            state.whoseTurn = PLAYER_ONE
+            assert CompactState.fromGameState(state).data == before, module.__name__
+
+##
+# checkCodec
+#
+# Description: plays random moves from a sample position, checking that
+# every state survives StateCodec encoding (alone and in a stream) intact
+#
+def checkCodec(seed, steps):
+    from StringIO import StringIO
+    rand = random.Random(seed)
+    state = sampleState(seed)
+    states = []
+    for i in xrange(0, steps):
+        decoded = StateCodec.decode(StateCodec.encode(state))
+        assert CompactState.fromGameState(decoded).data == CompactState.fromGameState(state).data
+        states.append(state.fastclone())
+        moves = listAllLegalMoves(state)
+        state.applyMove(moves[rand.randint(0, len(moves) - 1)])
+        if state.inventories[PLAYER_ONE].getQueen() == None or \
+           state.inventories[PLAYER_TWO].getQueen() == None:
+            break
+    stream = StringIO()
+    StateCodec.StateWriter(stream).writeAll(states)
+    stream.seek(0)
+    for (decoded, original) in zip(StateCodec.StateReader(stream), states):
+        assert CompactState.fromGameState(decoded).data == CompactState.fromGameState(original).data
+
+##
+# checkAdjacency
+#
+# Description: checks the AIPlayerUtils tables against the reference
+# functions for every coordinate on (and just off) the board
+#
+def checkAdjacency():
+    for x in xrange(-1, BOARD_LENGTH + 1):
+        for y in xrange(-1, BOARD_LENGTH + 1):
+            for coord in [(x, y), [x, y]]:
+                assert AIPlayerUtils.legalCoord(coord) == referenceLegalCoord(coord)
+                assert AIPlayerUtils.listAdjacent(coord) == referenceListAdjacent(coord)
+            if referenceLegalCoord((x, y)):
+                assert AIPlayerUtils.isPathOkForQueen([(x, y)]) == referenceQueenPath([(x, y)])
+                cell = x * BOARD_LENGTH + y
+                assert [AIPlayerUtils.CELL_COORDS[adj] for adj in AIPlayerUtils.ADJACENT_CELLS[cell]] == \
+                       referenceListAdjacent((x, y))
+
+##
+# checkUniqueMoves
+#
+# Description: plays random moves from a sample position, checking at each
+# step that the uniqueDest movement moves are all legal (i.e. among the full
+# list), reach every destination the full list does exactly once and do so
+# as cheaply as any path there
+#
+def checkUniqueMoves(seed, steps):
+    rand = random.Random(seed)
+    state = sampleState(seed)
+    for i in xrange(0, steps):
+        def pathCost(path):
+            return sum([AIPlayerUtils.getConstrAt(state, coord).movementCost
+                        if AIPlayerUtils.getConstrAt(state, coord) != None else 1
+                        for coord in path[1:]])
+        allMoves = AIPlayerUtils.listAllMovementMoves(state)
+        uniqueMoves = AIPlayerUtils.listAllMovementMoves(state, True)
+        allPaths = [tuple(move.coordList) for move in allMoves]
+        cheapest = {}
+        for path in allPaths:
+            key = (path[0], path[-1])
+            cheapest[key] = min(cheapest.get(key, 99), pathCost(path))
+        uniquePaths = [tuple(move.coordList) for move in uniqueMoves]
+        assert len(set(uniquePaths)) == len(uniquePaths)
+        assert set([(path[0], path[-1]) for path in uniquePaths]) == set(cheapest.keys())
+        for path in uniquePaths:
+            assert path in allPaths
+            assert pathCost(path) == cheapest[(path[0], path[-1])]
+        moves = listAllLegalMoves(state)
+        state.applyMove(moves[rand.randint(0, len(moves) - 1)])
+        if state.inventories[PLAYER_ONE].getQueen() == None or \
+           state.inventories[PLAYER_TWO].getQueen() == None:
+            break
+
+##
+# relaxedDistances
+#
+# Description: finds the cost from every cell to a target by relaxing every
+# cell until nothing changes (slow but obviously right)
+#
+# Return: {coords: cost} for every cell that can reach the target
+#
+def relaxedDistances(state, target, avoidAnts):
+    dist = {target: 0}
+    changed = True
+    while changed:
+        changed = False
+        for x in xrange(0, BOARD_LENGTH):
+            for y in xrange(0, BOARD_LENGTH):
+                for adj in AIPlayerUtils.listAdjacent((x, y)):
+                    if adj not in dist:
+                        continue
+                    if avoidAnts and adj != target and AIPlayerUtils.getAntAt(state, adj) != None:
+                        continue
+                    constr = AIPlayerUtils.getConstrAt(state, adj)
+                    cost = dist[adj] + (constr.movementCost if constr != None else 1)
+                    if cost < dist.get((x, y), 999):
+                        dist[(x, y)] = cost
+                        changed = True
+    return dist
+
+##
+# checkDistances
+#
+# Description: checks distanceField (with and without ants) and stepsToReach
+# against relaxedDistances for a few targets of a sample state
+#
+def checkDistances(seed):
+    state = sampleState(seed)
+    rand = random.Random(seed)
+    for i in xrange(0, 4):
+        target = (rand.randint(0, BOARD_LENGTH - 1), rand.randint(0, BOARD_LENGTH - 1))
+        for avoidAnts in [False, True]:
+            expected = relaxedDistances(state, target, avoidAnts)
+            field = AIPlayerUtils.distanceField(state, target, avoidAnts)
+            for x in xrange(0, BOARD_LENGTH):
+                for y in xrange(0, BOARD_LENGTH):
+                    assert field[x][y] == expected.get((x, y), -1)
+                    if not avoidAnts:
+                        assert AIPlayerUtils.stepsToReach(state, (x, y), target) == field[x][y]
+                        assert field[x][y] <= referenceStepsToReach(state, (x, y), target)
+
+##
+# checkTerrainKeys
+#
+# Description: plays random moves from a sample position, checking at each
+# step that the terrain key a state keeps (see GameState.getTerrainKey) is
+# the one worked out afresh from its constructions: after applyMove and
+# undoMove, in its fastclones and cowclones and in both players' views of
+# it.  Grass added and removed by hand and flipping the state are checked
+# as well.
+#
+def checkTerrainKeys(seed, steps):
+    def freshKey(state):
+        return tuple([(constr.coords, constr.movementCost)
+                      for inv in state.inventories for constr in inv.constrs
+                      if constr.movementCost != 1])
+    rand = random.Random(seed)
+    state = sampleState(seed)
+    for i in xrange(0, steps):
+        assert state.getTerrainKey() == freshKey(state)
+        for clone in [state.fastclone(), state.cowclone()]:
+            assert clone.getTerrainKey() == freshKey(state)
+        for player in [PLAYER_ONE, PLAYER_TWO]:
+            view = StateView(state, player)
+            shown = state.fastclone()
+            if player == PLAYER_TWO:
+                shown.flipBoard()
+            assert view.getTerrainKey() == freshKey(shown) == shown.getTerrainKey()
+        moves = listAllLegalMoves(state)
+        move = moves[rand.randint(0, len(moves) - 1)]
+        token = state.applyMove(move)
+        assert state.getTerrainKey() == freshKey(state)
+        state.undoMove(token)
+        assert state.getTerrainKey() == freshKey(state)
+        state.applyMove(move)
+        if state.inventories[PLAYER_ONE].getQueen() == None or \
+           state.inventories[PLAYER_TWO].getQueen() == None:
+            break
+    grass = state.inventories[NEUTRAL].constrs
+    for coord in AIPlayerUtils.CELL_COORDS:
+        if state.getAntAt(coord) == None and state.getConstrAt(coord) == None:
+            grass.append(Construction(coord, GRASS))
+            break
+    assert state.getTerrainKey() == freshKey(state)
+    grass.remove([constr for constr in grass if constr.type == GRASS][0])
+    assert state.getTerrainKey() == freshKey(state)
+    state.flipBoard()
+    assert state.getTerrainKey() == freshKey(state)
+
+##
+# checkNearest
+#
+# Description: checks the nearest-target fields against the minimum of the
+# single-target distances for some target sets of a sample state
+#
+def checkNearest(seed):
+    state = sampleState(seed)
+    targetSets = [[constr.coords for constr in state.inventories[NEUTRAL].constrs if constr.type == FOOD],
+                  [ant.coords for ant in state.inventories[PLAYER_TWO].ants],
+                  [state.inventories[PLAYER_ONE].getAnthill().coords]]
+    for targets in targetSets:
+        manhattan = AIPlayerUtils.nearestManhattanField(targets)
+        nearest = AIPlayerUtils.nearestDistanceField(state, targets)
+        for x in xrange(0, BOARD_LENGTH):
+            for y in xrange(0, BOARD_LENGTH):
+                assert manhattan[x][y] == min([abs(x - t[0]) + abs(y - t[1]) for t in targets])
+                assert nearest[x][y] == min([AIPlayerUtils.distanceField(state, t)[x][y] for t in targets])
+    assert AIPlayerUtils.nearestManhattanField([])[0][0] == -1
+
+##
+# checkIterMoves
+#
+# Description: plays random moves from a sample position, checking at each
+# step that iterLegalMoves yields the same moves as listAllLegalMoves in
+# every order (and exactly the same order for MOVES_FIRST)
+#
+def checkIterMoves(seed, steps):
+    rand = random.Random(seed)
+    state = sampleState(seed)
+    for i in xrange(0, steps):
+        for uniqueDest in [False, True]:
+            expected = [str(move) for move in listAllLegalMoves(state, uniqueDest)]
+            for order in [AIPlayerUtils.MOVES_FIRST, AIPlayerUtils.BUILDS_FIRST,
+                          AIPlayerUtils.ATTACKS_FIRST]:
+                moves = [str(move) for move in AIPlayerUtils.iterLegalMoves(state, order, uniqueDest)]
+                assert sorted(moves) == sorted(expected)
+                assert moves[-1] == expected[-1]   #END
+                if order == AIPlayerUtils.MOVES_FIRST:
+                    assert moves == expected
+        moves = listAllLegalMoves(state)
+        state.applyMove(moves[rand.randint(0, len(moves) - 1)])
+        if state.inventories[PLAYER_ONE].getQueen() == None or \
+           state.inventories[PLAYER_TWO].getQueen() == None:
+            break
+
+##
+# checkNextState
+#
+# Description: plays random moves (and random attacks) from a sample
+# position through a HeadlessGame (see MoveScript), checking at each step
+# that getNextStateAdversarial gives the same state (inventory order
+# included) as the game's own rules, that getNextState only differs in whose
+# turn it is after END, that neither changes the state passed in and that
+# the hashes they keep are right
+#
+def checkNextState(seed, steps):
+    script = MoveScript(seed, steps)
+    state = sampleState(seed)
+    for i in xrange(0, len(script.moves)):
+        (move, attackCoord) = script.moves[i]
+        state.getHash()
+        before = CompactState.fromGameState(state).data
+        assert before == script.states[i]
+        nextState = AIPlayerUtils.getNextStateAdversarial(state, move, attackCoord)
+        ownState = AIPlayerUtils.getNextState(state, move, attackCoord)
+        assert CompactState.fromGameState(state).data == before
+        assert CompactState.fromGameState(nextState).data == script.states[i + 1]
+        assert nextState.getHash() == Zobrist.hashState(nextState)
+        assert ownState.getHash() == Zobrist.hashState(ownState)
+        assert ownState.whoseTurn == state.whoseTurn
+        ownState.whoseTurn = nextState.whoseTurn
+        assert CompactState.fromGameState(ownState).data == CompactState.fromGameState(nextState).data
+        state = nextState
+
+##
+# checkMoveCache
+#
+# Description: plays random moves from a sample position, checking at each
+# step that cachedLegalMoves gives the moves listAllLegalMoves does, for the
+# state and for both players' views of it (whose hashes must match those of
+# the flipped states they show)
+#
+def checkMoveCache(seed, steps):
+    rand = random.Random(seed)
+    state = sampleState(seed)
+    for i in xrange(0, steps):
+        for uniqueDest in [False, True]:
+            expected = [str(move) for move in listAllLegalMoves(state, uniqueDest)]
+            for twice in [False, True]:
+                moves = AIPlayerUtils.cachedLegalMoves(state, uniqueDest)
+                assert type(moves) is tuple and [str(move) for move in moves] == expected
+            for move in moves:
+                assert move.coordList == None or type(move.coordList) is tuple
+                try:
+                    move.buildType = TUNNEL
+                    assert False, "a cached move was changed"
+                except AttributeError:
+                    pass
+        for player in [PLAYER_ONE, PLAYER_TWO]:
+            view = StateView(state, player)
+            shown = state.fastclone()
+            if player == PLAYER_TWO:
+                shown.flipBoard()
+            assert view.getHash() == Zobrist.hashState(shown)
+            assert [str(move) for move in AIPlayerUtils.cachedLegalMoves(view)] == \
+                   [str(move) for move in listAllLegalMoves(shown)]
+        moves = listAllLegalMoves(state)
+        state.applyMove(moves[rand.randint(0, len(moves) - 1)])
+        if state.inventories[PLAYER_ONE].getQueen() == None or \
+           state.inventories[PLAYER_TWO].getQueen() == None:
+            break
+
+##
+#TupleMovesPlayer
+#Description: A Player that plays as another does, but gives its moves'
+#   coordinates as tuples instead of lists
+##
+class TupleMovesPlayer(Player):
+
+    def __init__(self, inputPlayerId, player):
+        Player.__init__(self, inputPlayerId, player.author)
+        self.player = player
+
+    def getPlacement(self, currentState):
+        return self.player.getPlacement(currentState)
+
+    def getMove(self, currentState):
+        move = self.player.getMove(currentState)
+        if move.coordList == None:
+            return move
+        return Move(move.moveType, tuple(move.coordList), move.buildType)
+
+    def getAttack(self, currentState, attackingAnt, enemyLocations):
+        return self.player.getAttack(currentState, attackingAnt, enemyLocations)
+
+##
+# checkTupleMoves
+#
+# Description: checks that the game takes (and translates for player two) a
+# move whose coordList is a tuple as it does a list, by playing the same
+# games with and without a TupleMovesPlayer
+#
+def checkTupleMoves():
+    sys.path.insert(0, "AI")
+    import AIPlayer
+    game = HeadlessGame(maxTurns=200)
+    for seed in xrange(0, 3):
+        results = []
+        for wrap in [False, True]:
+            playerOne = AIPlayer.AIPlayer(PLAYER_ONE)
+            playerTwo = AIPlayer.AIPlayer(PLAYER_TWO)
+            if wrap:
+                playerTwo = TupleMovesPlayer(PLAYER_TWO, playerTwo)
+            random.seed(seed)
+            results.append((game.playGame(playerOne, playerTwo), game.turnCount))
+        assert results[0] == results[1]
+
+##
+# checkTurnPlans
+#
+# Description: checks that iterTurnPlans finds every way a small position's
+# turn can end exactly once (with the right plans and states), and that
+# maxPlans is obeyed
+#
+def checkTurnPlans(seed):
+    state = smallTurnState(seed, 3)
+    plans = list(AIPlayerUtils.iterTurnPlans(state))
+    ends = set()
+    for (plan, endState) in plans:
+        assert plan[-1].moveType == END
+        assert endState.getHash() == Zobrist.hashState(endState)
+        replayed = state.fastclone()
+        for move in plan:
+            replayed.applyMove(move)
+        assert Zobrist.hashState(replayed) == endState.getHash()
+        ends.add(endState.getHash())
+    assert len(ends) == len(plans)
+    assert ends == exhaustiveTurnEnds(state)[0]
+    assert len(list(AIPlayerUtils.iterTurnPlans(state, 10))) == min(10, len(plans))
+
+##
+# checkPrunedMoves
+#
+# Description: plays random moves from a sample position, checking at each
+# step that every move listAllLegalMoves leaves out when pruning is either
+# a zero-step move without an attack or ends in the same state as a move it
+# keeps, that it keeps one move per ant per destination (in the order they
+# are listed without pruning) and that the counts add up
+#
+def checkPrunedMoves(seed, steps):
+    rand = random.Random(seed)
+    state = sampleState(seed)
+    for i in xrange(0, steps):
+        for uniqueDest in [False, True]:
+            stats = {}
+            allMoves = listAllLegalMoves(state, uniqueDest)
+            kept = listAllLegalMoves(state, uniqueDest, True, stats)
+            assert len(allMoves) - len(kept) == sum(stats.values())
+            remaining = iter([str(move) for move in allMoves])
+            assert all(str(move) in remaining for move in kept)
+            movements = [(move.coordList[0], move.coordList[-1]) for move in kept
+                         if move.moveType == MOVE_ANT]
+            assert len(set(movements)) == len(movements)
+            iterated = list(AIPlayerUtils.iterLegalMoves(state, AIPlayerUtils.MOVES_FIRST,
+                                                         uniqueDest, True))
+            assert [str(move) for move in iterated] == [str(move) for move in kept]
+            keptEnds = set()
+            for move in kept:
+                child = state.fastclone()
+                child.applyMove(move)
+                keptEnds.add(Zobrist.hashState(child))
+            for move in allMoves:
+                child = state.fastclone()
+                child.applyMove(move)
+                if Zobrist.hashState(child) not in keptEnds:
+                    assert move.moveType == MOVE_ANT and len(move.coordList) == 1
+                    assert Zobrist.hashState(child) == Zobrist.hashState(state) ^ \
+                        Zobrist.ANT_MOVED_KEYS[move.coordList[0][0] * BOARD_LENGTH +
+                                               move.coordList[0][1]]
+        moves = listAllLegalMoves(state)
+        state.applyMove(moves[rand.randint(0, len(moves) - 1)])
+        if state.inventories[PLAYER_ONE].getQueen() == None or \
+           state.inventories[PLAYER_TWO].getQueen() == None:
+            break
+
+##
+# checkPathToward
+#
+# Description: plays random moves from a sample position, checking at each
+# step that pathToward gives every ant (toward every enemy ant and
+# construction) a legal path that gets as close as any path along a
+# shortest route does, and never closer than any path can
+#
+def checkPathToward(seed, steps):
+    rand = random.Random(seed)
+    state = sampleState(seed)
+    for i in xrange(0, steps):
+        targets = [thing.coords for inv in state.inventories for thing in inv.constrs]
+        targets += [ant.coords for ant in state.inventories[1 - state.whoseTurn].ants]
+        legalPaths = set([str(move.coordList) for move in listAllLegalMoves(state)
+                          if move.moveType == MOVE_ANT])
+        for ant in state.inventories[state.whoseTurn].ants:
+            if ant.hasMoved:
+                continue
+            for target in targets:
+                field = AIPlayerUtils.distanceField(state, target)
+                path = AIPlayerUtils.pathToward(state, ant.coords, target,
+                                                UNIT_STATS[ant.type][MOVEMENT], ant.type == QUEEN)
+                assert str(path) in legalPaths
+                dist = field[path[-1][0]][path[-1][1]]
+                assert dist == referencePathToward(state, ant, target, True)[1]
+                assert dist >= referencePathToward(state, ant, target)[1]
+        moves = listAllLegalMoves(state)
+        state.applyMove(moves[rand.randint(0, len(moves) - 1)])
+        if state.inventories[PLAYER_ONE].getQueen() == None or \
+           state.inventories[PLAYER_TWO].getQueen() == None:
+            break
+
+##
+#StallingPlayer
+#Description: A Player that sets up as another does but never chooses a move
+#   (to check that it is timed out)
+##
+class StallingPlayer(Player):
+
+    def __init__(self, inputPlayerId, setupPlayer):
+        Player.__init__(self, inputPlayerId, "Staller")
+        self.setupPlayer = setupPlayer
+
+    def getPlacement(self, currentState):
+        return self.setupPlayer.getPlacement(currentState)
+
+    def getMove(self, currentState):
+        while True:
+            time.sleep(1)
+
+##
+#PublishingStaller
+#Description: A StallingPlayer that publishes a move (ending its turn) before
+#   it stalls, so it is not timed out
+##
+class PublishingStaller(StallingPlayer):
+
+    def getMoveTimed(self, currentState, deadline):
+        self.publishMove(Move(END, None, None))
+        return self.getMove(currentState)
+
+##
+#OverrunningPlayer
+#Description: A StallingPlayer that publishes a move (ending its turn) and
+#   then answers with it a little after its deadline
+##
+class OverrunningPlayer(StallingPlayer):
+
+    def getMoveTimed(self, currentState, deadline):
+        self.publishMove(Move(END, None, None))
+        time.sleep(max(deadline - time.time(), 0) + 0.1)
+        return Move(END, None, None)
+
+##
+#CrashingPlayer
+#Description: A StallingPlayer that raises an exception instead of moving
+##
+class CrashingPlayer(StallingPlayer):
+
+    def getMove(self, currentState):
+        raise ValueError("no move")
+
+##
+# checkTimedMoves
+#
+# Description: checks that a timed AI (in a process of its own or not) that
+# stops answering forfeits its games unless it has published a move, that
+# one that answers a little late keeps its process, that an AI that raises
+# an exception forfeits, and that timed games can be replayed from their
+# seed
+#
+def checkTimedMoves():
+    sys.path.insert(0, "AI")
+    import AIPlayer
+    opponent = AIPlayer.AIPlayer(PLAYER_TWO)
+    for inProcess in [False, True]:
+        game = HeadlessGame(maxTurns=200, moveTimeout=0.2, inProcess=inProcess)
+        staller = StallingPlayer(PLAYER_ONE, AIPlayer.AIPlayer(PLAYER_ONE))
+        for i in xrange(1, 3):
+            assert game.playGame(staller, opponent) == PLAYER_TWO
+            assert game.timedOut == PLAYER_ONE
+            assert game.timed(staller).stats["timeouts"] == i
+        game.maxTurns = 6
+        for player in [PublishingStaller(PLAYER_ONE, AIPlayer.AIPlayer(PLAYER_ONE)),
+                       OverrunningPlayer(PLAYER_ONE, AIPlayer.AIPlayer(PLAYER_ONE))]:
+            game.playGame(player, opponent)
+            assert game.timedOut == None and game.turnCount == 6
+            stats = game.timed(player).stats
+            assert stats["published"] == 3 and stats["timeouts"] == 0
+            if type(player) is OverrunningPlayer:
+                assert stats["restarts"] == 0
+            elif not inProcess:
+                assert stats["restarts"] == 2
+        for moveTimeout in [None, 0.2]:
+            game.moveTimeout = moveTimeout
+            crasher = CrashingPlayer(PLAYER_ONE, AIPlayer.AIPlayer(PLAYER_ONE))
+            assert game.playGame(crasher, opponent) == PLAYER_TWO
+            assert game.crashed == PLAYER_ONE and game.timedOut == None
+        game.stopTimedPlayers()
+    game = HeadlessGame(maxTurns=200, moveTimeout=0.2)
+    playerOne = AIPlayer.AIPlayer(PLAYER_ONE)
+    playerTwo = AIPlayer.AIPlayer(PLAYER_TWO)
+    results = []
+    for seed in [3, 4, 3]:
+        random.seed(seed)
+        winner = game.playGame(playerOne, playerTwo)
+        results.append((winner, game.turnCount))
+    assert results[0] == results[2]
+    assert game.timed(playerOne).stats["timeouts"] == 0
+    game.stopTimedPlayers()
+
+##
+# checkSearchPublishing
+#
+# Description: checks that the minimax AI publishes its best move at the
+# root as the search finds it: a depth-2 search cut off halfway through has
+# published a legal move (the one it had as best), a search told which move
+# to try first (even one that scores too low to be searched otherwise)
+# publishes that one first, and getMoveTimed's last published move is the
+# one it returns
+#
+def checkSearchPublishing():
+    sys.path.insert(0, "AI")
+    import mini_max_alpha_beta_pruning
+    state = sampleState()
+    legal = [str(move) for move in listAllLegalMoves(state)]
+    player = mini_max_alpha_beta_pruning.AIPlayer(PLAYER_ONE)
+    published = []
+    player.publisher = published.append
+    player.playerId = state.whoseTurn
+    player.maxDepth = 2
+    node = player.createNode(None, state, None)
+    startTime = time.time()
+    player.alpha_beta_search(node)
+    fullTime = time.time() - startTime
+    del published[:]
+    player.deadline = time.time() + fullTime / 2
+    try:
+        player.alpha_beta_search(node)
+        assert False, "the search should have run out of time"
+    except mini_max_alpha_beta_pruning.SearchTimeout:
+        pass
+    player.deadline = None
+    assert len(published) > 0 and published[-1] is player.rootBest
+    assert all(str(move) in legal for move in published)
+    del published[:]
+    #(the worst scoring move that isn't the queen's is in the half of the
+    #root's moves that aren't searched unless asked for first)
+    worstMove = min([move for move in listAllLegalMoves(state, False, True)
+                     if move.moveType == END or move.moveType == MOVE_ANT and
+                        state.getAntAt(move.coordList[0]).type != QUEEN],
+                    key=lambda move: player.evaluateState(player.processMove(state, move)))
+    player.rootFirst = worstMove
+    player.alpha_beta_search(node)
+    player.rootFirst = None
+    assert str(published[0]) == str(worstMove)
+    del published[:]
+    move = player.getMoveTimed(StateView(state, PLAYER_ONE), time.time() + 0.5)
+    assert str(published[-1]) == str(move)
+
+##
+#StateTests
+#Description: Checks of GameState's clones, moves and encodings
+##
+class StateTests(unittest.TestCase):
+
+    def testCompactState(self):
+        compact = CompactState.fromGameState(sampleState())
+        assert CompactState.fromGameState(compact.toGameState()).data == compact.data
+
+    def testMakeUnmake(self):
+        for seed in xrange(0, 20):
+            checkMakeUnmake(seed, 200)
+
+    def testNextState(self):
+        for seed in xrange(0, 20):
+            checkNextState(seed, 200)
+
+    def testSharedConstrs(self):
+        checkSharedConstrs()
+
+    def testStateView(self):
+        for seed in xrange(0, 20):
+            checkStateView(seed)
+
+    def testViewMoves(self):
+        for seed in xrange(0, 3):
+            checkViewMoves(seed)
+
+    def testCodec(self):
+        for seed in xrange(0, 20):
+            checkCodec(seed, 200)
+
+    def testTerrainKeys(self):
+        for seed in xrange(0, 5):
+            checkTerrainKeys(seed, 100)
+
+##
+#MoveTests
+#Description: Checks of the move generation and board helpers in
+#   AIPlayerUtils
+##
+class MoveTests(unittest.TestCase):
+
+    def testAdjacency(self):
+        checkAdjacency()
+
+    def testUniqueMoves(self):
+        for seed in xrange(0, 10):
+            checkUniqueMoves(seed, 100)
+
+    def testIterMoves(self):
+        for seed in xrange(0, 10):
+            checkIterMoves(seed, 100)
+
+    def testMoveCache(self):
+        for seed in xrange(0, 10):
+            checkMoveCache(seed, 100)
+
+    def testTurnPlans(self):
+        for seed in xrange(0, 4):
+            checkTurnPlans(seed)
+
+    def testPrunedMoves(self):
+        for seed in xrange(0, 10):
+            checkPrunedMoves(seed, 100)
+
+    def testDistances(self):
+        for seed in xrange(0, 5):
+            checkDistances(seed)
+
+    def testNearest(self):
+        for seed in xrange(0, 5):
+            checkNearest(seed)
+
+    def testPathToward(self):
+        for seed in xrange(0, 5):
+            checkPathToward(seed, 20)
+
+##
+#GameTests
+#Description: Checks of whole games: the moves the game takes, timed moves
+#   and the minimax AI's published moves
+##
+class GameTests(unittest.TestCase):
+
+    def testTupleMoves(self):
+        checkTupleMoves()
+
+    def testTimedMoves(self):
+        checkTimedMoves()
+
+    def testSearchPublishing(self):
+        checkSearchPublishing()
+
+if __name__ == '__main__':
+    unittest.main()
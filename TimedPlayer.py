@@ -0,0 +1,433 @@
+import time, random, signal, traceback, multiprocessing
+from Constants import *
+from StateView import StateView
+import StateCodec
+
+##
+# TimedPlayer.py
+#
+# Enforces the time limit on an AI player's answers (AI_MOVE_TIMEOUT).  A
+# TimedPlayer stands in for an AI: the AI itself lives in a worker process of
+# its own, started the first time it is asked for anything and kept for as
+# long as the TimedPlayer is (so it carries what it learns from one game to
+# the next, as it would in-process).  Each getPlacement, getMove, getAttack
+# and registerWin is sent to the worker and its answer waited for at most the
+# time limit.  If the answer does not come in time MoveTimeout is raised,
+# which the game treats as the AI forfeiting.
+#
+# Moves are asked for with getMoveTimed, which tells the AI its deadline.
+# While it works the AI can publish the best move it has found so far (see
+# Player.publishMove); the worker passes these on, and if the deadline passes
+# the last one published is played instead of the AI forfeiting.
+#
+# An AI that misses a deadline keeps its worker: the late answer is thrown
+# away when it comes (requests are numbered, so it can't be mistaken for the
+# answer to a later one).  Only if it has still not come by the end of a
+# grace period is the worker killed, and a new one started from the AI as it
+# was first given.
+#
+# The state the AI is given is pickled to get it to the worker, so the AI
+# always gets a GameState of its own.  A StateView (which the AI is given in
+# the play phase) is sent as the StateCodec encoding of the state it shows,
+# which is several times quicker than pickling the state.  The worker has its
+# own random numbers, so they are reseeded (see reseed) at the start of each
+# game to keep games repeatable.
+#
+# An InProcessTimedPlayer enforces the same time limit on an AI running in
+# the game's own process, for when starting more processes is not wanted
+# (e.g. in a Tournament's worker processes, which already use every core).
+#
+
+##
+#MoveTimeout
+#Description: Raised when an AI does not answer within the time limit
+#
+#Variables:
+#   seconds - the time limit
+##
+class MoveTimeout(Exception):
+
+    def __init__(self, seconds):
+        Exception.__init__(self, "no answer within " + str(seconds) + " seconds")
+        self.seconds = seconds
+
+
+##
+#AIError
+#Description: Raised when an AI raises an exception in its worker process (or
+#   the worker dies).  The message is the worker's traceback.
+##
+class AIError(Exception):
+    pass
+
+
+##
+#DeadlinePassed
+#Description: Raised in an InProcessTimedPlayer's AI when its time is up.
+#   (Not an Exception, so an AI that catches every Exception doesn't stop it.)
+##
+class DeadlinePassed(BaseException):
+    pass
+
+
+##
+#EncodedState
+#Description: A GameState on its way to the worker: it is pickled as its
+#   StateCodec encoding and unpickled as the decoded GameState
+##
+class EncodedState(object):
+
+    def __init__(self, state):
+        self.encoded = StateCodec.encode(state)
+
+    def __reduce__(self):
+        return (StateCodec.decode, (self.encoded,))
+
+
+##
+# sendable
+#
+# Description: returns what to send the worker in place of an argument for
+# the AI (an EncodedState for a StateView, otherwise the argument itself)
+#
+def sendable(arg):
+    if type(arg) is StateView:
+        return EncodedState(arg.getCopy())
+    return arg
+
+
+##
+# serveAI
+#
+# Description: the worker process of a TimedPlayer: answers requests from
+# the game until the game closes its end of the pipe.  Every message sent
+# back is (kind, request number, value), where kind is "published" (for a
+# move published while working on the request), "ok" or "error".
+#
+# Parameters:
+#   player - the AI
+#   conn - the worker's end of the pipe
+#   gameConn - the game's end of the pipe (closed here, so the worker sees
+#       the pipe close when the game goes away)
+#
+def serveAI(player, conn, gameConn):
+    gameConn.close()
+    request = [None]
+    player.publisher = lambda move: conn.send(("published", request[0], move))
+    while True:
+        try:
+            (request[0], methodName, args, playerId, seed) = conn.recv()
+        except EOFError:
+            return
+        if seed != None:
+            random.seed(seed)
+        player.playerId = playerId
+        try:
+            answer = ("ok", request[0], getattr(player, methodName)(*args))
+        except Exception:
+            answer = ("error", request[0], traceback.format_exc())
+        try:
+            conn.send(answer)
+        except IOError:
+            return
+        except Exception:
+            #(the answer could not be pickled)
+            conn.send(("error", request[0], traceback.format_exc()))
+
+
+##
+#TimedPlayer
+#Description: A Player that passes everything it is asked on to an AI in
+#   another process, and gives up on the AI if it takes too long to answer
+#
+#Variables:
+#   player - the AI (as it was given: the one in the worker process is a copy)
+#   author - the AI's author
+#   timeout - the time limit (in seconds) on each answer
+#   grace - how long (in seconds) past a missed deadline the AI has to
+#       finish before its worker is killed
+#   process - the worker process (None until it is started, and after it has
+#       been killed)
+#   conn - the game's end of the pipe to the worker
+#   requests - the number of requests sent to the worker (each is numbered)
+#   late - (number, end of grace period) of a request the AI missed the
+#       deadline for and is still working on, otherwise None
+#   seed - the seed for the worker's random numbers, sent with the next
+#       request (None once it has been)
+#   stats - the AI's timings: the number of "calls" it has answered or timed
+#       out on, how many "timeouts", how many times a "published" move was
+#       played when time ran out, how many times its worker was killed
+#       ("restarts"), the total "seconds" taken and the "slowest" answer (in
+#       seconds)
+##
+class TimedPlayer(object):
+
+    ##
+    #__init__
+    #Description: Creates a new TimedPlayer
+    #
+    #Parameters:
+    #   player - the AI (Player)
+    #   timeout - the time limit in seconds (optional)
+    #   grace - see grace above (optional, default the time limit)
+    ##
+    def __init__(self, player, timeout=AI_MOVE_TIMEOUT, grace=None):
+        self.player = player
+        self.author = player.author
+        self.timeout = timeout
+        if grace == None:
+            grace = timeout
+        self.grace = grace
+        self.process = None
+        self.conn = None
+        self.requests = 0
+        self.late = None
+        self.seed = None
+        self.stats = { "calls" : 0, "timeouts" : 0, "published" : 0, "restarts" : 0,
+                       "seconds" : 0.0, "slowest" : 0.0 }
+
+    def getPlayerId(self):
+        return self.player.playerId
+
+    def setPlayerId(self, value):
+        self.player.playerId = value
+
+    #(the id is sent with every request, so the worker's copy keeps up)
+    playerId = property(getPlayerId, setPlayerId)
+
+    ##
+    #reseed
+    #Description: Has the worker reseed its random numbers before it answers
+    #   the next request
+    ##
+    def reseed(self, seed):
+        self.seed = seed
+
+    ##
+    #start
+    #Description: Starts the worker process
+    ##
+    def start(self):
+        (self.conn, workerConn) = multiprocessing.Pipe()
+        self.process = multiprocessing.Process(target=serveAI, args=(self.player, workerConn, self.conn))
+        self.process.daemon = True
+        self.process.start()
+        workerConn.close()
+
+    ##
+    #stop
+    #Description: Kills the worker process (if there is one)
+    ##
+    def stop(self):
+        if self.process != None:
+            self.conn.close()
+            self.process.terminate()
+            self.process.join()
+            self.process = None
+            self.conn = None
+        self.late = None
+
+    ##
+    #receive
+    #Description: Waits (until a given time at the latest) for a message from
+    #   the worker
+    #
+    #Return: the message, or None if none came in time
+    ##
+    def receive(self, until):
+        remaining = until - time.time()
+        if remaining < 0 or not self.conn.poll(remaining):
+            return None
+        try:
+            return self.conn.recv()
+        except EOFError:
+            self.stop()
+            raise AIError("the AI's process died")
+
+    ##
+    #finishLate
+    #Description: Waits for (and throws away) the answer to a request the AI
+    #   missed the deadline for, killing the worker if the answer does not
+    #   come by the end of the grace period
+    ##
+    def finishLate(self):
+        while self.late != None:
+            (request, graceEnd) = self.late
+            message = self.receive(graceEnd)
+            if message == None:
+                self.stats["restarts"] += 1
+                self.stop()
+            elif message[0] != "published" and message[1] == request:
+                self.late = None
+
+    ##
+    #call
+    #Description: Calls a method of the AI in the worker process and waits for
+    #   its answer
+    #
+    #Parameters:
+    #   methodName - the name of the method (string)
+    #   args - the arguments to call it with (tuple)
+    #   withDeadline - if True, the deadline (the time limit from when the
+    #       AI is asked) is passed to the method after the arguments
+    #
+    #Return: whatever the method returns, or the last move the AI published
+    #   if it did not answer in time
+    ##
+    def call(self, methodName, args, withDeadline=False):
+        self.finishLate()
+        if self.process == None:
+            self.start()
+        startTime = time.time()
+        deadline = startTime + self.timeout
+        if withDeadline:
+            args += (deadline,)
+        self.requests += 1
+        request = self.requests
+        self.conn.send((request, methodName, tuple([sendable(arg) for arg in args]),
+                        self.player.playerId, self.seed))
+        self.seed = None
+        published = None
+        answer = None
+        while answer == None:
+            message = self.receive(deadline)
+            if message == None:
+                break
+            (kind, answered, value) = message
+            if answered != request:
+                continue
+            if kind == "published":
+                published = value
+            else:
+                answer = (kind, value)
+        self.record(time.time() - startTime)
+        if answer == None:
+            #(the worker is left to finish, see finishLate)
+            self.late = (request, deadline + self.grace)
+            return self.outOfTime(published)
+        (kind, value) = answer
+        if kind == "error":
+            raise AIError(value)
+        return value
+
+    ##
+    #record
+    #Description: Adds the time taken over an answer to the stats
+    ##
+    def record(self, seconds):
+        self.stats["calls"] += 1
+        self.stats["seconds"] += seconds
+        self.stats["slowest"] = max(self.stats["slowest"], seconds)
+
+    ##
+    #outOfTime
+    #Description: Returns the move the AI published (if it did) when it runs
+    #   out of time, otherwise raises MoveTimeout
+    ##
+    def outOfTime(self, published):
+        if published != None:
+            self.stats["published"] += 1
+            return published
+        self.stats["timeouts"] += 1
+        raise MoveTimeout(self.timeout)
+
+    def getPlacement(self, currentState):
+        return self.call("getPlacement", (currentState,))
+
+    def getMove(self, currentState):
+        return self.call("getMoveTimed", (currentState,), True)
+
+    def getAttack(self, currentState, attackingAnt, enemyLocations):
+        return self.call("getAttack", (currentState, attackingAnt, enemyLocations))
+
+    ##
+    #registerWin
+    #Description: Tells the AI if it won or not.  (The game is over, so an AI
+    #   that takes too long over this is not penalised.)
+    ##
+    def registerWin(self, hasWon):
+        try:
+            self.call("registerWin", (hasWon,))
+        except MoveTimeout:
+            pass
+
+
+##
+#InProcessTimedPlayer
+#Description: A TimedPlayer for an AI in the game's own process.  The AI is
+#   stopped at its deadline by a timer signal (SIGALRM) raising
+#   DeadlinePassed in it, so this only works in a process's main thread,
+#   and an AI busy in a long call into C code is only stopped when the call
+#   returns.  The AI shares the process's random numbers, so it needs no
+#   reseeding.
+#
+#Variables:
+#   As for TimedPlayer (but with no worker, so no grace or restarts), and
+#   waiting - True while the AI is being waited for
+#   published - the last move the AI published while it was being waited
+#       for (or None)
+##
+class InProcessTimedPlayer(TimedPlayer):
+
+    def __init__(self, player, timeout=AI_MOVE_TIMEOUT):
+        TimedPlayer.__init__(self, player, timeout)
+        self.waiting = False
+        self.published = None
+        player.publisher = self.publish
+
+    def publish(self, move):
+        if self.waiting:
+            self.published = move
+
+    ##
+    #alarm
+    #Description: Handles the timer signal by stopping the AI (unless it
+    #   has already answered)
+    ##
+    def alarm(self, signum, frame):
+        if self.waiting:
+            raise DeadlinePassed()
+
+    def reseed(self, seed):
+        pass
+
+    def start(self):
+        pass
+
+    def stop(self):
+        pass
+
+    ##
+    #call
+    #Description: Calls a method of the AI, stopping it if it has not
+    #   returned by the deadline
+    #
+    #Parameters and Return: as for TimedPlayer.call
+    ##
+    def call(self, methodName, args, withDeadline=False):
+        startTime = time.time()
+        deadline = startTime + self.timeout
+        if withDeadline:
+            args += (deadline,)
+        self.published = None
+        answered = False
+        previousHandler = signal.signal(signal.SIGALRM, self.alarm)
+        self.waiting = True
+        signal.setitimer(signal.ITIMER_REAL, max(deadline - time.time(), 0.001))
+        try:
+            answer = getattr(self.player, methodName)(*args)
+            #(stop the timer first thing, so it can't go off while the
+            #answer is being taken and forfeit a move made in time)
+            signal.setitimer(signal.ITIMER_REAL, 0)
+            self.waiting = False
+            answered = True
+        except DeadlinePassed:
+            pass
+        finally:
+            self.waiting = False
+            signal.setitimer(signal.ITIMER_REAL, 0)
+            signal.signal(signal.SIGALRM, previousHandler)
+        self.record(time.time() - startTime)
+        if not answered:
+            return self.outOfTime(self.published)
+        return answer
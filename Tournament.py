@@ -0,0 +1,246 @@
+import sys, time, random, argparse, signal, multiprocessing
+from Constants import *
+from HeadlessGame import HeadlessGame
+from Match import loadAI, DEFAULT_MAX_TURNS
+
+##
+# Tournament.py
+#
+# Plays the games of a tournament in parallel on a pool of worker processes
+# (one per core by default).  Each worker loads the AIs once and then plays
+# whichever games it is given; results come back to the parent as each game
+# ends, so it can keep a scoreboard up to date.  The GUI's Tournament mode
+# uses this, and it can be run from the command line:
+#
+#            python Tournament.py <AI> <AI> [<AI> ...] [--games N] [--processes P]
+#                                 [--seed S] [--max-turns T] [--move-timeout SECONDS]
+#
+# which plays N games between every pair of the AIs (named by module or
+# author, as for Match.py), alternating sides, and prints the standings.  As
+# in a Match, an AI forfeits a game if it takes longer than the move timeout
+# to answer.  The AIs run in the worker processes themselves (each worker
+# stops them at their deadlines with a timer, see InProcessTimedPlayer), so
+# there is still one busy process per core.
+#
+
+#the players of a worker process: {name: [player for PLAYER_ONE, player for
+#PLAYER_TWO]} (see initWorker)
+workerPlayers = {}
+
+#the HeadlessGame a worker process plays its games in
+workerGame = None
+
+##
+# initWorker
+#
+# Description: sets up a worker process: loads each AI once (two players
+# of it, so it can play either side against anyone, itself included)
+#
+# Parameters:
+#   names - the AIs' module names or authors
+#   maxTurns - games are drawn after this many turns
+#   moveTimeout - the time limit on the AIs' answers (None for no limit)
+#
+def initWorker(names, maxTurns, moveTimeout):
+    global workerGame
+    #leave Ctrl-C to the parent (which stops the pool)
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    for name in names:
+        workerPlayers[name] = [loadAI(name, PLAYER_ONE), loadAI(name, PLAYER_TWO)]
+    workerGame = HeadlessGame(maxTurns, moveTimeout, inProcess=True)
+
+##
+# playTournamentGame
+#
+# Description: plays one game of a tournament in a worker process
+#
+# Parameters:
+#   task - (game number, PLAYER_ONE's name, PLAYER_TWO's name, seed)
+#
+# Return: (game number, PLAYER_ONE's name, PLAYER_TWO's name, the winner
+# (PLAYER_ONE, PLAYER_TWO or None for a draw), turns played, the player that
+# ran out of time (or None))
+#
+def playTournamentGame(task):
+    (gameNum, nameOne, nameTwo, seed) = task
+    random.seed(seed)
+    #(an AI that crashes loses, as one that makes an invalid move does)
+    winner = workerGame.playGame(workerPlayers[nameOne][PLAYER_ONE],
+                                 workerPlayers[nameTwo][PLAYER_TWO])
+    return (gameNum, nameOne, nameTwo, winner, workerGame.turnCount, workerGame.timedOut)
+
+
+##
+#Tournament
+#Description: The games of a tournament, being played by a pool of worker
+#   processes.  Results can be collected as they come in (poll) or waited for
+#   (iterating over the Tournament).
+#
+#Variables:
+#   tasks - the games to play (see playTournamentGame)
+#   pool - the worker processes
+#   results - an iterator over the results, in the order the games end
+#   scores - {name: [wins, losses, draws, games lost by timing out]} for
+#       the games that have ended
+#   gamesPlayed - the number of games that have ended
+#   turnsPlayed - the total number of turns played in them
+##
+class Tournament(object):
+
+    ##
+    #__init__
+    #Description: Creates a new Tournament and starts playing its games
+    #
+    #Parameters:
+    #   pairings - a list of (name, name, number of games) (the players swap
+    #       sides after each game of a pairing)
+    #   processes - the number of worker processes (optional, default one
+    #       per core)
+    #   seed - the random seed of the tournament (optional).  Each game is
+    #       seeded with this plus its number.
+    #   maxTurns - games are drawn after this many turns (optional)
+    #   moveTimeout - the time limit (in seconds) on the AIs' answers, or None
+    #       for no limit (optional)
+    ##
+    def __init__(self, pairings, processes=None, seed=0, maxTurns=DEFAULT_MAX_TURNS,
+                 moveTimeout=AI_MOVE_TIMEOUT):
+        self.tasks = []
+        names = []
+        for (nameA, nameB, numGames) in pairings:
+            for name in (nameA, nameB):
+                if name not in names:
+                    names.append(name)
+            for i in xrange(0, numGames):
+                gameNum = len(self.tasks)
+                if i % 2 == 0:
+                    self.tasks.append((gameNum, nameA, nameB, seed + gameNum))
+                else:
+                    self.tasks.append((gameNum, nameB, nameA, seed + gameNum))
+        self.scores = dict([(name, [0, 0, 0, 0]) for name in names])
+        self.gamesPlayed = 0
+        self.turnsPlayed = 0
+        if processes == None:
+            processes = multiprocessing.cpu_count()
+        self.pool = multiprocessing.Pool(processes, initWorker, (names, maxTurns, moveTimeout))
+        self.results = self.pool.imap_unordered(playTournamentGame, self.tasks)
+        self.pool.close()
+
+    ##
+    #record
+    #Description: Adds the result of a game to the scores
+    ##
+    def record(self, result):
+        (gameNum, nameOne, nameTwo, winner, turns, timedOut) = result
+        if winner == None:
+            self.scores[nameOne][2] += 1
+            self.scores[nameTwo][2] += 1
+        elif winner == PLAYER_ONE:
+            self.scores[nameOne][0] += 1
+            self.scores[nameTwo][1] += 1
+        else:
+            self.scores[nameTwo][0] += 1
+            self.scores[nameOne][1] += 1
+        if timedOut != None:
+            self.scores[[nameOne, nameTwo][timedOut]][3] += 1
+        self.gamesPlayed += 1
+        self.turnsPlayed += turns
+
+    ##
+    #poll
+    #Description: Collects the results of the games that have ended since the
+    #   last call, without waiting for any more
+    #
+    #Return: a list of results (see playTournamentGame)
+    ##
+    def poll(self):
+        results = []
+        while not self.isFinished():
+            try:
+                result = self.results.next(0)
+            except multiprocessing.TimeoutError:
+                break
+            self.record(result)
+            results.append(result)
+        return results
+
+    ##
+    #isFinished
+    #Description: Returns True once the results of all the games are in
+    ##
+    def isFinished(self):
+        return self.gamesPlayed == len(self.tasks)
+
+    ##
+    #stop
+    #Description: Stops the worker processes (abandoning any games not yet
+    #   played)
+    ##
+    def stop(self):
+        self.pool.terminate()
+        self.pool.join()
+
+    def __iter__(self):
+        while not self.isFinished():
+            result = self.results.next()
+            self.record(result)
+            yield result
+        self.pool.join()
+
+
+##
+# main
+#
+# Description: runs a round-robin tournament from the command line and
+# prints the standings
+#
+# Parameters:
+#   args - the command line arguments (after the program name)
+#
+def main(args):
+    parser = argparse.ArgumentParser(prog="Tournament.py",
+                                     description="Plays a round-robin tournament between AIs on all cores.")
+    parser.add_argument("players", nargs="+", help="the AIs (module names or authors)")
+    parser.add_argument("--games", type=int, default=10,
+                        help="games between each pair of AIs (default 10)")
+    parser.add_argument("--processes", type=int, default=None,
+                        help="worker processes (default one per core)")
+    parser.add_argument("--seed", type=int, default=0, help="random seed (default 0)")
+    parser.add_argument("--max-turns", type=int, default=DEFAULT_MAX_TURNS,
+                        help="turns before a game is drawn (default %d)" % DEFAULT_MAX_TURNS)
+    parser.add_argument("--move-timeout", type=float, default=AI_MOVE_TIMEOUT,
+                        help="seconds an AI may take to move, 0 for no limit (default %d)" % AI_MOVE_TIMEOUT)
+    options = parser.parse_args(args)
+
+    for name in options.players:
+        if loadAI(name, PLAYER_ONE) == None:
+            print "ERROR:  AI '" + name + "' not found."
+            return 1
+    pairings = [(options.players[i], options.players[j], options.games)
+                for i in xrange(0, len(options.players))
+                for j in xrange(i + 1, len(options.players))]
+
+    moveTimeout = options.move_timeout
+    if moveTimeout <= 0:
+        moveTimeout = None
+    startTime = time.time()
+    tournament = Tournament(pairings, options.processes, options.seed, options.max_turns, moveTimeout)
+    try:
+        for result in tournament:
+            pass
+    except KeyboardInterrupt:
+        tournament.stop()
+        print "Stopped after %d of %d games." % (tournament.gamesPlayed, len(tournament.tasks))
+    seconds = time.time() - startTime
+
+    print "%-30s %6s %6s %6s %8s" % ("AI", "Wins", "Losses", "Draws", "Timeouts")
+    standings = sorted(tournament.scores.items(), key=lambda item: -item[1][0])
+    for (name, (wins, losses, draws, timeouts)) in standings:
+        print "%-30s %6d %6d %6d %8d" % (name, wins, losses, draws, timeouts)
+    if tournament.gamesPlayed > 0:
+        print "%d games, average turns: %.1f" % (tournament.gamesPlayed,
+            float(tournament.turnsPlayed) / tournament.gamesPlayed)
+    print "%.2f games/second (%.1f seconds)" % (tournament.gamesPlayed / max(seconds, 1e-9), seconds)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
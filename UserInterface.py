@@ -479,7 +479,7 @@ class UserInterface(object):
         #Draw the elapsed time
         Yoffset = YStartPixel + len(scores) * (self.tournFont.get_height() + FIELD_SPACING)
         if (self.tournamentInProgress):
-            self.tournamentElapsed = time.clock() - self.tournamentStartTime
+            self.tournamentElapsed = time.time() - self.tournamentStartTime
         elapsedMessage = "Elapsed time: "
         elapsedColor = DARK_RED
         if (not self.tournamentInProgress):
@@ -969,7 +969,7 @@ class UserInterface(object):
         #Initializing tournament scores
         self.tournamentScores = []
         #Variables used to track elapsed time during tournaments
-        self.tournamentStartTime = time.clock()
+        self.tournamentStartTime = time.time()
         self.tournamentElapsed = 0.0
         self.tournamentInProgress = False
         #Find out if user is choosing AIs
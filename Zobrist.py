@@ -0,0 +1,121 @@
+import random
+from Constants import *
+
+##
+# Zobrist.py
+#
+# 64-bit Zobrist keys for hashing game states.  Every piece of a state that
+# matters to play (each ant's type, owner, health, carrying and hasMoved
+# status, each construction's type, owner and capture health, both food
+# counts, whose turn it is and the phase) has a random 64-bit key and the hash
+# of a state is the XOR of the keys of all of its pieces.  Because XOR is its
+# own inverse, a hash can be kept up to date as a state changes by XORing out
+# the keys of a piece before it changes and XORing in its new keys after.
+#
+# The keys are generated from a fixed seed so hashes are the same in every
+# process (e.g. for sharing tables between tournament workers).
+#
+
+#number of cells on the board
+NUM_CELLS = BOARD_LENGTH * BOARD_LENGTH
+
+#number of distinct values we have keys for (larger values wrap around)
+NUM_ANT_TYPES = R_SOLDIER + 1
+NUM_HEALTHS = 8
+NUM_CONSTR_TYPES = FOOD - ANTHILL + 1
+NUM_CAP_HEALTHS = 8
+NUM_FOOD_COUNTS = 64
+
+_rand = random.Random(0x5eed)
+
+def _newKeys(count):
+    return [_rand.getrandbits(64) for i in xrange(0, count)]
+
+#[cell][type * 2 + owner]
+ANT_KEYS = [_newKeys(NUM_ANT_TYPES * 2) for i in xrange(0, NUM_CELLS)]
+#[cell][health]
+ANT_HEALTH_KEYS = [_newKeys(NUM_HEALTHS) for i in xrange(0, NUM_CELLS)]
+#[cell]
+ANT_CARRYING_KEYS = _newKeys(NUM_CELLS)
+ANT_MOVED_KEYS = _newKeys(NUM_CELLS)
+#[cell][(type - ANTHILL) * 3 + owner]  (owner is NEUTRAL for grass and food)
+CONSTR_KEYS = [_newKeys(NUM_CONSTR_TYPES * 3) for i in xrange(0, NUM_CELLS)]
+#[cell][captureHealth]
+CONSTR_HEALTH_KEYS = [_newKeys(NUM_CAP_HEALTHS) for i in xrange(0, NUM_CELLS)]
+#[player][foodCount]
+FOOD_KEYS = [_newKeys(NUM_FOOD_COUNTS) for i in xrange(0, 2)]
+#XORed in when it is PLAYER_TWO's turn
+TURN_KEY = _rand.getrandbits(64)
+#[phase]
+PHASE_KEYS = _newKeys(PLAY_PHASE + 1)
+
+del _rand
+
+##
+# antKey
+#
+# Return: the combined key of an ant in its current condition (as seen from
+# the other side of the board if flip is True)
+#
+def antKey(ant, flip=False):
+    cell = ant.coords[0] * BOARD_LENGTH + ant.coords[1]
+    if flip:
+        cell = NUM_CELLS - 1 - cell
+    key = ANT_KEYS[cell][ant.type * 2 + ant.player] ^ \
+          ANT_HEALTH_KEYS[cell][ant.health % NUM_HEALTHS]
+    if ant.carrying:
+        key ^= ANT_CARRYING_KEYS[cell]
+    if ant.hasMoved:
+        key ^= ANT_MOVED_KEYS[cell]
+    return key
+
+##
+# constrKey
+#
+# Return: the combined key of a construction in its current condition (as
+# seen from the other side of the board if flip is True).  Grass and food
+# (which have no owner) are keyed as belonging to NEUTRAL.
+#
+def constrKey(constr, flip=False):
+    cell = constr.coords[0] * BOARD_LENGTH + constr.coords[1]
+    if flip:
+        cell = NUM_CELLS - 1 - cell
+    owner = getattr(constr, 'player', NEUTRAL)
+    key = CONSTR_KEYS[cell][(constr.type - ANTHILL) * 3 + owner]
+    if owner != NEUTRAL:
+        key ^= CONSTR_HEALTH_KEYS[cell][constr.captureHealth % NUM_CAP_HEALTHS]
+    return key
+
+##
+# foodKey
+#
+# Return: the key for a player having a given amount of food
+#
+def foodKey(playerId, foodCount):
+    return FOOD_KEYS[playerId][foodCount % NUM_FOOD_COUNTS]
+
+##
+# hashState
+#
+# Description: computes the Zobrist hash of a state from scratch.  Only the
+# inventories are used so this works for states made with fastclone.
+#
+# Parameters:
+#   state - the GameState to hash
+#   flip - if True, the hash is that of the state with its board flipped
+#       (the state PLAYER_TWO is shown), without flipping it
+#
+# Return: a 64-bit integer
+#
+def hashState(state, flip=False):
+    key = PHASE_KEYS[state.phase]
+    if state.whoseTurn == PLAYER_TWO:
+        key ^= TURN_KEY
+    for inv in state.inventories:
+        for ant in inv.ants:
+            key ^= antKey(ant, flip)
+        for constr in inv.constrs:
+            key ^= constrKey(constr, flip)
+        if inv.player != NEUTRAL:
+            key ^= foodKey(inv.player, inv.foodCount)
+    return key
@@ -3,6 +3,7 @@ import random
 from Player import *
 from Constants import *
 from Construction import CONSTR_STATS
+from Construction import Construction
 from Ant import UNIT_STATS
 from Ant import Ant
 from Move import Move
@@ -203,6 +204,7 @@ class AIPlayer(Player):
         playerFoodCarryAmount = 0
         
         allAnts = getAntList(currentState, currentState.whoseTurn,(DRONE,WORKER,SOLDIER,R_SOLDIER))
+        workerAnts = []
         attackAnts = []
         for ant in allAnts:
             if ant.type == WORKER:
@@ -213,9 +215,17 @@ class AIPlayer(Player):
             valueOfState -= len(attackAnts) * .2
         if len(workerAnts) > 1:
             return 0.0000000001
+        # distances from every cell to each enemy ant, player construction and food
+        # (see distanceField) so the distances below are just lookups
+        enemyFields = [distanceField(currentState, enemyAnt.coords) for enemyAnt in enemyInv.ants]
+        constFields = [distanceField(currentState, playerInv.getAnthill().coords)]
+        constFields.extend([distanceField(currentState, tunnel.coords) for tunnel in playerInv.getTunnels()])
+        foodFields = [distanceField(currentState, constr.coords)
+                      for constr in currentState.inventories[NEUTRAL].constrs if constr.type == FOOD]
+
         for ant in attackAnts:
             # list of all the distances to enemy ants
-            distancesToEnemeies = [stepsToReach(currentState, ant.coords, enemyAnt.coords) for enemyAnt in enemyInv.ants]
+            distancesToEnemeies = [field[ant.coords[0]][ant.coords[1]] for field in enemyFields]
             # find the minimum steps to an enemy ant, use that to modify the state's value
             # the fewer the total steps the better
             valueOfState -= (min(distancesToEnemeies) - 1) * .001   
@@ -227,18 +237,12 @@ class AIPlayer(Player):
             if ant.carrying:
                 valueOfState += .015
                 #list of all the distances to player constructions, starting with the hill distance
-                distancesToConst = [stepsToReach(currentState, ant.coords, playerInv.getAnthill().coords)]
-                #loop through all the tunnel coords and find distance to them, adding them to the distances
-                distancesToConst.extend([stepsToReach(currentState, ant.coords, tunnel.coords) for tunnel in playerInv.getTunnels()])
+                distancesToConst = [field[ant.coords[0]][ant.coords[1]] for field in constFields]
                 #find the minimum steps to a construction, use that to modify the state's value
                 valueOfState -= (min(distancesToConst) - 1) * .001   
             else:                
                 #list of all distances to food
-                distancesToFood = []
-                for constr in currentState.inventories[NEUTRAL].constrs:
-                    if constr.type == FOOD:
-                        steps = stepsToReach(currentState, ant.coords, constr.coords)
-                        distancesToFood.append(steps)
+                distancesToFood = [field[ant.coords[0]][ant.coords[1]] for field in foodFields]
                 valueOfState -= (min(distancesToFood) - 1) * .001
             
         # 4  count amt food ( more the merrier ) (enemy, own) (for example, attacking enemy worker that is carrying is more valuable then attacking enemy worker that is not carrying food)